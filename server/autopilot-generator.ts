@@ -438,6 +438,8 @@ async function assembleVideoWithPython(projectData: any, outputPath: string): Pr
     const config = JSON.stringify({
       project: projectData,
       output: outputPath,
+      // Unattended - interactive previews get the CPU first
+      priority: "background",
     });
 
     console.log("[Autopilot] Running Python video assembly...");
@@ -0,0 +1,990 @@
+#!/usr/bin/env python3
+"""
+Render benchmarks for video_processor.py
+Builds its own fixtures offline with FFmpeg lavfi sources, so numbers are
+comparable between hosts and don't depend on generated_assets.
+"""
+
+import os
+import sys
+import json
+import time
+import platform
+import resource
+import subprocess
+import tempfile
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import video_processor as vp
+
+
+# =============================================================================
+# FIXTURES
+# =============================================================================
+
+def make_fixture_image(path: str, w: int = 1920, h: int = 1080) -> str:
+    """Render a detailed test pattern still - enough texture to stress the encoder."""
+    cmd = [
+        "ffmpeg", "-y", "-v", "error",
+        "-f", "lavfi", "-i", f"testsrc2=s={w}x{h}",
+        "-frames:v", "1",
+        path
+    ]
+    subprocess.run(cmd, check=True)
+    return path
+
+
+def make_fixture_audio(path: str, seconds: float, frequency: int = 440, noise: bool = False) -> str:
+    """Render a narration stand-in: 24 kHz mono, like the TTS output. noise gives pink noise instead of a tone."""
+    source = f"anoisesrc=color=pink:amplitude=0.3:duration={seconds}" if noise else f"sine=frequency={frequency}:duration={seconds}"
+    cmd = [
+        "ffmpeg", "-y", "-v", "error",
+        "-f", "lavfi", "-i", source,
+        "-ar", "24000", "-ac", "1",
+        "-c:a", "pcm_s16le",
+        path
+    ]
+    subprocess.run(cmd, check=True)
+    return path
+
+
+def make_fixture_chapter(fixture_dir: str, scenes: int = 4, seconds: float = 5.0, title: str = "Chapter One") -> Dict:
+    """Chapter JSON with one test image and one narration WAV per scene."""
+    fixture_dir = Path(fixture_dir)
+    fixture_dir.mkdir(parents=True, exist_ok=True)
+    image = make_fixture_image(str(fixture_dir / "still.png"))
+    chapter = {"title": title, "scenes": []}
+    for i in range(scenes):
+        audio = make_fixture_audio(str(fixture_dir / f"narration_{i+1}.wav"), seconds, 300 + 40 * i)
+        chapter["scenes"].append({"image_path": image, "audio_path": audio})
+    return chapter
+
+
+def make_fixture_project(fixture_dir: str, chapters: int = 2, scenes: int = 3, seconds: float = 5.0) -> Dict:
+    """
+    Project JSON with a year title and several chapters, narration
+    alternating between tones and noise, and the scene text overlays the
+    planner adds (chapter titles, dates, locations).
+    """
+    fixture_dir = Path(fixture_dir)
+    fixture_dir.mkdir(parents=True, exist_ok=True)
+    image = make_fixture_image(str(fixture_dir / "still.png"))
+    project = {"title": "Benchmark Documentary", "year_title": "1945", "chapters": []}
+    for c in range(chapters):
+        chapter = {"title": f"Chapter {c + 1}", "scenes": []}
+        for i in range(scenes):
+            audio = make_fixture_audio(str(fixture_dir / f"narration_{c+1}_{i+1}.wav"), seconds, 300 + 40 * i, noise=bool(i % 2))
+            scene = {"image_path": image, "audio_path": audio}
+            if i == 1:
+                scene["date_text"] = f"APRIL {c + 1}, 1945"
+            elif i == 2:
+                scene["location_text"] = "Berlin, Germany"
+            chapter["scenes"].append(scene)
+        project["chapters"].append(chapter)
+    return project
+
+
+def write_fixture_ndjson(project: Dict, path: str) -> str:
+    """The project as an NDJSON manifest: a header line without chapters, then chapter markers and scene lines."""
+    with open(path, "w") as f:
+        f.write(json.dumps({key: value for key, value in project.items() if key != "chapters"}) + "\n")
+        for chapter in project["chapters"]:
+            f.write(json.dumps({"chapter": {key: value for key, value in chapter.items() if key != "scenes"}}) + "\n")
+            for scene in chapter["scenes"]:
+                f.write(json.dumps(scene) + "\n")
+    return path
+
+
+# =============================================================================
+# MEASUREMENT
+# =============================================================================
+
+def measure(fn: Callable, *args, **kwargs) -> Dict:
+    """Run fn and report wall time plus CPU seconds spent in this process and its ffmpeg children."""
+    before_self = resource.getrusage(resource.RUSAGE_SELF)
+    before_children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    wall = time.perf_counter() - start
+    after_self = resource.getrusage(resource.RUSAGE_SELF)
+    after_children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    cpu = (
+        (after_self.ru_utime - before_self.ru_utime) + (after_self.ru_stime - before_self.ru_stime)
+        + (after_children.ru_utime - before_children.ru_utime) + (after_children.ru_stime - before_children.ru_stime)
+    )
+    # High-water marks (KiB) of this process and of its largest child so far - see run_isolated
+    peak_rss = max(after_self.ru_maxrss, after_children.ru_maxrss) / 1024
+    return {"result": result, "wall_seconds": round(wall, 3), "cpu_seconds": round(cpu, 3), "peak_rss_mb": round(peak_rss, 1)}
+
+
+def compare_quality(reference: str, distorted: str) -> Dict:
+    """SSIM and PSNR of distorted against reference, over their common length."""
+    cmd = [
+        "ffmpeg", "-v", "info",
+        "-i", distorted, "-i", reference,
+        "-lavfi", "[0:v][1:v]ssim;[0:v][1:v]psnr",
+        "-f", "null", "-"
+    ]
+    result = subprocess.run(cmd, capture_output=True, text=True)
+    scores = {}
+    for line in result.stderr.splitlines():
+        if "SSIM" in line and "All:" in line:
+            scores["ssim"] = float(line.split("All:")[1].split()[0])
+        elif "PSNR" in line and "average:" in line:
+            value = line.split("average:")[1].split()[0]
+            scores["psnr_db"] = float("inf") if value == "inf" else float(value)
+    return scores
+
+
+@contextmanager
+def vp_settings(**settings):
+    """Set video_processor module settings for the block, restoring the previous values afterwards."""
+    saved = {name: getattr(vp, name) for name in settings}
+    for name, value in settings.items():
+        setattr(vp, name, value)
+    try:
+        yield
+    finally:
+        for name, value in saved.items():
+            setattr(vp, name, value)
+
+
+@contextmanager
+def isolated_caches(work_dir):
+    """
+    Point the renderer's probe, scene, source, typewriter and checkpoint
+    caches at work_dir, so a run starts cold and shares nothing, with
+    progress events off. The previous settings are restored afterwards.
+    """
+    work_dir = Path(work_dir)
+    with vp_settings(
+        PROBE_CACHE_PATH=work_dir / "probe_cache.json",
+        MEDIA_PROBE=vp.MediaProbeCache(work_dir / "probe_cache.json"),
+        SCENE_CACHE_DIR=work_dir / "scene_cache",
+        SCENE_CACHE=vp.SceneClipCache(work_dir / "scene_cache", vp.SCENE_CACHE_MAX_BYTES),
+        SOURCE_CACHE_DIR=work_dir / "source_cache",
+        TYPEWRITER_CACHE_DIR=work_dir / "typewriter_cache",
+        CHECKPOINT_DIR=work_dir / "checkpoints",
+        PROGRESS_FD="",
+    ):
+        yield work_dir
+
+
+def run_isolated(fn: Callable, *args):
+    """
+    Run fn(*args) in a freshly forked process. ru_maxrss only ever grows,
+    so each case needs a process (and children) of its own for its peak RSS.
+    """
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("fork")) as pool:
+        return pool.submit(fn, *args).result()
+
+
+def run_variants(tmp: str, render: Callable, variants: Dict[str, tuple]) -> Tuple[Dict, Dict]:
+    """
+    render(output, work_dir, *args) once per variant name -> args, each in a
+    forked process and a work directory of its own. Returns the results and
+    output paths by variant name.
+    """
+    results, outputs = {}, {}
+    for name, args in variants.items():
+        work_dir = os.path.join(tmp, name)
+        os.makedirs(work_dir)
+        outputs[name] = os.path.join(work_dir, "output.mp4")
+        results[name] = run_isolated(render, outputs[name], work_dir, *args)
+    return results, outputs
+
+
+def add_speedups(results: Dict, baseline: str):
+    """Give every successful variant its wall-time speedup over the baseline variant, if that succeeded."""
+    reference = results.get(baseline)
+    if not reference or not reference["success"]:
+        return
+    for name, result in results.items():
+        if name != baseline and result["success"]:
+            result["speedup"] = round(reference["wall_seconds"] / max(result["wall_seconds"], 1e-6), 2)
+
+
+# =============================================================================
+# BENCHMARKS
+# =============================================================================
+
+def benchmark_compile_modes(scenes: int = 4, seconds: float = 5.0, quality: str = "fast") -> Dict:
+    """
+    Render the same chapter through the scene-clip path (encode per scene,
+    then re-encode in the crossfade) and the single-pass compiler.
+    Reports wall/CPU time for both and the single-pass output's SSIM/PSNR
+    measured against the scene-clip output.
+    """
+    with tempfile.TemporaryDirectory(prefix="bench_compile_") as tmp, isolated_caches(tmp):
+        chapter = make_fixture_chapter(tmp, scenes, seconds)
+        results = {}
+        outputs = {}
+        for mode in ("scene_clips", "single_pass"):
+            outputs[mode] = os.path.join(tmp, f"{mode}.mp4")
+            run = measure(
+                vp.assemble_chapter_video_fast, chapter, outputs[mode],
+                quality=quality, use_cache=False, compile_mode=mode
+            )
+            results[mode] = {
+                "success": run["result"],
+                "wall_seconds": run["wall_seconds"],
+                "cpu_seconds": run["cpu_seconds"],
+                "duration": vp.get_video_duration_ffprobe(outputs[mode]) if run["result"] else None,
+                "bytes": os.path.getsize(outputs[mode]) if run["result"] else None,
+            }
+
+        if results["scene_clips"]["success"] and results["single_pass"]["success"]:
+            results["single_pass"]["vs_scene_clips"] = compare_quality(outputs["scene_clips"], outputs["single_pass"])
+            results["speedup"] = round(
+                results["scene_clips"]["wall_seconds"] / max(results["single_pass"]["wall_seconds"], 1e-6), 2
+            )
+        return {"benchmark": "compile_modes", "scenes": scenes, "seconds_per_scene": seconds, "quality": quality, **results}
+
+
+def benchmark_transitions(scenes: int = 8, seconds: float = 5.0, quality: str = "fast") -> Dict:
+    """
+    Time the crossfade step alone: full re-encode (concatenate_with_crossfade)
+    against the smart concat that re-encodes only the transition windows,
+    over the same keyframed scene clips. Also times a plain stream-copy
+    concat as the lower bound.
+    """
+    with tempfile.TemporaryDirectory(prefix="bench_transitions_") as tmp:
+        chapter = make_fixture_chapter(tmp, scenes, seconds)
+        plans = vp.plan_chapter_scenes(chapter)
+        clips = vp.render_scene_clips(
+            plans, Path(tmp), quality, use_cache=False,
+            transition_keyframes=vp.DEFAULT_TRANSITION_DURATION
+        )
+        outputs = {mode: os.path.join(tmp, f"{mode}.mp4") for mode in ("full", "smart", "copy")}
+        runs = {
+            "full": measure(vp.concatenate_with_crossfade, clips, outputs["full"]),
+            "smart": measure(vp.concatenate_with_smart_crossfade, clips, outputs["smart"], quality=quality, work_dir=tmp),
+            "copy": measure(vp.concatenate_videos_ffmpeg, clips, outputs["copy"]),
+        }
+        results = {
+            mode: {"success": run["result"], "wall_seconds": run["wall_seconds"], "cpu_seconds": run["cpu_seconds"]}
+            for mode, run in runs.items()
+        }
+        if results["full"]["success"] and results["smart"]["success"]:
+            results["smart"]["vs_full"] = compare_quality(outputs["full"], outputs["smart"])
+            results["speedup"] = round(results["full"]["wall_seconds"] / max(results["smart"]["wall_seconds"], 1e-6), 2)
+        return {"benchmark": "transitions", "scenes": len(clips), "seconds_per_scene": seconds, "quality": quality, **results}
+
+
+def benchmark_typewriter(seconds: float = 10.0, fps: int = 24) -> Dict:
+    """
+    Frame rate of the typewriter text filters alone: the per-character
+    drawtext chain against the pre-rendered reveal overlay, for a two-line
+    quote box and a chapter title, over a flat background with no encode.
+    The reveal engine's one-off clip render is reported separately (cold
+    cache), and its output is compared with the drawtext output by SSIM/PSNR
+    over a moving background.
+    """
+    texts = {
+        "quote_box": ("The war is lost, yet Hitler vows\nto remain in Berlin until the end.", "quote_box"),
+        "chapter_title": ("Chapter One: The Fall of Berlin", "chapter_title"),
+    }
+    frames = int(seconds * fps)
+    results = {}
+    with tempfile.TemporaryDirectory(prefix="bench_typewriter_") as tmp, isolated_caches(tmp):
+        for name, (text, style) in texts.items():
+            entry = {"characters": len(text)}
+            outputs = {}
+            for engine in ("drawtext", "reveal"):
+                built = measure(vp.build_typewriter_filter, text, style, start_time=0.5, fps=fps, engine=engine)
+                text_filter = built["result"]
+                graph = f"color=c=gray:s=1920x1080:r={fps}:d={seconds},{text_filter},format=yuv420p"
+                run = measure(subprocess.run, ["ffmpeg", "-v", "error", "-filter_complex", graph, "-f", "null", "-"], capture_output=True)
+                
+                outputs[engine] = os.path.join(tmp, f"{name}_{engine}.mkv")
+                graph = f"testsrc2=s=1920x1080:r={fps}:d={seconds},hue=s=0,{text_filter},format=yuv420p"
+                subprocess.run(["ffmpeg", "-y", "-v", "error", "-filter_complex", graph, "-c:v", "ffv1", outputs[engine]], capture_output=True)
+                
+                ok = run["result"].returncode == 0
+                entry[engine] = {
+                    "success": ok,
+                    "filter_nodes": text_filter.count("drawtext") + text_filter.count("drawbox") + 3 * text_filter.count("movie="),
+                    "prepare_seconds": built["wall_seconds"],
+                    "wall_seconds": run["wall_seconds"],
+                    "fps": round(frames / max(run["wall_seconds"], 1e-6), 1) if ok else None,
+                }
+            if entry["drawtext"]["success"] and entry["reveal"]["success"]:
+                entry["reveal"]["vs_drawtext"] = compare_quality(outputs["drawtext"], outputs["reveal"])
+                entry["speedup"] = round(entry["drawtext"]["wall_seconds"] / max(entry["reveal"]["wall_seconds"], 1e-6), 2)
+            results[name] = entry
+    return {"benchmark": "typewriter", "seconds": seconds, "fps": fps, **results}
+
+
+def benchmark_source_images(seconds: float = 8.0, quality: str = "fast", w: int = 4032, h: int = 3024) -> Dict:
+    """
+    Render one Ken Burns scene clip from a camera-sized JPEG, first with
+    ffmpeg decoding and scaling the original (Pillow disabled), then from the
+    prepared grayscale source. Reports the one-off preparation (cold cache)
+    separately, and the prepared output's SSIM/PSNR against the original's.
+    """
+    saved_image = vp.Image
+    results = {}
+    with tempfile.TemporaryDirectory(prefix="bench_sources_") as tmp, isolated_caches(tmp):
+        try:
+            image = make_fixture_image(os.path.join(tmp, "photo.jpg"), w, h)
+            prepared = measure(vp.prepare_source_image, image, vp.ken_burns_source_size(1920, 1080), fit="shrink")
+            outputs = {}
+            for mode in ("original", "prepared"):
+                vp.Image = None if mode == "original" else saved_image
+                outputs[mode] = os.path.join(tmp, f"{mode}.mp4")
+                run = measure(vp.create_scene_clip_ffmpeg, image, outputs[mode], seconds, quality=quality)
+                results[mode] = {"success": run["result"], "wall_seconds": run["wall_seconds"], "cpu_seconds": run["cpu_seconds"]}
+            results["prepared"]["prepare_seconds"] = prepared["wall_seconds"]
+            if results["original"]["success"] and results["prepared"]["success"]:
+                results["prepared"]["vs_original"] = compare_quality(outputs["original"], outputs["prepared"])
+                results["speedup"] = round(
+                    results["original"]["wall_seconds"] / max(results["prepared"]["wall_seconds"], 1e-6), 2
+                )
+        finally:
+            vp.Image = saved_image
+    return {"benchmark": "source_images", "source": f"{w}x{h}", "seconds": seconds, "quality": quality, **results}
+
+
+def benchmark_ken_burns(seconds: float = 5.0, fps: int = 24, presets: Optional[List[str]] = None) -> Dict:
+    """
+    Ken Burns motion alone, for every preset: zoompan inside ffmpeg against
+    the warp engine piping OpenCV frames into ffmpeg, both from the same
+    prepared source and discarded at the null muxer. CPU time covers this
+    process (the warp loop) and ffmpeg. The warp output is compared with
+    zoompan's by SSIM/PSNR over the whole move.
+    """
+    w, h = 1920, 1080
+    frames = int(seconds * fps)
+    raw_input = ["-f", "rawvideo", "-pix_fmt", "gray", "-s", f"{w}x{h}", "-r", str(fps), "-i", "-"]
+    results = {}
+    with tempfile.TemporaryDirectory(prefix="bench_ken_burns_") as tmp, isolated_caches(tmp):
+        image = make_fixture_image(os.path.join(tmp, "photo.jpg"), 4032, 3024)
+        source = vp.prepare_source_image(image, vp.ken_burns_source_size(w, h), fit="shrink")
+        for effect in presets or list(vp.KEN_BURNS_PRESETS):
+            zoompan = ["ffmpeg", "-v", "error", "-loop", "1", "-i", source, "-vf", vp.build_zoompan_filter(effect, frames, w, h, fps), "-frames:v", str(frames)]
+            runs = {
+                "zoompan": measure(subprocess.run, zoompan + ["-f", "null", "-"], capture_output=True),
+                "warp": measure(vp.pipe_ken_burns_frames, ["ffmpeg", "-v", "error", *raw_input, "-f", "null", "-"], source, effect, frames, frames, w, h),
+            }
+            entry = {}
+            for engine, run in runs.items():
+                ok = run["result"].returncode == 0
+                entry[engine] = {
+                    "success": ok,
+                    "fps": round(frames / max(run["wall_seconds"], 1e-6), 1) if ok else None,
+                    "cpu_seconds": run["cpu_seconds"],
+                }
+            
+            outputs = {engine: os.path.join(tmp, f"{effect}_{engine}.mkv") for engine in runs}
+            subprocess.run(zoompan + ["-c:v", "ffv1", "-y", outputs["zoompan"]], capture_output=True)
+            vp.pipe_ken_burns_frames(["ffmpeg", "-v", "error", "-y", *raw_input, "-c:v", "ffv1", outputs["warp"]], source, effect, frames, frames, w, h)
+            if entry["zoompan"]["success"] and entry["warp"]["success"]:
+                entry["warp"]["vs_zoompan"] = compare_quality(outputs["zoompan"], outputs["warp"])
+                entry["speedup"] = round(runs["zoompan"]["wall_seconds"] / max(runs["warp"]["wall_seconds"], 1e-6), 2)
+            results[effect] = entry
+    
+    speedups = [entry["speedup"] for entry in results.values() if "speedup" in entry]
+    return {
+        "benchmark": "ken_burns", "seconds": seconds, "fps": fps,
+        "mean_speedup": round(sum(speedups) / len(speedups), 2) if speedups else None,
+        "presets": results,
+    }
+
+
+def benchmark_draft(scenes: int = 4, seconds: float = 5.0) -> Dict:
+    """
+    Time to a watchable cut: the draft tier against the final "high" render
+    of the same chapter (scene clips, cold cache), with output sizes.
+    """
+    with tempfile.TemporaryDirectory(prefix="bench_draft_") as tmp, isolated_caches(tmp):
+        chapter = make_fixture_chapter(tmp, scenes, seconds)
+        chapter["scenes"][0]["location_text"] = "Berlin, April 1945"
+        results = {}
+        for quality in ("draft", "high"):
+            output = os.path.join(tmp, f"{quality}.mp4")
+            run = measure(vp.assemble_chapter_video_fast, chapter, output, quality=quality, use_cache=False)
+            results[quality] = {
+                "success": run["result"],
+                "wall_seconds": run["wall_seconds"],
+                "cpu_seconds": run["cpu_seconds"],
+                "duration": vp.get_video_duration_ffprobe(output) if run["result"] else None,
+                "bytes": os.path.getsize(output) if run["result"] else None,
+            }
+        if results["draft"]["success"] and results["high"]["success"]:
+            results["speedup"] = round(results["high"]["wall_seconds"] / max(results["draft"]["wall_seconds"], 1e-6), 2)
+        return {"benchmark": "draft", "scenes": scenes, "seconds_per_scene": seconds, **results}
+
+
+def mix_audio(inputs: List[str], output: str, codec_args: List[str], fade: float = 0.0, pad_to: Optional[float] = None) -> bool:
+    """One audio generation of the render pipeline: pad a narration, or acrossfade clips together."""
+    cmd = ["ffmpeg", "-y", "-v", "error"]
+    for path in inputs:
+        cmd.extend(["-i", path])
+    if pad_to is not None:
+        cmd.extend(["-af", f"apad=whole_dur={pad_to}", "-t", str(pad_to)])
+    elif len(inputs) > 1:
+        chain = []
+        previous = "0:a"
+        for i in range(1, len(inputs)):
+            chain.append(f"[{previous}][{i}:a]acrossfade=d={fade}[a{i}]")
+            previous = f"a{i}"
+        cmd.extend(["-filter_complex", ";".join(chain), "-map", f"[{previous}]"])
+    cmd.extend(["-vn", *codec_args, output])
+    return subprocess.run(cmd, capture_output=True).returncode == 0
+
+
+def benchmark_audio(chapters: int = 3, scenes: int = 6, seconds: float = 20.0) -> Dict:
+    """
+    Time the audio path of assemble_full on its own: narration padded into
+    scene clips, crossfaded into chapters, crossfaded into the video. Runs
+    the chain with AAC at every stage (three lossy generations) and with
+    lossless intermediates and one final AAC encode, as the renderer does.
+    """
+    fade = vp.DEFAULT_TRANSITION_DURATION
+    chains = {
+        "aac_every_stage": (vp.audio_codec_args(final=True), vp.audio_codec_args(final=True)),
+        "lossless_intermediates": (vp.audio_codec_args(final=False), vp.audio_codec_args(final=True)),
+    }
+    with tempfile.TemporaryDirectory(prefix="bench_audio_") as tmp:
+        narrations = [
+            make_fixture_audio(os.path.join(tmp, f"narration_{i}.wav"), seconds - 0.4, 220 + 20 * i, noise=i % 2 == 1)
+            for i in range(scenes)
+        ]
+        results = {}
+        for name, (intermediate, final) in chains.items():
+            stages = {"scene": [], "chapter": [], "project": []}
+            chapter_files = []
+            for c in range(chapters):
+                scene_files = []
+                for i, narration in enumerate(narrations):
+                    scene_file = os.path.join(tmp, f"{name}_c{c}_s{i}.mp4")
+                    run = measure(mix_audio, [narration], scene_file, intermediate, pad_to=seconds)
+                    stages["scene"].append(run)
+                    scene_files.append(scene_file)
+                chapter_file = os.path.join(tmp, f"{name}_chapter_{c}.mp4")
+                stages["chapter"].append(measure(mix_audio, scene_files, chapter_file, intermediate, fade))
+                chapter_files.append(chapter_file)
+            output = os.path.join(tmp, f"{name}.m4a")
+            stages["project"].append(measure(mix_audio, chapter_files, output, final, fade))
+            ok = all(run["result"] for runs in stages.values() for run in runs)
+            results[name] = {
+                "success": ok,
+                **{
+                    f"{stage}_cpu_seconds": round(sum(run["cpu_seconds"] for run in runs), 3)
+                    for stage, runs in stages.items()
+                },
+                "wall_seconds": round(sum(run["wall_seconds"] for runs in stages.values() for run in runs), 3),
+                "cpu_seconds": round(sum(run["cpu_seconds"] for runs in stages.values() for run in runs), 3),
+                "duration": vp.get_video_duration_ffprobe(output) if ok else None,
+            }
+        if all(result["success"] for result in results.values()):
+            results["speedup"] = round(
+                results["aac_every_stage"]["cpu_seconds"] / max(results["lossless_intermediates"]["cpu_seconds"], 1e-6), 2
+            )
+        return {"benchmark": "audio", "chapters": chapters, "scenes_per_chapter": scenes, "seconds_per_scene": seconds, **results}
+
+
+def directory_bytes(path: Path) -> int:
+    return sum(entry.stat().st_size for entry in Path(path).rglob("*") if entry.is_file())
+
+
+def render_with_mezzanine(output: str, work_dir: str, project: Dict, quality: str, mezzanine: str) -> Dict:
+    """
+    One assemble_full with MEZZANINE_FORMAT set. incremental keeps every
+    scene clip and chapter in the checkpoint, to be weighed afterwards.
+    """
+    vp.MEZZANINE_FORMAT = mezzanine
+    with isolated_caches(work_dir):
+        run = measure(
+            vp.assemble_full_video_fast, project, output, quality=quality, use_cache=False, incremental=True
+        )
+        intermediate_bytes = directory_bytes(vp.CHECKPOINT_DIR)
+    return {
+        "success": run["result"],
+        "wall_seconds": run["wall_seconds"],
+        "cpu_seconds": run["cpu_seconds"],
+        "intermediate_bytes": intermediate_bytes,
+        "output_bytes": os.path.getsize(output) if run["result"] else None,
+    }
+
+
+def benchmark_mezzanine(
+    chapters: int = 2,
+    scenes: int = 3,
+    seconds: float = 5.0,
+    quality: str = "fast",
+    formats: Optional[List[str]] = None
+) -> Dict:
+    """
+    Total assemble_full time and intermediate disk usage (scene clips and
+    chapters) per intermediate video format, with full crossfades so every
+    stage re-encodes. Outputs are scored with SSIM/PSNR against the
+    "delivery" render, where every generation uses the quality tier.
+    """
+    formats = formats or list(vp.MEZZANINE_CODECS)
+    with tempfile.TemporaryDirectory(prefix="bench_mezzanine_") as tmp:
+        project = make_fixture_project(os.path.join(tmp, "fixtures"), chapters, scenes, seconds)
+        results, outputs = run_variants(
+            tmp, render_with_mezzanine, {mezzanine: (project, quality, mezzanine) for mezzanine in formats}
+        )
+        add_speedups(results, "delivery")
+        for mezzanine, result in results.items():
+            if "speedup" in result:
+                result["vs_delivery"] = compare_quality(outputs["delivery"], outputs[mezzanine])
+        return {
+            "benchmark": "mezzanine", "chapters": chapters, "scenes_per_chapter": scenes,
+            "seconds_per_scene": seconds, "quality": quality, **results
+        }
+
+
+def render_ladder(output: str, work_dir: str, project: Dict, quality: str, profiles: List[str], separate: bool) -> Dict:
+    """
+    One assemble_full plus renditions: branched from the final encode, or
+    (separate) one transcode of the master per profile.
+    """
+    renditions = vp.rendition_paths(output, profiles)
+
+    def render() -> bool:
+        if not separate:
+            return vp.assemble_full_video_fast(project, output, quality=quality, use_cache=False, renditions=renditions)
+        if not vp.assemble_full_video_fast(project, output, quality=quality, use_cache=False):
+            return False
+        return all(vp.transcode_renditions(output, {profile: path}, quality) for profile, path in renditions.items())
+
+    with isolated_caches(work_dir):
+        run = measure(render)
+    return {
+        "success": run["result"],
+        "wall_seconds": run["wall_seconds"],
+        "cpu_seconds": run["cpu_seconds"],
+        "bytes": {
+            profile: os.path.getsize(path) if run["result"] else None
+            for profile, path in {"master": output, **renditions}.items()
+        },
+    }
+
+
+def benchmark_ladder(
+    chapters: int = 2,
+    scenes: int = 2,
+    seconds: float = 5.0,
+    quality: str = "fast",
+    profiles: Optional[List[str]] = None
+) -> Dict:
+    """
+    A master plus renditions (default 720p and vertical) written in one pass
+    - split from the final encode's composed frames - against rendering the
+    master and transcoding it once per profile. Each one-pass rendition is
+    scored with SSIM/PSNR against its transcoded counterpart.
+    """
+    profiles = profiles or ["720p", "vertical"]
+    with tempfile.TemporaryDirectory(prefix="bench_ladder_") as tmp:
+        project = make_fixture_project(os.path.join(tmp, "fixtures"), chapters, scenes, seconds)
+        results, outputs = run_variants(tmp, render_ladder, {
+            mode: (project, quality, profiles, mode == "separate") for mode in ("separate", "one_pass")
+        })
+        add_speedups(results, "separate")
+        if "speedup" in results["one_pass"]:
+            one_pass = vp.rendition_paths(outputs["one_pass"], profiles)
+            separate = vp.rendition_paths(outputs["separate"], profiles)
+            results["one_pass"]["vs_separate"] = {
+                profile: compare_quality(separate[profile], one_pass[profile]) for profile in profiles
+            }
+        return {
+            "benchmark": "ladder", "chapters": chapters, "scenes_per_chapter": scenes,
+            "seconds_per_scene": seconds, "quality": quality, "profiles": profiles, **results
+        }
+
+
+def render_with_pipeline(output: str, work_dir: str, project: Dict, quality: str, depth: int) -> Dict:
+    """One assemble_full with PIPELINE_DEPTH set."""
+    vp.PIPELINE_DEPTH = depth
+    with isolated_caches(work_dir):
+        run = measure(vp.assemble_full_video_fast, project, output, quality=quality, use_cache=False, resume=False)
+    return {"success": run["result"], "wall_seconds": run["wall_seconds"], "cpu_seconds": run["cpu_seconds"]}
+
+
+def benchmark_pipeline(
+    chapters: int = 3,
+    scenes: int = 3,
+    seconds: float = 5.0,
+    quality: str = "fast",
+    depths: Optional[List[int]] = None
+) -> Dict:
+    """
+    assemble_full with chapters stitched strictly after their scenes
+    (depth 0) against the pipelined render, where the next chapter's scenes
+    render while the last one is crossfaded (full crossfades, cold caches).
+    Gains need spare cores: on one core the stages only take turns.
+    """
+    depths = depths if depths is not None else [0, 1]
+    with tempfile.TemporaryDirectory(prefix="bench_pipeline_") as tmp:
+        project = make_fixture_project(os.path.join(tmp, "fixtures"), chapters, scenes, seconds)
+        results, _ = run_variants(
+            tmp, render_with_pipeline, {f"depth_{depth}": (project, quality, depth) for depth in depths}
+        )
+        add_speedups(results, "depth_0")
+        return {
+            "benchmark": "pipeline", "chapters": chapters, "scenes_per_chapter": scenes,
+            "seconds_per_scene": seconds, "quality": quality, "cpu_count": os.cpu_count(), **results
+        }
+
+
+def scheduled_render(fixtures: Dict, output: str, priority: str, delay: float) -> Dict:
+    """A forked render at a priority, started after delay: a chapter in the background, else a preview scene."""
+    time.sleep(delay)
+    with isolated_caches(Path(output).with_suffix("")), vp.render_priority(priority):
+        if priority == "background":
+            run = measure(vp.assemble_chapter_video_fast, fixtures["chapter"], output, quality="fast", use_cache=False)
+        else:
+            run = measure(vp.create_scene_clip_ffmpeg, fixtures["image"], output, fixtures["seconds"], quality="fast")
+    return {"success": run["result"], "wall_seconds": run["wall_seconds"]}
+
+
+def benchmark_scheduler(background: int = 3, scenes: int = 3, seconds: float = 5.0) -> Dict:
+    """
+    Several background chapter renders in separate processes, plus an
+    interactive preview scene started a second later - with every ffmpeg
+    unmanaged, and with the host scheduler's thread budget and priorities.
+    Reports the preview's latency and the time until every render is done.
+    """
+    with tempfile.TemporaryDirectory(prefix="bench_scheduler_") as tmp:
+        chapter = make_fixture_chapter(os.path.join(tmp, "fixtures"), scenes, seconds)
+        fixtures = {"chapter": chapter, "image": chapter["scenes"][0]["image_path"], "seconds": seconds}
+        results = {}
+        for mode in ("unmanaged", "scheduled"):
+            work_dir = Path(tmp) / mode
+            work_dir.mkdir()
+            jobs = [("background", 0.0)] * background + [("interactive", 1.0)]
+            scheduler = vp.RenderScheduler(work_dir / "scheduler", os.cpu_count() or 1) if mode == "scheduled" else None
+            start = time.perf_counter()
+            # Forked renders inherit the scheduler (or its absence) from here
+            with vp_settings(RENDER_SCHEDULER=scheduler), ProcessPoolExecutor(
+                max_workers=len(jobs), mp_context=multiprocessing.get_context("fork")
+            ) as pool:
+                futures = [
+                    pool.submit(scheduled_render, fixtures, str(work_dir / f"{priority}_{i}.mp4"), priority, delay)
+                    for i, (priority, delay) in enumerate(jobs)
+                ]
+                runs = [future.result() for future in futures]
+            results[mode] = {
+                "success": all(run["success"] for run in runs),
+                "total_wall_seconds": round(time.perf_counter() - start, 3),
+                "preview_wall_seconds": runs[-1]["wall_seconds"],
+                "background_wall_seconds": [run["wall_seconds"] for run in runs[:-1]],
+            }
+        return {
+            "benchmark": "scheduler", "background_renders": background, "scenes_per_chapter": scenes,
+            "seconds_per_scene": seconds, "cpu_count": os.cpu_count(), **results
+        }
+
+
+def render_with_deadline(output: str, work_dir: str, project: Dict, quality: str, deadline: Optional[float]) -> Dict:
+    """One assemble_full against a deadline (None: the tier's own preset)."""
+    report = {}
+    with isolated_caches(work_dir):
+        run = measure(
+            vp.assemble_full_video_fast, project, output,
+            quality=quality, use_cache=False, resume=False, report=report, deadline=deadline
+        )
+    encoder = report.get("encoder", {})
+    return {
+        "success": run["result"],
+        "wall_seconds": run["wall_seconds"],
+        "preset": encoder.get("preset"),
+        "on_time": encoder.get("on_time"),
+        "size_bytes": os.path.getsize(output) if run["result"] else None,
+    }
+
+
+def benchmark_deadline(
+    chapters: int = 2,
+    scenes: int = 3,
+    seconds: float = 5.0,
+    quality: str = "high",
+    deadlines: Optional[List[float]] = None
+) -> Dict:
+    """
+    assemble_full at the tier's own preset against the same project with
+    deadlines: the preset each deadline picked, whether it was met, and the
+    size and quality given up for it. The host is calibrated first (cached
+    in the scratch directory, so each run measures afresh).
+    """
+    deadlines = deadlines if deadlines is not None else [30.0, 60.0, 120.0]
+    with tempfile.TemporaryDirectory(prefix="bench_deadline_") as tmp, isolated_caches(tmp):
+        project = make_fixture_project(os.path.join(tmp, "fixtures"), chapters, scenes, seconds)
+        # Forked renders inherit the calibration file
+        with vp_settings(CALIBRATION_PATH=Path(tmp) / "calibration.json"):
+            calibration = measure(vp.calibrate_encoder, quality)
+            results, outputs = run_variants(tmp, render_with_deadline, {
+                (f"deadline_{deadline:g}" if deadline else "tier_preset"): (project, quality, deadline)
+                for deadline in [None, *deadlines]
+            })
+            add_speedups(results, "tier_preset")
+            for name, result in results.items():
+                if "speedup" in result:
+                    result["vs_tier_preset"] = compare_quality(outputs["tier_preset"], outputs[name])
+        return {
+            "benchmark": "deadline", "chapters": chapters, "scenes_per_chapter": scenes,
+            "seconds_per_scene": seconds, "quality": quality, "cpu_count": os.cpu_count(),
+            "calibration": {**calibration["result"], "wall_seconds": calibration["wall_seconds"]}, **results
+        }
+
+
+# =============================================================================
+# SUITE - every render entry point, one isolated case at a time, diffable baseline
+# =============================================================================
+
+# Quote used for every text style and text-bearing builder
+SAMPLE_TEXT = "The war is lost, yet Hitler vows\nto remain in Berlin until the end."
+
+# Styles the planner animates with the typewriter effect
+TYPEWRITER_STYLES = {"chapter_title", "location_text", "quote_box"}
+
+# Specialty scene builders, called as (fixtures, output, seconds, resolution)
+SCENE_BUILDERS = {
+    "letterbox": lambda fx, output, seconds, resolution: vp.create_letterbox_scene(
+        fx["image"], output, "The last days of the Reich", seconds, fx["audio"], resolution=resolution),
+    "pip": lambda fx, output, seconds, resolution: vp.create_pip_scene(
+        fx["image"], fx["portrait"], output, seconds, fx["audio"], resolution=resolution),
+    "quote_box": lambda fx, output, seconds, resolution: vp.create_quote_box_scene(
+        fx["image"], output, SAMPLE_TEXT, seconds, fx["audio"], resolution=resolution),
+    "date_stamp": lambda fx, output, seconds, resolution: vp.create_date_stamp_scene(
+        fx["image"], output, "APRIL 30, 1945", seconds, fx["audio"], resolution=resolution),
+    "split_screen": lambda fx, output, seconds, resolution: vp.create_split_screen_scene(
+        fx["image"], fx["portrait"], output, seconds, fx["audio"], resolution=resolution),
+    "portrait_title": lambda fx, output, seconds, resolution: vp.create_portrait_title_card(
+        fx["image"], fx["portrait"], output, "Adolf Hitler", "1889 - 1945", seconds, fx["audio"], resolution=resolution),
+    "title_card": lambda fx, output, seconds, resolution: vp.create_title_card(
+        "1945", output, "year_title", seconds, background_image=fx["image"], resolution=resolution),
+}
+
+# Project sizes for assemble_full: name -> (chapters, scenes per chapter)
+SUITE_PROJECTS = {"small": (2, 2), "medium": (3, 4)}
+
+
+def measure_case(case: Dict, fixtures: Dict, output: str) -> Dict:
+    """Render one suite case to output, measured."""
+    seconds, resolution = case["seconds"], tuple(case["resolution"])
+    if case["kind"] == "scene_clip":
+        fps = 24
+        if case["quality"] == "draft":
+            fps, resolution = vp.render_format("draft")
+        style = case.get("style")
+        overlay = {"text": SAMPLE_TEXT, "style": style, "typewriter": style in TYPEWRITER_STYLES, "start_time": 0.5} if style else None
+        run = measure(
+            vp.create_scene_clip_ffmpeg, fixtures["image"], output, seconds, fixtures["audio"],
+            case.get("effect", "zoom_in_center"), fps=fps, resolution=resolution, quality=case["quality"], text_overlay=overlay
+        )
+    elif case["kind"] == "builder":
+        run = measure(SCENE_BUILDERS[case["builder"]], fixtures, output, seconds, resolution)
+    elif case["kind"] == "crossfade":
+        run = measure(vp.concatenate_with_crossfade, fixtures["clips"], output, quality=case["quality"])
+    elif case["kind"] == "assemble_full_ndjson":
+        # Streamed chapters (a ChapterStream) through the CLI's manifest path and the chapter pipeline
+        run = measure(
+            vp.run_command, "assemble_full",
+            {"manifest": fixtures["manifests"][case["project"]], "output": output, "quality": case["quality"], "cache": False, "resume": False}
+        )
+        run["result"] = run["result"].get("success")
+    else:
+        run = measure(
+            vp.assemble_full_video_fast, fixtures["projects"][case["project"]], output,
+            quality=case["quality"], use_cache=False, resume=False
+        )
+    return run
+
+
+def run_case(case: Dict, fixtures: Dict, work_dir: str) -> Dict:
+    """Run one suite case with cold caches of its own and measure it."""
+    case_dir = Path(work_dir) / case["name"].replace("/", "_")
+    case_dir.mkdir(parents=True)
+    output = str(case_dir / "output.mp4")
+    with isolated_caches(case_dir):
+        run = measure_case(case, fixtures, output)
+    
+    ok = bool(run["result"])
+    stream = vp.probe_video_stream(output) if ok else None
+    frames = int(stream["nb_frames"]) if stream and str(stream.get("nb_frames", "")).isdigit() else None
+    return {
+        "success": ok,
+        "wall_seconds": run["wall_seconds"],
+        "cpu_seconds": run["cpu_seconds"],
+        "peak_rss_mb": run["peak_rss_mb"],
+        "frames": frames,
+        "encode_fps": round(frames / max(run["wall_seconds"], 1e-6), 1) if frames else None,
+    }
+
+
+def suite_cases(
+    seconds: float,
+    resolution: tuple,
+    qualities: List[str],
+    presets: List[str],
+    styles: List[str],
+    builders: List[str],
+    projects: List[str]
+) -> List[Dict]:
+    """Every case the suite can run: quality tiers, presets and styles go through create_scene_clip_ffmpeg."""
+    base = {"seconds": seconds, "resolution": list(resolution)}
+    cases = [{**base, "name": f"scene_clip/quality/{q}", "kind": "scene_clip", "quality": q} for q in qualities]
+    cases += [{**base, "name": f"scene_clip/preset/{e}", "kind": "scene_clip", "quality": "fast", "effect": e} for e in presets]
+    cases += [{**base, "name": f"scene_clip/style/{st}", "kind": "scene_clip", "quality": "fast", "style": st} for st in styles]
+    cases += [{**base, "name": f"builder/{b}", "kind": "builder", "builder": b} for b in builders]
+    cases += [{**base, "name": f"crossfade/{q}", "kind": "crossfade", "quality": q} for q in qualities if q != "draft"]
+    cases += [
+        {**base, "name": f"assemble_full/{p}/{q}", "kind": "assemble_full", "project": p, "quality": q}
+        for p in projects for q in qualities
+    ]
+    cases += [
+        {**base, "name": f"assemble_full_ndjson/{p}", "kind": "assemble_full_ndjson", "project": p, "quality": "fast"}
+        for p in projects
+    ]
+    return cases
+
+
+def diff_baselines(old: Dict, new: Dict, tolerance: float = 0.10) -> Dict:
+    """
+    Ratios (new / old) of wall time, CPU time and peak RSS per case both
+    baselines ran successfully. Cases more than tolerance slower are
+    regressions; cases that stopped succeeding are failures.
+    """
+    cases, regressions, failures = {}, [], []
+    old_cases = old.get("cases", {})
+    for name, now in new.get("cases", {}).items():
+        before = old_cases.get(name)
+        if not before or not before["success"]:
+            continue
+        if not now["success"]:
+            failures.append(name)
+            continue
+        ratios = {
+            f"{metric}_ratio": round(now[metric] / max(before[metric], 1e-6), 3)
+            for metric in ("wall_seconds", "cpu_seconds", "peak_rss_mb")
+        }
+        cases[name] = ratios
+        if ratios["wall_seconds_ratio"] > 1 + tolerance:
+            regressions.append(name)
+    return {
+        "tolerance": tolerance,
+        "regressions": regressions,
+        "failures": failures,
+        "not_run": sorted(set(old_cases) - set(new.get("cases", {}))),
+        "cases": cases,
+    }
+
+
+def benchmark_suite(
+    seconds: float = 3.0,
+    resolution: List[int] = (1920, 1080),
+    qualities: Optional[List[str]] = None,
+    presets: Optional[List[str]] = None,
+    styles: Optional[List[str]] = None,
+    builders: Optional[List[str]] = None,
+    projects: Optional[List[str]] = None,
+    only: Optional[List[str]] = None,
+    output: Optional[str] = None,
+    compare: Optional[str] = None,
+    tolerance: float = 0.10
+) -> Dict:
+    """
+    Wall time, encode fps, CPU seconds and peak RSS of every render entry
+    point: create_scene_clip_ffmpeg per quality tier, Ken Burns preset and
+    TEXT_STYLES style, each create_* builder, concatenate_with_crossfade and
+    assemble_full_video_fast on multi-chapter projects of SUITE_PROJECTS
+    sizes, given as JSON and as an NDJSON manifest. Each case runs in its
+    own process with cold caches. The `only` parameter keeps the cases whose
+    name starts with one of its prefixes. The result is a baseline: `output`
+    saves it, `compare` diffs it against a saved one.
+    """
+    cases = suite_cases(
+        seconds, resolution,
+        qualities or ["draft", "fast", "high"],
+        presets or list(vp.KEN_BURNS_PRESETS),
+        styles or list(vp.TEXT_STYLES),
+        builders or list(SCENE_BUILDERS),
+        projects or list(SUITE_PROJECTS)
+    )
+    if only:
+        cases = [case for case in cases if any(case["name"].startswith(prefix) for prefix in only)]
+    
+    results = {}
+    with tempfile.TemporaryDirectory(prefix="bench_suite_") as tmp:
+        fixtures = {
+            "image": make_fixture_image(os.path.join(tmp, "still.png")),
+            "portrait": make_fixture_image(os.path.join(tmp, "portrait.png"), 1080, 1440),
+            "audio": make_fixture_audio(os.path.join(tmp, "narration.wav"), seconds),
+            "projects": {},
+            "manifests": {},
+        }
+        kinds = {case["kind"] for case in cases}
+        if "crossfade" in kinds:
+            fixtures["clips"] = []
+            for i, effect in enumerate(list(vp.KEN_BURNS_PRESETS)[:4]):
+                clip = os.path.join(tmp, f"clip_{i}.mp4")
+                vp.create_scene_clip_ffmpeg(fixtures["image"], clip, seconds, fixtures["audio"], effect, resolution=tuple(resolution), quality="fast")
+                fixtures["clips"].append(clip)
+        for name in {case["project"] for case in cases if case["kind"] in ("assemble_full", "assemble_full_ndjson")}:
+            chapters, scenes = SUITE_PROJECTS[name]
+            fixtures["projects"][name] = make_fixture_project(os.path.join(tmp, f"project_{name}"), chapters, scenes, seconds)
+            fixtures["manifests"][name] = write_fixture_ndjson(fixtures["projects"][name], os.path.join(tmp, f"project_{name}.ndjson"))
+        
+        for case in cases:
+            print(f"Suite: {case['name']}", file=sys.stderr)
+            results[case["name"]] = run_isolated(run_case, case, fixtures, tmp)
+    
+    ffmpeg_version = subprocess.run(["ffmpeg", "-version"], capture_output=True, text=True).stdout.split("\n")[0]
+    baseline = {
+        "benchmark": "suite",
+        "host": {"cpus": os.cpu_count(), "python": platform.python_version(), "ffmpeg": ffmpeg_version},
+        "seconds": seconds,
+        "resolution": list(resolution),
+        "cases": results,
+    }
+    if output:
+        with open(output, "w") as f:
+            json.dump(baseline, f, indent=2)
+    if compare:
+        with open(compare) as f:
+            baseline["vs_baseline"] = diff_baselines(json.load(f), baseline, tolerance)
+    return baseline
+
+
+def benchmark_diff(old: str, new: str, tolerance: float = 0.10) -> Dict:
+    """Diff two saved suite baselines (see diff_baselines)."""
+    with open(old) as f_old, open(new) as f_new:
+        return diff_baselines(json.load(f_old), json.load(f_new), tolerance)
+
+
+BENCHMARKS = {
+    "compile": benchmark_compile_modes,
+    "transitions": benchmark_transitions,
+    "typewriter": benchmark_typewriter,
+    "source_images": benchmark_source_images,
+    "ken_burns": benchmark_ken_burns,
+    "draft": benchmark_draft,
+    "audio": benchmark_audio,
+    "mezzanine": benchmark_mezzanine,
+    "ladder": benchmark_ladder,
+    "pipeline": benchmark_pipeline,
+    "scheduler": benchmark_scheduler,
+    "deadline": benchmark_deadline,
+    "suite": benchmark_suite,
+    "diff": benchmark_diff,
+}
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2 or sys.argv[1] not in BENCHMARKS:
+        print("Usage: python benchmarks.py <benchmark> [json_config]")
+        print(f"Benchmarks: {', '.join(BENCHMARKS)}")
+        sys.exit(1)
+
+    config = json.loads(sys.argv[2]) if len(sys.argv) > 2 else {}
+    print(json.dumps(BENCHMARKS[sys.argv[1]](**config), indent=2))
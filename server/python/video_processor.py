@@ -6,17 +6,148 @@ VidRush-style Ken Burns effects, crossfade transitions, and cinematic look.
 """
 
 import os
+import io
+import re
+import math
 import sys
 import json
 import subprocess
 import tempfile
 import random
+import struct
+import hashlib
+import itertools
+import shutil
+import threading
+import time
+import contextvars
+import functools
+import inspect
+import queue
+import fcntl
+import platform
+import socketserver
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from pathlib import Path
 from typing import List, Dict, Optional, Tuple
 
+try:
+    from PIL import Image, ImageCms, ImageOps
+except ImportError:  # without Pillow ffmpeg decodes the original source images
+    Image = None
+
+try:
+    import cv2
+    import numpy as np
+except ImportError:  # the "warp" Ken Burns engine falls back to zoompan
+    cv2 = None
+
 OUTPUT_DIR = Path("./generated_videos")
 TEMP_DIR = Path("./temp_processing")
 
+# Scene render concurrency - 0 means derive from the CPU count
+RENDER_WORKERS = int(os.environ.get("VIDEO_RENDER_WORKERS", "0"))
+# Total x264 threads shared by all concurrent scene encoders - 0 means all cores
+RENDER_THREAD_BUDGET = int(os.environ.get("VIDEO_RENDER_THREADS", "0"))
+
+# Jobs the render daemon runs at once - each job already spreads over the thread budget
+DAEMON_WORKERS = max(1, int(os.environ.get("VIDEO_DAEMON_WORKERS", "1")))
+
+# Persistent ffprobe results, keyed by path + size + mtime
+PROBE_CACHE_PATH = Path(os.environ.get("VIDEO_PROBE_CACHE", str(TEMP_DIR / "probe_cache.json")))
+
+# Persistent content-addressed cache of rendered scene clips
+SCENE_CACHE_DIR = Path(os.environ.get("VIDEO_SCENE_CACHE_DIR", str(TEMP_DIR / "scene_cache")))
+SCENE_CACHE_MAX_BYTES = int(float(os.environ.get("VIDEO_SCENE_CACHE_MAX_GB", "10")) * 1024 ** 3)
+
+# Checkpoints of unfinished full-project renders, resumed when the same project is assembled again
+CHECKPOINT_DIR = Path(os.environ.get("VIDEO_CHECKPOINT_DIR", str(TEMP_DIR / "checkpoints")))
+# Checkpoints of projects nobody re-rendered for this long are deleted
+CHECKPOINT_MAX_AGE_DAYS = float(os.environ.get("VIDEO_CHECKPOINT_MAX_AGE_DAYS", "7"))
+
+# Source images decoded once, graded and resized for the filter graph, keyed by content hash
+SOURCE_CACHE_DIR = Path(os.environ.get("VIDEO_SOURCE_CACHE_DIR", str(TEMP_DIR / "source_cache")))
+
+# Pre-rendered typewriter reveal clips, keyed by the drawtext chain they replace
+TYPEWRITER_CACHE_DIR = Path(os.environ.get("VIDEO_TYPEWRITER_CACHE_DIR", str(TEMP_DIR / "typewriter_cache")))
+# "reveal" overlays one pre-rendered clip per text, "drawtext" chains two filters per character
+TYPEWRITER_ENGINE = os.environ.get("VIDEO_TYPEWRITER_ENGINE", "reveal")
+# Unique graph labels for reveal overlays (several can share one filter graph)
+TYPEWRITER_LABELS = itertools.count()
+
+# "zoompan" moves the camera inside ffmpeg, "warp" renders sub-pixel frames with OpenCV and pipes them in
+KEN_BURNS_ENGINE = os.environ.get("VIDEO_KEN_BURNS_ENGINE", "zoompan")
+
+# Draft tier - a quick preview cut at low resolution and frame rate, later replaced by the final render
+DRAFT_RESOLUTION = (640, 360)
+DRAFT_FPS = 12
+
+# Progress events outside the render daemon go to this file descriptor as JSON lines - empty turns them off
+# (stderr is the render log, which callers keep whole)
+PROGRESS_FD = os.environ.get("VIDEO_PROGRESS_FD", "")
+
+# Host-wide scheduler shared by every video_processor process: state under SCHEDULER_DIR, a budget
+# of HOST_THREADS ffmpeg threads (0 = all cores). VIDEO_SCHEDULER=0 lets every ffmpeg run unmanaged.
+SCHEDULER_ENABLED = os.environ.get("VIDEO_SCHEDULER", "1") != "0"
+SCHEDULER_DIR = Path(os.environ.get("VIDEO_SCHEDULER_DIR", str(TEMP_DIR / "scheduler")))
+HOST_THREADS = int(os.environ.get("VIDEO_HOST_THREADS", "0"))
+# Queue order of ffmpeg runs waiting for threads: previews first, autopilot renders last
+RENDER_PRIORITIES = {"interactive": 0, "normal": 1, "background": 2}
+
+# x264 presets a deadline-driven render chooses between, fastest first
+X264_PRESETS = ["ultrafast", "superfast", "veryfast", "faster", "fast", "medium", "slow"]
+# Per-host preset speeds measured by calibrate_encoder, on a reference clip this long
+CALIBRATION_PATH = Path(os.environ.get("VIDEO_CALIBRATION_PATH", str(TEMP_DIR / "encoder_calibration.json")))
+CALIBRATION_SECONDS = 2.0
+# Share of the time left a deadline-driven render plans to use - estimates are rough
+DEADLINE_HEADROOM = 0.85
+
+# Directory for Chrome trace-event files, one per command - empty disables tracing unless a call passes "trace"
+TRACE_DIR = os.environ.get("VIDEO_TRACE_DIR", "")
+
+# Crossfade length between scenes and chapters
+DEFAULT_TRANSITION_DURATION = 0.75
+# Most clips one crossfade ffmpeg process opens - longer runs are merged as a tree
+CROSSFADE_BATCH_SIZE = max(2, int(os.environ.get("VIDEO_CROSSFADE_BATCH", "8")))
+
+# Audio of the delivered video - the one lossy audio encode a render makes
+FINAL_AUDIO_CODEC = ["-c:a", "aac", "-b:a", "192k"]
+# Audio of intermediates (scene clips, chapters, crossfade batches) - lossless, and far cheaper to
+# encode than AAC. MP4 can't carry raw PCM; FLAC is the lossless codec it does carry.
+MEZZANINE_AUDIO_CODEC = ["-c:a", "flac", "-compression_level", "0"]
+
+# Video of intermediates, decoded once more and thrown away - only the delivered video pays for
+# the quality tier's x264 preset. Smart crossfades copy clip bodies into the output, so their clips
+# are always encoded for delivery.
+MEZZANINE_CODECS = {
+    # The quality tier's own settings - intermediates can be stream-copied into the output
+    "delivery": None,
+    # All-intra, visually lossless
+    "intra": ["-c:v", "libx264", "-preset", "ultrafast", "-crf", "10", "-g", "1"],
+    # Mathematically lossless
+    "lossless": ["-c:v", "libx264", "-preset", "ultrafast", "-qp", "0"],
+}
+MEZZANINE_FORMAT = os.environ.get("VIDEO_MEZZANINE", "intra")
+# Stream handler name that marks a mezzanine clip, so a final concat knows it must re-encode
+MEZZANINE_HANDLER = "video_processor mezzanine"
+
+# Chapters whose scenes are rendered but not yet stitched, while assemble_full renders the next
+# one (0 runs the stages strictly one after another)
+PIPELINE_DEPTH = max(0, int(os.environ.get("VIDEO_PIPELINE_DEPTH", "1")))
+
+# Target length of the fMP4 segments a progressive HLS stream is published in
+HLS_SEGMENT_SECONDS = float(os.environ.get("VIDEO_HLS_SEGMENT_SECONDS", "4"))
+
+# Extra renditions a render can write next to its master, (width, height). Each is a centre cut
+# to the profile's aspect ratio, scaled to size - a 16:9 profile is only scaled.
+OUTPUT_PROFILES = {
+    "1080p": (1920, 1080),
+    "720p": (1280, 720),
+    "vertical": (1080, 1920),
+    "square": (1080, 1080),
+}
+
 # Professional Ken Burns effect presets - VidRush style
 # Each preset defines start/end zoom and pan positions for smooth motion
 KEN_BURNS_PRESETS = {
@@ -120,6 +251,185 @@ def get_effect_for_scene(scene_index: int, total_scenes: int) -> str:
     return sequence[scene_index % len(sequence)]
 
 
+# =============================================================================
+# TRACING - opt-in timed spans per stage and subprocess, saved as Chrome trace events
+# =============================================================================
+
+# Trace the current command is recording into, if it asked for one
+TRACE = contextvars.ContextVar("trace", default=None)
+# Attributes of the innermost open span, for trace_annotate
+TRACE_SPAN = contextvars.ContextVar("trace_span", default=None)
+TRACE_FILE_NUMBERS = itertools.count(1)
+
+
+class TraceRecorder:
+    """
+    Complete ("X") events of one command, in the Chrome trace-event format
+    that chrome://tracing and ui.perfetto.dev load directly. Pool threads get
+    their own rows, named after the thread.
+    """
+    
+    def __init__(self, path: str):
+        self.path = path
+        self.started = time.perf_counter()
+        self.events = []
+        self._threads = set()
+        self._lock = threading.Lock()
+    
+    def add(self, name: str, category: str, start: float, end: float, args: Dict):
+        thread = threading.current_thread()
+        event = {
+            "name": name, "cat": category, "ph": "X",
+            "ts": round((start - self.started) * 1e6, 1),
+            "dur": round((end - start) * 1e6, 1),
+            "pid": os.getpid(), "tid": thread.ident,
+            "args": args,
+        }
+        with self._lock:
+            if thread.ident not in self._threads:
+                self._threads.add(thread.ident)
+                self.events.append({
+                    "name": "thread_name", "ph": "M", "pid": os.getpid(), "tid": thread.ident,
+                    "args": {"name": thread.name},
+                })
+            self.events.append(event)
+    
+    def save(self):
+        """Write the trace atomically - a viewer never sees half a file."""
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        with self._lock:
+            trace = {"traceEvents": list(self.events), "displayTimeUnit": "ms"}
+        fd, tmp_path = tempfile.mkstemp(suffix=".tmp", dir=directory)
+        with os.fdopen(fd, "w") as f:
+            json.dump(trace, f, default=str)
+        os.replace(tmp_path, self.path)
+
+
+def trace_path_for(command: str, params: Dict) -> Optional[str]:
+    """Where a command's trace goes: params "trace", else a new file in VIDEO_TRACE_DIR."""
+    if params.get("trace"):
+        return str(params["trace"])
+    if TRACE_DIR:
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        return str(Path(TRACE_DIR) / f"{command}_{stamp}_{os.getpid()}_{next(TRACE_FILE_NUMBERS)}.json")
+    return None
+
+
+@contextmanager
+def tracing(path: Optional[str]):
+    """Record the spans of the block into a trace saved at path (no-op without one)."""
+    if not path:
+        yield
+        return
+    recorder = TraceRecorder(path)
+    token = TRACE.set(recorder)
+    try:
+        yield
+    finally:
+        TRACE.reset(token)
+        try:
+            recorder.save()
+            print(f"Trace written: {path}", file=sys.stderr)
+        except OSError as e:
+            print(f"Could not write trace {path}: {e}", file=sys.stderr)
+
+
+@contextmanager
+def trace_span(name: str, category: str = "stage", **attrs):
+    """
+    Time the block as one span with the given attributes. Yields the
+    attribute dict, so the block can add results (a return code, a cache
+    hit) before the span closes. Costs nothing when tracing is off.
+    """
+    recorder = TRACE.get()
+    if recorder is None:
+        yield {}
+        return
+    token = TRACE_SPAN.set(attrs)
+    start = time.perf_counter()
+    try:
+        yield attrs
+    except BaseException as e:
+        attrs["error"] = repr(e)
+        raise
+    finally:
+        TRACE_SPAN.reset(token)
+        recorder.add(name, category, start, time.perf_counter(), attrs)
+
+
+def trace_annotate(**attrs):
+    """Add attributes to the innermost open span, if any."""
+    span = TRACE_SPAN.get()
+    if span is not None:
+        span.update(attrs)
+
+
+def traced(name: str, category: str = "stage", **attrs):
+    """
+    Decorator form of trace_span. Each attribute is a function of the call's
+    bound arguments (a dict of parameter name to value), evaluated only while
+    tracing. A bool or None return value is recorded as "ok".
+    """
+    def decorate(fn):
+        signature = inspect.signature(fn)
+        
+        @functools.wraps(fn)
+        def run(*args, **kwargs):
+            if TRACE.get() is None:
+                return fn(*args, **kwargs)
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            span_attrs = {}
+            for key, attr in attrs.items():
+                try:
+                    span_attrs[key] = attr(bound.arguments)
+                except Exception:
+                    span_attrs[key] = None  # A missing attribute never fails the render
+            with trace_span(name, category, **span_attrs) as span:
+                result = fn(*args, **kwargs)
+                if result is None or isinstance(result, bool):
+                    span["ok"] = result
+                return result
+        return run
+    return decorate
+
+
+def file_size(path: Optional[str]) -> Optional[int]:
+    try:
+        return os.path.getsize(path)
+    except (OSError, TypeError):
+        return None
+
+
+def total_size(paths) -> int:
+    return sum(file_size(path) or 0 for path in paths)
+
+
+def command_inputs(cmd: List[str]) -> List[str]:
+    """The -i arguments of an ffmpeg/ffprobe command (the last argument for ffprobe)."""
+    inputs = [cmd[i + 1] for i, arg in enumerate(cmd[:-1]) if arg == "-i"]
+    if not inputs and os.path.basename(cmd[0]).startswith("ffprobe"):
+        inputs = [cmd[-1]]
+    return inputs
+
+
+def subprocess_span_attrs(cmd: List[str]) -> Dict:
+    """Tags and input sizes for a subprocess span; the full command only when it is short."""
+    inputs = command_inputs(cmd)
+    sizes = [file_size(path) for path in inputs]
+    command_chars = sum(len(arg) + 1 for arg in cmd)
+    return {
+        **PROGRESS_TAGS.get(),
+        "argc": len(cmd),
+        "command_chars": command_chars,
+        "command": " ".join(cmd) if command_chars <= 2000 else " ".join(cmd[:12]) + " ...",
+        "inputs": len(inputs),
+        "input_bytes": sum(size for size in sizes if size),
+        "audio_codec": cmd[cmd.index("-c:a") + 1] if "-c:a" in cmd[:-1] else None,
+    }
+
+
 # =============================================================================
 # TEXT OVERLAY AND TYPEWRITER EFFECTS - VidRush Documentary Style
 # =============================================================================
@@ -211,36 +521,38 @@ TEXT_STYLES = {
 
 
 def get_text_position(position: str, w: int, h: int, text_w: int = 0, text_h: int = 0) -> Tuple[str, str]:
-    """Calculate x,y position expressions for text placement."""
+    """
+    Calculate x,y position expressions for text placement.
+    Margins are laid out for 1080p and scale with the frame height.
+    """
+    m50, m80, m120 = (round(px * h / 1080) for px in (50, 80, 120))
     positions = {
         "center": ("(w-text_w)/2", "(h-text_h)/2"),
-        "center_left": ("80", "(h-text_h)/2"),
-        "center_right": ("w-text_w-80", "(h-text_h)/2"),
-        "top_left": ("50", "50"),
-        "top_right": ("w-text_w-50", "50"),
-        "top_center": ("(w-text_w)/2", "80"),
-        "bottom_left": ("50", "h-text_h-80"),
-        "bottom_right": ("w-text_w-50", "h-text_h-80"),
-        "bottom_center": ("(w-text_w)/2", "h-text_h-80"),
-        "letterbox_bottom": ("(w-text_w)/2", "h-120"),
+        "center_left": (str(m80), "(h-text_h)/2"),
+        "center_right": (f"w-text_w-{m80}", "(h-text_h)/2"),
+        "top_left": (str(m50), str(m50)),
+        "top_right": (f"w-text_w-{m50}", str(m50)),
+        "top_center": ("(w-text_w)/2", str(m80)),
+        "bottom_left": (str(m50), f"h-text_h-{m80}"),
+        "bottom_right": (f"w-text_w-{m50}", f"h-text_h-{m80}"),
+        "bottom_center": ("(w-text_w)/2", f"h-text_h-{m80}"),
+        "letterbox_bottom": ("(w-text_w)/2", f"h-{m120}"),
     }
     return positions.get(position, positions["center"])
 
 
-def build_typewriter_filter(
+def build_typewriter_char_filters(
     text: str,
     style: str = "chapter_title",
     start_time: float = 0.5,
     chars_per_second: float = 12.0,
-    duration: Optional[float] = None,
     w: int = 1920,
-    h: int = 1080,
-    fps: int = 24
-) -> str:
+    h: int = 1080
+) -> Tuple[List[str], List[str]]:
     """
-    Build FFmpeg drawtext filter with typewriter effect.
-    Text appears character by character like a typewriter.
-    Supports multi-line text (split by newlines) and box backgrounds.
+    The typewriter effect as drawtext filters: (box filters, character filters).
+    Every character gets its own drawtext (plus one for its shadow), enabled
+    at the moment it is typed. Supports multi-line text and box backgrounds.
     """
     style_config = TEXT_STYLES.get(style, TEXT_STYLES["chapter_title"])
     
@@ -256,6 +568,7 @@ def build_typewriter_filter(
     line_height = int(fontsize * 1.4)
     char_width = fontsize * 0.55
     
+    box_filters = []
     filters = []
     
     # For quote boxes with background, draw the box first (appears immediately)
@@ -269,7 +582,7 @@ def build_typewriter_filter(
         
         # Draw a colored rectangle using drawbox filter
         box_filter = f"drawbox=x={base_x}:y={base_y}:w={box_w}:h={box_h}:color={box_color}:t=fill:enable='gte(t,{start_time - 0.1:.3f})'"
-        filters.append(box_filter)
+        box_filters.append(box_filter)
     
     # Split text into lines for multi-line support
     lines = text.split('\n') if '\n' in text else [text]
@@ -312,7 +625,168 @@ def build_typewriter_filter(
         # Count newline as a character for timing
         char_index += 1
     
-    return ",".join(filters)
+    return box_filters, filters
+
+
+def build_typewriter_filter(
+    text: str,
+    style: str = "chapter_title",
+    start_time: float = 0.5,
+    chars_per_second: float = 12.0,
+    duration: Optional[float] = None,
+    w: int = 1920,
+    h: int = 1080,
+    fps: int = 24,
+    engine: Optional[str] = None
+) -> str:
+    """
+    Build FFmpeg filters for the typewriter effect.
+    Text appears character by character like a typewriter.
+    Supports multi-line text (split by newlines) and box backgrounds.
+    
+    The "reveal" engine (default) overlays a pre-rendered clip of the typing,
+    so the graph holds three nodes per text however long it is; the result is
+    a graph fragment that continues the caller's filter chain. The "drawtext"
+    engine chains two drawtext filters per character, and is also the fallback
+    when the reveal clip can't be rendered.
+    """
+    box_filters, char_filters = build_typewriter_char_filters(text, style, start_time, chars_per_second, w, h)
+    if (engine or TYPEWRITER_ENGINE) == "reveal" and char_filters:
+        reveal = render_typewriter_reveal(text, style, chars_per_second, w, h)
+        if reveal is not None:
+            return build_typewriter_reveal_filter(reveal, box_filters, start_time, chars_per_second)
+    return ",".join(box_filters + char_filters)
+
+
+def escape_filter_path(path: str) -> str:
+    """Quote a file path for use as a filter option inside a filter graph."""
+    value = path.replace("\\", "\\\\").replace("'", "\\'").replace(":", "\\:")
+    return "'" + value.replace("'", "'\\''") + "'"
+
+
+@traced("typewriter_reveal", "typewriter", chars=lambda a: len(a["text"]), style=lambda a: a["style"])
+def render_typewriter_reveal(
+    text: str,
+    style: str,
+    chars_per_second: float,
+    w: int,
+    h: int
+) -> Optional[Dict]:
+    """
+    Pre-render the typing of a text as a short RGBA clip: frame i shows the
+    text after character slot i, cropped to the text's bounding box. The
+    frames come from the exact drawtext chain of the "drawtext" engine, drawn
+    over black and over white; the difference between the two gives each
+    pixel's opacity, so the overlay composites identically to drawing the
+    glyphs in place. Clips are cached by the chain that produced them.
+    Returns {"path", "x", "y"} ({"path": None} if nothing is visible), or
+    None if the clip could not be rendered.
+    """
+    # Sample half a character early so frame i lands safely between two reveal times
+    _, char_filters = build_typewriter_char_filters(text, style, -0.5 / chars_per_second, chars_per_second, w, h)
+    steps = len(text)
+    chain = ",".join(char_filters)
+    key = hashlib.sha256(json.dumps(["typewriter-v1", chain, w, h, chars_per_second]).encode()).hexdigest()
+    clip_path = TYPEWRITER_CACHE_DIR / f"{key}.nut"
+    meta_path = TYPEWRITER_CACHE_DIR / f"{key}.json"
+    try:
+        with open(meta_path) as f:
+            reveal = json.load(f)
+        trace_annotate(cached=True)
+        return reveal
+    except (OSError, ValueError):
+        pass
+    
+    try:
+        TYPEWRITER_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        with job_workspace("typewriter") as scratch:
+            # Black and white canvases take turns through one chain, so its fonts load once
+            canvases = (
+                f"color=c=black:s={w}x{h}:r={chars_per_second}[black];"
+                f"color=c=white:s={w}x{h}:r={chars_per_second}[white];"
+                "[black][white]interleave,format=gbrp"
+            )
+            split_canvases = "split[even][odd];[even]select='not(mod(n,2))'[b];[odd]select='mod(n,2)'[w];"
+            graph_path = scratch / "typewriter_graph.txt"
+            
+            # Pass 1: where the finished text lands (glyphs only ever appear, so it bounds every frame)
+            graph_path.write_text(
+                f"{canvases},setpts=PTS+{steps}/({chars_per_second}*TB),{chain},{split_canvases}\n"
+                "[b][w]blend=all_mode=difference,extractplanes=g,negate,bbox=min_val=1"
+            )
+            cmd = [
+                "ffmpeg", "-hide_banner",
+                "-filter_complex_script", str(graph_path),
+                "-frames:v", "1", "-f", "null", "-"
+            ]
+            result = run_ffmpeg(cmd)
+            bounds = re.findall(r"x1:(\d+) x2:(\d+) y1:(\d+) y2:(\d+)", result.stderr)
+            if result.returncode != 0:
+                print(f"Typewriter reveal error: {result.stderr[-500:]}", file=sys.stderr)
+                return None
+            
+            if bounds:
+                # overlay snaps to even offsets on 4:2:0 frames
+                x1, x2, y1, y2 = (int(v) for v in bounds[-1])
+                x1, y1 = x1 & ~1, y1 & ~1
+                crop = f"crop={x2 - x1 + 1}:{y2 - y1 + 1}:{x1}:{y1}"
+                
+                # Pass 2: every typing step over black and over white, cropped to the text.
+                # Opacity is how much of the white background no longer shows through.
+                graph_path.write_text(
+                    f"{canvases},{chain},{crop},{split_canvases}\n"
+                    "[b]split[b1][b2];\n"
+                    "[b2][w]blend=all_mode=difference,extractplanes=g,negate,split[a1][a2];\n"
+                    "[b1][a1]unpremultiply=inplace=0[color];\n"
+                    "[color][a2]alphamerge,format=rgba[out]"
+                )
+                tmp_path = str(scratch / "reveal.nut")
+                cmd = [
+                    "ffmpeg", "-y", "-v", "error",
+                    "-filter_complex_script", str(graph_path),
+                    "-map", "[out]", "-frames:v", str(steps),
+                    "-c:v", "png", tmp_path
+                ]
+                result = run_ffmpeg(cmd)
+                if result.returncode != 0:
+                    print(f"Typewriter reveal error: {result.stderr[-500:]}", file=sys.stderr)
+                    return None
+                os.replace(tmp_path, clip_path)
+                reveal = {"path": str(clip_path.resolve()), "x": x1, "y": y1}
+            else:
+                reveal = {"path": None}
+        
+        fd, tmp_meta = tempfile.mkstemp(suffix=".tmp", dir=TYPEWRITER_CACHE_DIR)
+        with os.fdopen(fd, "w") as f:
+            json.dump(reveal, f)
+        os.replace(tmp_meta, meta_path)
+        return reveal
+    
+    except Exception as e:
+        print(f"Error rendering typewriter reveal: {e}", file=sys.stderr)
+        return None
+
+
+def build_typewriter_reveal_filter(
+    reveal: Dict,
+    box_filters: List[str],
+    start_time: float,
+    chars_per_second: float
+) -> str:
+    """
+    Graph fragment that overlays a reveal clip on the caller's chain.
+    Frame i is timestamped with the same millisecond-rounded reveal time the
+    drawtext engine uses; overlay holds the last frame once the clip ends.
+    """
+    head = ",".join(box_filters) or "null"
+    if not reveal.get("path"):
+        return head
+    label = f"tw{next(TYPEWRITER_LABELS)}"
+    source = (
+        f"movie=filename={escape_filter_path(reveal['path'])},settb=1/1000,"
+        f"setpts='round(({start_time}+N/{chars_per_second})*1000)'"
+    )
+    return f"{head}[{label}_bg];{source}[{label}_text];[{label}_bg][{label}_text]overlay=x={reveal['x']}:y={reveal['y']}"
 
 
 def build_simple_text_filter(
@@ -326,11 +800,12 @@ def build_simple_text_filter(
 ) -> str:
     """
     Build simple text overlay with fade in/out.
-    For titles, dates, and static text.
+    For titles, dates, and static text. Sizes scale from 1080p to the frame height.
     """
     style_config = TEXT_STYLES.get(style, TEXT_STYLES["year_title"])
+    scale = h / 1080
     
-    fontsize = style_config["fontsize"]
+    fontsize = round(style_config["fontsize"] * scale)
     fontcolor = style_config["fontcolor"]
     font = style_config["font"]
     position = style_config["position"]
@@ -356,14 +831,14 @@ def build_simple_text_filter(
     
     # Shadow layer
     if has_shadow:
-        shadow = f"drawtext=text='{escaped_text}':fontsize={fontsize}:fontcolor=black@0.6:font={font}:x={x_pos}+4:y={y_pos}+4:enable='{enable_expr}'"
+        shadow = f"drawtext=text='{escaped_text}':fontsize={fontsize}:fontcolor=black@0.6:font={font}:x={x_pos}+{round(4 * scale)}:y={y_pos}+{round(4 * scale)}:enable='{enable_expr}'"
         filters.append(shadow)
     
     # Box background
     box_opts = ""
     if has_box:
         box_color = style_config.get("box_color", "black@0.5")
-        box_opts = f":box=1:boxcolor={box_color}:boxborderw=18"
+        box_opts = f":box=1:boxcolor={box_color}:boxborderw={round(18 * scale)}"
     
     # Main text
     main_text = f"drawtext=text='{escaped_text}':fontsize={fontsize}:fontcolor={fontcolor}:font={font}:x={x_pos}:y={y_pos}:enable='{enable_expr}'{box_opts}"
@@ -372,13 +847,17 @@ def build_simple_text_filter(
     return ",".join(filters)
 
 
+@traced("typewriter_sound", "typewriter", duration=lambda a: a["duration"])
 def generate_typewriter_sound(duration: float, chars_per_second: float = 12.0, output_path: Optional[str] = None) -> Optional[str]:
     """
     Generate typewriter click sound effect using FFmpeg.
     Creates rhythmic clicking sounds synchronized with text reveal.
+    Without output_path it is written to a new file in TEMP_DIR.
     """
     if output_path is None:
-        output_path = str(TEMP_DIR / "typewriter_sound.wav")
+        ensure_dirs()
+        fd, output_path = tempfile.mkstemp(prefix="typewriter_", suffix=".wav", dir=TEMP_DIR)
+        os.close(fd)
     
     # Generate clicks using FFmpeg's sine wave with decay envelope
     # Each "click" is a short burst of white noise
@@ -397,7 +876,7 @@ def generate_typewriter_sound(duration: float, chars_per_second: float = 12.0, o
         output_path
     ]
     
-    result = subprocess.run(cmd, capture_output=True, text=True)
+    result = run_ffmpeg(cmd, duration)
     
     if result.returncode == 0 and os.path.exists(output_path):
         return output_path
@@ -408,6 +887,12 @@ def generate_typewriter_sound(duration: float, chars_per_second: float = 12.0, o
 # ADVANCED DOCUMENTARY EFFECTS - VidRush Style
 # =============================================================================
 
+@traced(
+    "letterbox", "builder",
+    effect=lambda a: a["effect"],
+    duration=lambda a: a["duration"],
+    input_bytes=lambda a: total_size([a["image_path"], a["audio_path"]])
+)
 def create_letterbox_scene(
     image_path: str,
     output_path: str,
@@ -416,12 +901,15 @@ def create_letterbox_scene(
     audio_path: Optional[str] = None,
     effect: str = "zoom_in_center",
     fps: int = 24,
-    resolution: tuple = (1920, 1080)
+    resolution: tuple = (1920, 1080),
+    quality: str = "high",
+    final: bool = True
 ) -> bool:
     """
     Create a scene with letterbox framing - black bars above and below
     with caption text centered in the lower black bar.
     Like: "Führerbunker Tension, 1945"
+    final=False makes an intermediate, like a scene clip's (see create_scene_clip_ffmpeg).
     """
     try:
         ensure_dirs()
@@ -431,6 +919,8 @@ def create_letterbox_scene(
         # Image area with letterbox (16:9 content in letterbox frame)
         bar_height = int(h * 0.12)  # 12% top and bottom bars
         content_height = h - (2 * bar_height)
+        # Pre-cropped to the content area, so scale/crop below pass it straight through
+        image_path = prepare_source_image(image_path, (w, content_height)) or image_path
         
         # Ken Burns on the content area
         zoompan = build_zoompan_filter(effect, total_frames, w, content_height, fps)
@@ -459,8 +949,8 @@ color=black:s={w}x{bar_height}:d={duration}:r={fps}[bottombar];
                 "-filter_complex", filter_complex.replace("\n", " "),
                 "-af", audio_filter,
                 "-map", "[v]", "-map", "1:a",
-                "-c:v", "libx264", "-preset", "slow", "-crf", "18",
-                "-c:a", "aac", "-b:a", "192k",
+                *video_codec_args(quality, final=final),
+                *audio_codec_args(final),
                 "-t", str(duration),
                 output_path
             ]
@@ -471,13 +961,13 @@ color=black:s={w}x{bar_height}:d={duration}:r={fps}[bottombar];
                 "-f", "lavfi", "-i", f"anullsrc=channel_layout=stereo:sample_rate=48000:duration={duration}",
                 "-filter_complex", filter_complex.replace("\n", " "),
                 "-map", "[v]", "-map", "1:a",
-                "-c:v", "libx264", "-preset", "slow", "-crf", "18",
-                "-c:a", "aac", "-b:a", "192k",
+                *video_codec_args(quality, final=final),
+                *audio_codec_args(final),
                 "-t", str(duration),
                 output_path
             ]
         
-        result = subprocess.run(cmd, capture_output=True, text=True)
+        result = run_ffmpeg(cmd, duration)
         if result.returncode != 0:
             print(f"Letterbox error: {result.stderr[:500]}", file=sys.stderr)
         return result.returncode == 0
@@ -487,6 +977,11 @@ color=black:s={w}x{bar_height}:d={duration}:r={fps}[bottombar];
         return False
 
 
+@traced(
+    "pip", "builder",
+    duration=lambda a: a["duration"],
+    input_bytes=lambda a: total_size([a["main_image"], a["inset_image"], a["audio_path"]])
+)
 def create_pip_scene(
     main_image: str,
     inset_image: str,
@@ -498,11 +993,14 @@ def create_pip_scene(
     border_color: str = "white",
     border_width: int = 4,
     fps: int = 24,
-    resolution: tuple = (1920, 1080)
+    resolution: tuple = (1920, 1080),
+    quality: str = "high",
+    final: bool = True
 ) -> bool:
     """
     Create picture-in-picture scene with main image and bordered inset.
     Inset can be positioned in corners with customizable border.
+    final=False makes an intermediate, like a scene clip's (see create_scene_clip_ffmpeg).
     """
     try:
         ensure_dirs()
@@ -521,6 +1019,7 @@ def create_pip_scene(
             "bottom_right": (w - inset_w - padding, h - inset_h - padding),
         }
         inset_x, inset_y = positions.get(inset_position, positions["bottom_right"])
+        main_image = prepare_source_image(main_image, (w, h)) or main_image
         
         # Ken Burns on main image
         zoompan = build_zoompan_filter("zoom_in_center", total_frames, w, h, fps)
@@ -545,8 +1044,8 @@ def create_pip_scene(
                 "-filter_complex", filter_complex.replace("\n", " "),
                 "-af", audio_filter,
                 "-map", "[v]", "-map", "2:a",
-                "-c:v", "libx264", "-preset", "slow", "-crf", "18",
-                "-c:a", "aac", "-b:a", "192k",
+                *video_codec_args(quality, final=final),
+                *audio_codec_args(final),
                 "-t", str(duration),
                 output_path
             ]
@@ -558,13 +1057,13 @@ def create_pip_scene(
                 "-f", "lavfi", "-i", f"anullsrc=channel_layout=stereo:sample_rate=48000:duration={duration}",
                 "-filter_complex", filter_complex.replace("\n", " "),
                 "-map", "[v]", "-map", "2:a",
-                "-c:v", "libx264", "-preset", "slow", "-crf", "18",
-                "-c:a", "aac", "-b:a", "192k",
+                *video_codec_args(quality, final=final),
+                *audio_codec_args(final),
                 "-t", str(duration),
                 output_path
             ]
         
-        result = subprocess.run(cmd, capture_output=True, text=True)
+        result = run_ffmpeg(cmd, duration)
         if result.returncode != 0:
             print(f"PIP error: {result.stderr[:500]}", file=sys.stderr)
         return result.returncode == 0
@@ -574,6 +1073,14 @@ def create_pip_scene(
         return False
 
 
+@traced(
+    "quote_box", "builder",
+    effect=lambda a: a["effect"],
+    typewriter=lambda a: a["typewriter"],
+    chars=lambda a: len(a["quote_text"]),
+    duration=lambda a: a["duration"],
+    input_bytes=lambda a: total_size([a["image_path"], a["audio_path"]])
+)
 def create_quote_box_scene(
     image_path: str,
     output_path: str,
@@ -584,18 +1091,22 @@ def create_quote_box_scene(
     box_position: str = "top_left",
     typewriter: bool = True,
     fps: int = 24,
-    resolution: tuple = (1920, 1080)
+    resolution: tuple = (1920, 1080),
+    quality: str = "high",
+    final: bool = True
 ) -> bool:
     """
     Create scene with quote box overlay - multi-line text with 
     beige/cream semi-transparent background box.
     Like: "The war is lost—yet Hitler vows to remain in Berlin."
+    final=False makes an intermediate, like a scene clip's (see create_scene_clip_ffmpeg).
     """
     try:
         ensure_dirs()
         w, h = resolution
         total_frames = int(duration * fps)
         
+        image_path = prepare_source_image(image_path, (w, h)) or image_path
         zoompan = build_zoompan_filter(effect, total_frames, w, h, fps)
         bw_filter = "hue=s=0,eq=contrast=1.15:brightness=0.02"
         
@@ -630,8 +1141,8 @@ def create_quote_box_scene(
                 "-filter_complex", filter_complex,
                 "-af", audio_filter,
                 "-map", "[v]", "-map", "1:a",
-                "-c:v", "libx264", "-preset", "slow", "-crf", "18",
-                "-c:a", "aac", "-b:a", "192k",
+                *video_codec_args(quality, final=final),
+                *audio_codec_args(final),
                 "-t", str(duration),
                 output_path
             ]
@@ -642,13 +1153,13 @@ def create_quote_box_scene(
                 "-f", "lavfi", "-i", f"anullsrc=channel_layout=stereo:sample_rate=48000:duration={duration}",
                 "-filter_complex", filter_complex,
                 "-map", "[v]", "-map", "1:a",
-                "-c:v", "libx264", "-preset", "slow", "-crf", "18",
-                "-c:a", "aac", "-b:a", "192k",
+                *video_codec_args(quality, final=final),
+                *audio_codec_args(final),
                 "-t", str(duration),
                 output_path
             ]
         
-        result = subprocess.run(cmd, capture_output=True, text=True)
+        result = run_ffmpeg(cmd, duration)
         if result.returncode != 0:
             print(f"Quote box error: {result.stderr[:500]}", file=sys.stderr)
         return result.returncode == 0
@@ -658,6 +1169,12 @@ def create_quote_box_scene(
         return False
 
 
+@traced(
+    "date_stamp", "builder",
+    effect=lambda a: a["effect"],
+    duration=lambda a: a["duration"],
+    input_bytes=lambda a: total_size([a["image_path"], a["audio_path"]])
+)
 def create_date_stamp_scene(
     image_path: str,
     output_path: str,
@@ -666,18 +1183,22 @@ def create_date_stamp_scene(
     audio_path: Optional[str] = None,
     effect: str = "zoom_in_center",
     fps: int = 24,
-    resolution: tuple = (1920, 1080)
+    resolution: tuple = (1920, 1080),
+    quality: str = "high",
+    final: bool = True
 ) -> bool:
     """
     Create scene with vintage date stamp overlay.
     Date appears in bottom-left with dark background box.
     Like: "22 April 1945"
+    final=False makes an intermediate, like a scene clip's (see create_scene_clip_ffmpeg).
     """
     try:
         ensure_dirs()
         w, h = resolution
         total_frames = int(duration * fps)
         
+        image_path = prepare_source_image(image_path, (w, h)) or image_path
         zoompan = build_zoompan_filter(effect, total_frames, w, h, fps)
         bw_filter = "hue=s=0,eq=contrast=1.15:brightness=0.02"
         
@@ -699,8 +1220,8 @@ def create_date_stamp_scene(
                 "-filter_complex", filter_complex,
                 "-af", audio_filter,
                 "-map", "[v]", "-map", "1:a",
-                "-c:v", "libx264", "-preset", "slow", "-crf", "18",
-                "-c:a", "aac", "-b:a", "192k",
+                *video_codec_args(quality, final=final),
+                *audio_codec_args(final),
                 "-t", str(duration),
                 output_path
             ]
@@ -711,13 +1232,13 @@ def create_date_stamp_scene(
                 "-f", "lavfi", "-i", f"anullsrc=channel_layout=stereo:sample_rate=48000:duration={duration}",
                 "-filter_complex", filter_complex,
                 "-map", "[v]", "-map", "1:a",
-                "-c:v", "libx264", "-preset", "slow", "-crf", "18",
-                "-c:a", "aac", "-b:a", "192k",
+                *video_codec_args(quality, final=final),
+                *audio_codec_args(final),
                 "-t", str(duration),
                 output_path
             ]
         
-        result = subprocess.run(cmd, capture_output=True, text=True)
+        result = run_ffmpeg(cmd, duration)
         if result.returncode != 0:
             print(f"Date stamp error: {result.stderr[:500]}", file=sys.stderr)
         return result.returncode == 0
@@ -727,6 +1248,11 @@ def create_date_stamp_scene(
         return False
 
 
+@traced(
+    "split_screen", "builder",
+    duration=lambda a: a["duration"],
+    input_bytes=lambda a: total_size([a["left_image"], a["right_image"], a["audio_path"]])
+)
 def create_split_screen_scene(
     left_image: str,
     right_image: str,
@@ -735,17 +1261,22 @@ def create_split_screen_scene(
     audio_path: Optional[str] = None,
     gap_width: int = 4,
     fps: int = 24,
-    resolution: tuple = (1920, 1080)
+    resolution: tuple = (1920, 1080),
+    quality: str = "high",
+    final: bool = True
 ) -> bool:
     """
     Create side-by-side split screen comparison.
     Two images displayed with optional gap between them.
+    final=False makes an intermediate, like a scene clip's (see create_scene_clip_ffmpeg).
     """
     try:
         ensure_dirs()
         w, h = resolution
         total_frames = int(duration * fps)
         half_w = (w - gap_width) // 2
+        left_image = prepare_source_image(left_image, (half_w, h)) or left_image
+        right_image = prepare_source_image(right_image, (half_w, h)) or right_image
         
         bw_filter = "hue=s=0,eq=contrast=1.1:brightness=0.02"
         
@@ -772,8 +1303,8 @@ color=black:s={gap_width}x{h}:d={duration}:r={fps}[gap];
                 "-filter_complex", filter_complex.replace("\n", " "),
                 "-af", audio_filter,
                 "-map", "[v]", "-map", "2:a",
-                "-c:v", "libx264", "-preset", "slow", "-crf", "18",
-                "-c:a", "aac", "-b:a", "192k",
+                *video_codec_args(quality, final=final),
+                *audio_codec_args(final),
                 "-t", str(duration),
                 output_path
             ]
@@ -785,13 +1316,13 @@ color=black:s={gap_width}x{h}:d={duration}:r={fps}[gap];
                 "-f", "lavfi", "-i", f"anullsrc=channel_layout=stereo:sample_rate=48000:duration={duration}",
                 "-filter_complex", filter_complex.replace("\n", " "),
                 "-map", "[v]", "-map", "2:a",
-                "-c:v", "libx264", "-preset", "slow", "-crf", "18",
-                "-c:a", "aac", "-b:a", "192k",
+                *video_codec_args(quality, final=final),
+                *audio_codec_args(final),
                 "-t", str(duration),
                 output_path
             ]
         
-        result = subprocess.run(cmd, capture_output=True, text=True)
+        result = run_ffmpeg(cmd, duration)
         if result.returncode != 0:
             print(f"Split screen error: {result.stderr[:500]}", file=sys.stderr)
         return result.returncode == 0
@@ -801,6 +1332,11 @@ color=black:s={gap_width}x{h}:d={duration}:r={fps}[gap];
         return False
 
 
+@traced(
+    "portrait_title", "builder",
+    duration=lambda a: a["duration"],
+    input_bytes=lambda a: total_size([a["background_image"], a["portrait_image"], a["audio_path"]])
+)
 def create_portrait_title_card(
     background_image: str,
     portrait_image: str,
@@ -811,12 +1347,15 @@ def create_portrait_title_card(
     audio_path: Optional[str] = None,
     border_color: str = "#C9A67A",
     fps: int = 24,
-    resolution: tuple = (1920, 1080)
+    resolution: tuple = (1920, 1080),
+    quality: str = "high",
+    final: bool = True
 ) -> bool:
     """
     Create title card with blurred background and gold-bordered portrait inset.
     Title and subtitle appear on the left, portrait on the right.
     Like: "STAY-PUT ORDER / Berlin – 22 April 1945" with portrait
+    final=False makes an intermediate, like a scene clip's (see create_scene_clip_ffmpeg).
     """
     try:
         ensure_dirs()
@@ -828,6 +1367,7 @@ def create_portrait_title_card(
         portrait_x = w - portrait_w - 100
         portrait_y = (h - portrait_h) // 2
         border = 6
+        background_image = prepare_source_image(background_image, (w, h)) or background_image
         
         # Escape text
         escaped_title = title.replace("'", "\\'").replace(":", "\\:")
@@ -855,8 +1395,8 @@ def create_portrait_title_card(
                 "-filter_complex", filter_complex.replace("\n", " "),
                 "-af", audio_filter,
                 "-map", "[v]", "-map", "2:a",
-                "-c:v", "libx264", "-preset", "slow", "-crf", "18",
-                "-c:a", "aac", "-b:a", "192k",
+                *video_codec_args(quality, final=final),
+                *audio_codec_args(final),
                 "-t", str(duration),
                 output_path
             ]
@@ -868,13 +1408,13 @@ def create_portrait_title_card(
                 "-f", "lavfi", "-i", f"anullsrc=channel_layout=stereo:sample_rate=48000:duration={duration}",
                 "-filter_complex", filter_complex.replace("\n", " "),
                 "-map", "[v]", "-map", "2:a",
-                "-c:v", "libx264", "-preset", "slow", "-crf", "18",
-                "-c:a", "aac", "-b:a", "192k",
+                *video_codec_args(quality, final=final),
+                *audio_codec_args(final),
                 "-t", str(duration),
                 output_path
             ]
         
-        result = subprocess.run(cmd, capture_output=True, text=True)
+        result = run_ffmpeg(cmd, duration)
         if result.returncode != 0:
             print(f"Portrait title card error: {result.stderr[:500]}", file=sys.stderr)
         return result.returncode == 0
@@ -884,6 +1424,12 @@ def create_portrait_title_card(
         return False
 
 
+@traced(
+    "title_card", "builder",
+    style=lambda a: a["style"],
+    typewriter=lambda a: a["typewriter"],
+    duration=lambda a: a["duration"]
+)
 def create_title_card(
     text: str,
     output_path: str,
@@ -893,16 +1439,26 @@ def create_title_card(
     background_color: str = "black",
     typewriter: bool = False,
     fps: int = 24,
-    resolution: tuple = (1920, 1080)
+    resolution: tuple = (1920, 1080),
+    quality: str = "high",
+    transition_keyframes: Optional[float] = None,
+    final: bool = True
 ) -> bool:
     """
     Create a title card with optional typewriter effect.
     Can overlay on background image or solid color.
+    Encodes with the scene clip settings so it can join a smart crossfade concat.
+    final=False makes an intermediate, like a scene clip's (see create_scene_clip_ffmpeg).
     """
     try:
         ensure_dirs()
         w, h = resolution
         total_frames = int(duration * fps)
+        # Smart crossfade copies the card into the output, so a keyframed card is encoded for delivery
+        encode_args = video_codec_args(quality, final=final or bool(transition_keyframes))
+        if transition_keyframes:
+            encode_args += transition_keyframe_args(duration, fps, transition_keyframes)
+            duration = total_frames / fps
         
         # Build text filter
         if typewriter:
@@ -912,6 +1468,9 @@ def create_title_card(
         
         if background_image and os.path.exists(background_image):
             # Use image as background with Ken Burns
+            background_image = prepare_source_image(
+                background_image, ken_burns_source_size(w, h), fit="shrink"
+            ) or background_image
             zoompan = build_zoompan_filter("zoom_in_center", total_frames, w, h, fps)
             bw_filter = "hue=s=0,eq=contrast=1.1:brightness=0.02"
             
@@ -921,8 +1480,8 @@ def create_title_card(
                 "-f", "lavfi", "-i", f"anullsrc=channel_layout=stereo:sample_rate=48000:duration={duration}",
                 "-filter_complex", f"[0:v]{zoompan},{bw_filter},{text_filter},format=yuv420p[v]",
                 "-map", "[v]", "-map", "1:a",
-                "-c:v", "libx264", "-preset", "slow", "-crf", "18",
-                "-c:a", "aac", "-b:a", "192k",
+                *encode_args,
+                *audio_codec_args(final),
                 "-t", str(duration),
                 output_path
             ]
@@ -934,13 +1493,13 @@ def create_title_card(
                 "-f", "lavfi", "-i", f"anullsrc=channel_layout=stereo:sample_rate=48000:duration={duration}",
                 "-filter_complex", f"[0:v]{text_filter},format=yuv420p[v]",
                 "-map", "[v]", "-map", "1:a",
-                "-c:v", "libx264", "-preset", "slow", "-crf", "18",
-                "-c:a", "aac", "-b:a", "192k",
+                *encode_args,
+                *audio_codec_args(final),
                 "-t", str(duration),
                 output_path
             ]
         
-        result = subprocess.run(cmd, capture_output=True, text=True)
+        result = run_ffmpeg(cmd, duration)
         if result.returncode != 0:
             print(f"Title card error: {result.stderr}", file=sys.stderr)
         return result.returncode == 0
@@ -956,430 +1515,2939 @@ def ensure_dirs():
     TEMP_DIR.mkdir(exist_ok=True)
 
 
-def get_audio_duration(audio_path: str) -> float:
-    """Get audio duration using ffprobe."""
+@contextmanager
+def job_workspace(prefix: str = "job", parent: Optional[str] = None):
+    """
+    Private scratch directory for one render job, removed on success and failure.
+    Intermediates never collide, so several renders can share a host.
+    Nested jobs pass their caller's workspace as parent.
+    """
+    base = Path(parent) if parent else TEMP_DIR
+    base.mkdir(parents=True, exist_ok=True)
+    workspace = Path(tempfile.mkdtemp(prefix=f"{prefix}_", dir=base))
     try:
-        cmd = [
-            "ffprobe", "-v", "quiet", "-show_entries", "format=duration",
-            "-of", "json", audio_path
-        ]
-        result = subprocess.run(cmd, capture_output=True, text=True)
-        if result.returncode == 0:
-            data = json.loads(result.stdout)
-            return float(data.get("format", {}).get("duration", 5.0))
-    except:
-        pass
-    return 5.0
+        yield workspace
+    finally:
+        shutil.rmtree(workspace, ignore_errors=True)
 
 
-def build_zoompan_filter(effect: str, total_frames: int, w: int, h: int, fps: int) -> str:
+class ContextThreadPool(ThreadPoolExecutor):
     """
-    Build a professional Ken Burns zoompan filter with smooth easing.
-    Uses preset-based motion for VidRush-style documentary effects.
+    ThreadPoolExecutor whose tasks run in a copy of the submitter's context,
+    so the render daemon can attribute pool output to the job that started it.
     """
-    preset = KEN_BURNS_PRESETS.get(effect, KEN_BURNS_PRESETS["zoom_in_center"])
-    
-    sz = preset["start_zoom"]
-    ez = preset["end_zoom"]
-    sx = preset["start_x"]
-    ex = preset["end_x"]
-    sy = preset["start_y"]
-    ey = preset["end_y"]
-    
-    # Smooth easing using sine curve: sin((on/d)*PI/2)^2 for ease-in-out
-    # t = on/{total_frames} is progress 0->1
-    # ease = (1 - cos(t * PI)) / 2 gives smooth S-curve
-    t = f"(on/{total_frames})"
-    ease = f"((1-cos({t}*PI))/2)"
-    
-    # Interpolate zoom with easing
-    zoom_expr = f"({sz}+({ez}-{sz})*{ease})"
-    
-    # Calculate pan positions (relative to image dimensions)
-    # x position: start_x -> end_x (0.0-1.0 maps to image position)
-    x_expr = f"(({sx}+({ex}-{sx})*{ease})*iw - iw/zoom/2)"
-    y_expr = f"(({sy}+({ey}-{sy})*{ease})*ih - ih/zoom/2)"
     
-    return f"zoompan=z='{zoom_expr}':x='{x_expr}':y='{y_expr}':d={total_frames}:s={w}x{h}:fps={fps}"
+    def submit(self, fn, *args, **kwargs):
+        return super().submit(contextvars.copy_context().run, fn, *args, **kwargs)
 
 
-def create_scene_clip_ffmpeg(
-    image_path: str,
-    output_path: str,
-    duration: float,
-    audio_path: Optional[str] = None,
-    effect: str = "zoom_in_center",
-    fps: int = 24,
-    resolution: tuple = (1920, 1080),
-    quality: str = "high",
-    text_overlay: Optional[Dict] = None
-) -> bool:
+def run_pipeline(items, stages: List, depth: Optional[int] = None) -> List:
     """
-    Create a single scene clip with professional Ken Burns effect.
-    Uses preset-based motion with smooth easing for VidRush-style quality.
-    
-    text_overlay options:
-        - text: str - The text to display
-        - style: str - Style preset (year_title, chapter_title, date_overlay, location_text, caption)
-        - typewriter: bool - Use typewriter animation
-        - start_time: float - When text appears (default 0.5)
+    Push items through stages, each stage a function of the previous one's
+    output running in its own thread, joined by bounded queues of `depth`
+    items - so stage k works on item n while stage k+1 works on item n-1,
+    and a slow stage holds back at most `depth` finished items upstream.
+    The first stage runs in the calling thread. Returns the last stage's
+    outputs in item order. The first exception stops new items and is
+    re-raised once the stages have drained. depth 0 runs every stage of an
+    item in the calling thread before starting the next item.
     """
-    try:
-        w, h = resolution
-        total_frames = int(duration * fps)
-        
-        # Map legacy effect names to new presets
-        effect_mapping = {
-            "zoom_in": "zoom_in_center",
-            "zoom_out": "zoom_out_center", 
-            "pan_left": "pan_left_zoom",
-            "pan_right": "pan_right_zoom",
-            "pan_up": "pan_up_zoom",
-            "pan_down": "pan_down_zoom",
-        }
-        effect = effect_mapping.get(effect, effect)
-        
-        # Build zoompan filter with smooth easing
-        zoompan = build_zoompan_filter(effect, total_frames, w, h, fps)
-        
-        # Professional documentary look filters
-        # - Black and white with enhanced contrast
-        # - Subtle film grain for cinematic feel
-        # - Slight vignette for focus
-        bw_filter = "hue=s=0"
-        contrast_filter = "eq=contrast=1.1:brightness=0.02"
-        
-        # Quality settings based on mode
-        if quality == "high":
-            crf = "18"
-            preset = "slow"
-            profile = "-profile:v high -level 4.2"
-        else:
-            crf = "23"
-            preset = "fast"
-            profile = ""
-        
-        video_filters = f"{zoompan},{bw_filter},{contrast_filter}"
-        
-        # Add text overlay if specified
-        if text_overlay and text_overlay.get("text"):
-            overlay_text = text_overlay["text"]
-            overlay_style = text_overlay.get("style", "date_overlay")
-            use_typewriter = text_overlay.get("typewriter", False)
-            text_start = text_overlay.get("start_time", 0.5)
-            
-            if use_typewriter:
-                text_filter = build_typewriter_filter(
-                    overlay_text, overlay_style, start_time=text_start, w=w, h=h, fps=fps
-                )
+    depth = PIPELINE_DEPTH if depth is None else depth
+    if depth == 0:
+        return [functools.reduce(lambda value, stage: stage(value), stages, item) for item in items]
+    done = object()
+    queues = [queue.Queue(maxsize=depth) for _ in stages[1:]]
+    outputs = []
+    errors = []
+
+    def consume(k: int):
+        inbox = queues[k - 1]
+        while True:
+            item = inbox.get()
+            if item is done:
+                break
+            if errors:
+                continue  # Drain, so the upstream stage never blocks on a full queue
+            try:
+                result = stages[k](item)
+            except Exception as e:
+                errors.append(e)
+                continue
+            if k < len(queues):
+                queues[k].put(result)
             else:
-                text_filter = build_simple_text_filter(
-                    overlay_text, overlay_style, start_time=text_start, w=w, h=h
-                )
-            video_filters = f"{video_filters},{text_filter}"
-        
-        video_filters = f"{video_filters},format=yuv420p"
-        
-        if audio_path and os.path.exists(audio_path):
-            # With audio - pad audio to match video duration for dramatic pause
-            # Use apad to extend audio with silence, then trim to exact video duration
-            audio_filter = f"apad=whole_dur={duration}"
-            cmd = [
-                "ffmpeg", "-y",
-                "-loop", "1", "-i", image_path,
-                "-i", audio_path,
-                "-filter_complex", f"[0:v]{video_filters}[v];[1:a]{audio_filter}[a]",
-                "-map", "[v]", "-map", "[a]",
-                "-c:v", "libx264", "-preset", preset, "-crf", crf,
-            ]
-            if profile:
-                cmd.extend(["-profile:v", "high", "-level", "4.2"])
-            cmd.extend([
-                "-c:a", "aac", "-b:a", "192k",
-                "-t", str(duration),
-                output_path
-            ])
-        else:
-            # No audio - generate silent audio track for crossfade compatibility
-            cmd = [
-                "ffmpeg", "-y",
-                "-loop", "1", "-i", image_path,
-                "-f", "lavfi", "-i", f"anullsrc=channel_layout=stereo:sample_rate=48000:duration={duration}",
-                "-filter_complex", f"[0:v]{video_filters}[v]",
-                "-map", "[v]", "-map", "1:a",
-                "-c:v", "libx264", "-preset", preset, "-crf", crf,
-            ]
-            if profile:
-                cmd.extend(["-profile:v", "high", "-level", "4.2"])
-            cmd.extend([
-                "-c:a", "aac", "-b:a", "192k",
-                "-t", str(duration),
-                output_path
-            ])
-        
-        result = subprocess.run(cmd, capture_output=True, text=True)
-        if result.returncode != 0:
-            print(f"FFmpeg error: {result.stderr}", file=sys.stderr)
-        return result.returncode == 0
-        
-    except Exception as e:
-        print(f"Error creating scene clip: {e}", file=sys.stderr)
+                outputs.append(result)
+        if k < len(queues):
+            queues[k].put(done)
+
+    with ContextThreadPool(max_workers=max(1, len(queues))) as pool:
+        for k in range(1, len(stages)):
+            pool.submit(consume, k)
+        try:
+            for item in items:
+                if errors:
+                    break
+                result = stages[0](item)
+                if queues:
+                    queues[0].put(result)
+                else:
+                    outputs.append(result)
+        except Exception as e:
+            errors.append(e)
+        finally:
+            if queues:
+                queues[0].put(done)
+    if errors:
+        raise errors[0]
+    return outputs
+
+
+# =============================================================================
+# HOST SCHEDULER - one CPU budget shared by every ffmpeg of every process on the host
+# =============================================================================
+
+# Priority of the current command's ffmpeg runs - see RENDER_PRIORITIES
+RENDER_PRIORITY = contextvars.ContextVar("render_priority", default="normal")
+
+
+def pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
         return False
+    except PermissionError:
+        pass  # Alive, under another user
+    return True
 
 
-def concatenate_videos_ffmpeg(video_paths: List[str], output_path: str, use_transitions: bool = False) -> bool:
+class RenderScheduler:
     """
-    Concatenate multiple videos using FFmpeg.
-    Optionally uses xfade transitions for professional documentary look.
+    Host-wide thread budget for ffmpeg runs, shared by every video_processor
+    process (CLI calls, the daemon, detached upgrades) through a state file
+    under an flock. Each run asks for the threads it would use and waits in
+    a queue ordered by priority, then arrival; grants go down the queue until
+    the budget is spent, so a run may get fewer threads than it asked for,
+    but never none. Leases and queue entries of dead processes are dropped.
     """
-    try:
-        if not video_paths:
-            return False
-        
+    
+    def __init__(self, root: Path, budget: int):
+        self.root = Path(root)
+        self.budget = max(1, budget)
+        self._ids = itertools.count(1)
+    
+    @contextmanager
+    def _state(self):
+        """The shared state, locked against every other process for the block and saved after it."""
+        self.root.mkdir(parents=True, exist_ok=True)
+        path = self.root / "state.json"
+        with open(self.root / "lock", "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                state = json.loads(path.read_text())
+            except (OSError, ValueError):
+                state = {}
+            state.setdefault("leases", {})
+            state.setdefault("waiting", {})
+            for entries in state.values():
+                for key in [key for key, entry in entries.items() if not pid_alive(entry["pid"])]:
+                    del entries[key]
+            yield state
+            fd, tmp_path = tempfile.mkstemp(prefix=".state_", suffix=".json", dir=self.root)
+            with os.fdopen(fd, "w") as f:
+                json.dump(state, f)
+            os.replace(tmp_path, path)
+    
+    @staticmethod
+    def _queue(state: Dict) -> List[str]:
+        return sorted(
+            state["waiting"],
+            key=lambda key: (RENDER_PRIORITIES.get(state["waiting"][key]["priority"], 1), state["waiting"][key]["since"])
+        )
+    
+    def acquire(self, threads: int, priority: str = "normal") -> Tuple[str, int]:
+        """Wait for a lease of up to `threads` threads; returns (lease id, threads granted)."""
+        key = f"{os.getpid()}-{threading.get_ident()}-{next(self._ids)}"
+        entry = {"pid": os.getpid(), "threads": max(1, threads), "priority": priority, "since": time.time()}
+        delay = 0.02
+        announced = None
+        while True:
+            with self._state() as state:
+                state["waiting"].setdefault(key, entry)
+                free = self.budget - sum(lease["threads"] for lease in state["leases"].values())
+                queue_order = self._queue(state)
+                # Everyone ahead in the queue takes their share of what's free first
+                for ahead in queue_order:
+                    share = min(state["waiting"][ahead]["threads"], free)
+                    if ahead == key:
+                        break
+                    free -= share
+                if share > 0:
+                    del state["waiting"][key]
+                    state["leases"][key] = {**entry, "threads": share, "granted": time.time()}
+                    return key, share
+                position = queue_order.index(key) + 1
+                waiting = len(queue_order)
+            if announced != position:
+                announced = position
+                emit_progress({"event": "queued", "priority": priority, "position": position, "waiting": waiting})
+            time.sleep(delay)
+            delay = min(delay * 2, 0.5)
+    
+    def release(self, key: str):
+        with self._state() as state:
+            state["leases"].pop(key, None)
+            state["waiting"].pop(key, None)
+    
+    @contextmanager
+    def lease(self, threads: int, priority: str = "normal"):
+        """Hold a lease for the block; yields (threads granted, seconds waited)."""
+        started = time.monotonic()
+        key = None
+        try:
+            key, granted = self.acquire(threads, priority)
+            yield granted, time.monotonic() - started
+        finally:
+            # Also drops the queue entry of a wait that was interrupted
+            if key is not None:
+                self.release(key)
+    
+    def status(self) -> Dict:
+        """Budget, threads leased, and queue depth (total and per priority)."""
+        with self._state() as state:
+            leases = list(state["leases"].values())
+            waiting = [state["waiting"][key] for key in self._queue(state)]
+        depth = {priority: 0 for priority in RENDER_PRIORITIES}
+        for entry in waiting:
+            depth[entry["priority"]] = depth.get(entry["priority"], 0) + 1
+        return {
+            "budget": self.budget,
+            "leased_threads": sum(lease["threads"] for lease in leases),
+            "running": len(leases),
+            "queue_depth": len(waiting),
+            "queue_by_priority": depth,
+            "processes": sorted({entry["pid"] for entry in leases + waiting}),
+        }
+
+
+RENDER_SCHEDULER = RenderScheduler(SCHEDULER_DIR, HOST_THREADS or os.cpu_count() or 1) if SCHEDULER_ENABLED else None
+
+
+def apply_thread_grant(cmd: List[str], threads: int) -> List[str]:
+    """
+    Cap an ffmpeg command at `threads`: filter graphs, every decoder and
+    every encoder. Explicit -threads values are clamped; a video encoder
+    without one gets it.
+    """
+    capped = [cmd[0], "-filter_threads", str(threads), "-filter_complex_threads", str(threads)]
+    explicit = "-threads" in cmd
+    i = 1
+    while i < len(cmd):
+        arg = cmd[i]
+        if arg == "-threads" and i + 1 < len(cmd):
+            capped.extend(["-threads", str(min(int(cmd[i + 1]), threads) or threads)])
+            i += 2
+            continue
+        if arg == "-i":
+            # Input options: the decoder of this input
+            capped.extend(["-threads", str(threads)])
+        capped.append(arg)
+        if arg in ("-c:v", "-vcodec") and i + 1 < len(cmd) and cmd[i + 1] != "copy" and not explicit:
+            capped.extend([cmd[i + 1], "-threads", str(threads)])
+            i += 1
+        i += 1
+    return capped
+
+
+def is_stream_copy(cmd: List[str]) -> bool:
+    """Whether an ffmpeg command only remuxes: every codec is "copy" and nothing is filtered."""
+    codecs = [cmd[i + 1] for i, arg in enumerate(cmd[:-1]) if arg in ("-c", "-codec", "-vcodec", "-acodec") or arg.startswith("-c:")]
+    filtered = any(arg in ("-vf", "-af", "-filter_complex", "-lavfi") or arg.startswith("-filter") for arg in cmd)
+    return bool(codecs) and all(codec == "copy" for codec in codecs) and not filtered
+
+
+@contextmanager
+def scheduled(cmd: List[str]):
+    """
+    Run an ffmpeg command inside a RENDER_SCHEDULER lease: yields the command
+    capped at the granted threads plus {"threads", "queued_seconds"} (the
+    command unchanged and {} with the scheduler off). The lease asks for the
+    command's own -threads, else for one render worker's share of the budget.
+    Stream copies barely use a core and run without a lease.
+    """
+    if RENDER_SCHEDULER is None or is_stream_copy(cmd):
+        yield cmd, {}
+        return
+    asked = [int(cmd[i + 1]) for i, arg in enumerate(cmd[:-1]) if arg == "-threads" and cmd[i + 1].isdigit()]
+    if asked and max(asked) > 0:
+        wanted = max(asked)
+    else:
+        wanted = max(1, RENDER_SCHEDULER.budget // resolve_render_budget()[0])
+    with RENDER_SCHEDULER.lease(wanted, RENDER_PRIORITY.get()) as (threads, waited):
+        yield apply_thread_grant(cmd, threads), {"threads": threads, "queued_seconds": round(waited, 3)}
+
+
+@contextmanager
+def render_priority(priority: Optional[str]):
+    """Run the block's ffmpeg runs at a RENDER_PRIORITIES priority."""
+    if priority not in RENDER_PRIORITIES:
+        raise ValueError(f"Unknown priority {priority!r}; expected {', '.join(RENDER_PRIORITIES)}")
+    token = RENDER_PRIORITY.set(priority)
+    try:
+        yield
+    finally:
+        RENDER_PRIORITY.reset(token)
+
+
+# =============================================================================
+# PROGRESS - every ffmpeg's -progress output merged into one JSON-lines event stream
+# =============================================================================
+
+# Tags (stage, chapter, scene, ...) stamped on the events of the current thread or pool task
+PROGRESS_TAGS = contextvars.ContextVar("progress_tags", default={})
+# Overall progress of the command running in this context, if it set one up
+PROGRESS_TRACKER = contextvars.ContextVar("progress_tracker", default=None)
+
+_progress_stream = None
+_progress_lock = threading.Lock()
+
+
+def emit_progress(event: Dict):
+    """Send one event: a job.progress notification inside the daemon, a JSON line to PROGRESS_FD otherwise."""
+    global _progress_stream
+    job = CURRENT_JOB.get()
+    if job is not None:
+        job.connection.notify("job.progress", {"id": job.id, **event})
+        return
+    if not PROGRESS_FD:
+        return
+    line = json.dumps(event) + "\n"
+    with _progress_lock:
+        if _progress_stream is None:
+            try:
+                _progress_stream = os.fdopen(int(PROGRESS_FD), "w", buffering=1)
+            except (OSError, ValueError) as e:
+                print(f"VIDEO_PROGRESS_FD unusable ({e}), progress is off", file=sys.stderr)
+                _progress_stream = open(os.devnull, "w")
+        try:
+            _progress_stream.write(line)
+            _progress_stream.flush()
+        except (OSError, ValueError):
+            pass  # Nobody is listening any more - the render itself carries on
+
+
+@contextmanager
+def progress_tags(**tags):
+    """Tag the progress events of ffmpeg runs started inside the block."""
+    token = PROGRESS_TAGS.set({**PROGRESS_TAGS.get(), **tags})
+    try:
+        yield
+    finally:
+        PROGRESS_TAGS.reset(token)
+
+
+class ProgressTracker:
+    """
+    Overall progress of one command: seconds of output encoded by all of its
+    ffmpeg runs, concurrent ones included, against the seconds it expects to
+    encode. Fallback re-encodes can outrun the estimate, so the percentage
+    stays below 100 until the command returns its result.
+    """
+    
+    def __init__(self, expected_seconds: float):
+        self.expected = max(expected_seconds, 1e-6)
+        self.started = time.monotonic()
+        self._finished = 0.0
+        self._running = {}
+        self._lock = threading.Lock()
+    
+    def update(self, run_id, seconds: float, finished: bool = False) -> Dict:
+        with self._lock:
+            if finished:
+                self._running.pop(run_id, None)
+                self._finished += seconds
+            else:
+                self._running[run_id] = seconds
+            encoded = self._finished + sum(self._running.values())
+        fraction = min(encoded / self.expected, 0.999)
+        elapsed = time.monotonic() - self.started
+        return {
+            "percent": round(100 * fraction, 1),
+            "elapsed_seconds": round(elapsed, 1),
+            "eta_seconds": round(elapsed * (1 - fraction) / fraction, 1) if fraction > 0 else None,
+        }
+
+
+@contextmanager
+def track_progress(expected_seconds: float):
+    """
+    Report percent and ETA for ffmpeg runs inside the block, out of
+    expected_seconds of encoded output. Nested blocks (a chapter assembled
+    as part of a full video) keep the outermost estimate.
+    """
+    if PROGRESS_TRACKER.get() is not None:
+        yield
+        return
+    token = PROGRESS_TRACKER.set(ProgressTracker(expected_seconds))
+    try:
+        yield
+    finally:
+        PROGRESS_TRACKER.reset(token)
+
+
+def parse_progress_number(value: Optional[str]) -> Optional[float]:
+    try:
+        return float(value.rstrip("x"))
+    except (AttributeError, ValueError):
+        return None  # "N/A" until ffmpeg has output to measure
+
+
+def relay_progress(stream, duration: Optional[float], last: Optional[Dict] = None):
+    """
+    Turn ffmpeg's -progress key=value blocks into events until the stream
+    closes. The latest event is also kept in last, if given.
+    """
+    tags = PROGRESS_TAGS.get()
+    tracker = PROGRESS_TRACKER.get()
+    run_id = object()
+    block = {}
+    seconds = 0.0
+    ended = False
+    for raw in stream:
+        key, _, value = raw.decode(errors="replace").strip().partition("=")
+        if key != "progress":
+            block[key] = value
+            continue
+        out_us = parse_progress_number(block.get("out_time_us"))
+        if out_us is not None:
+            seconds = max(seconds, out_us / 1e6)
+        ended = value == "end"
+        event = {
+            "event": "progress",
+            **tags,
+            "frame": int(parse_progress_number(block.get("frame")) or 0),
+            "fps": parse_progress_number(block.get("fps")),
+            "speed": parse_progress_number(block.get("speed")),
+            "out_seconds": round(seconds, 2),
+        }
+        if duration:
+            event["run_percent"] = round(min(100.0, 100 * seconds / duration), 1)
+        if tracker is not None:
+            event.update(tracker.update(run_id, seconds, finished=ended))
+        emit_progress(event)
+        if last is not None:
+            last.update(event)
+        block = {}
+    if tracker is not None and not ended:
+        tracker.update(run_id, seconds, finished=True)
+
+
+def run_ffmpeg(cmd: List[str], duration: Optional[float] = None, feed=None) -> subprocess.CompletedProcess:
+    """
+    subprocess.run(cmd, capture_output=True, text=True) for an ffmpeg command,
+    with its -progress reports relayed as events (see relay_progress).
+    duration is the seconds of output the run should produce, for a per-run
+    percentage. feed(stdin), if given, writes the input piped to "-i -";
+    otherwise stdin is closed so ffmpeg never reads its caller's (the
+    daemon's request stream, for one). The run waits for its threads from
+    the host scheduler first (see scheduled).
+    """
+    cmd = [cmd[0], "-progress", "pipe:1", "-nostats", *cmd[1:]]
+    span_attrs = subprocess_span_attrs(cmd) if TRACE.get() is not None else {}
+    with scheduled(cmd) as (cmd, grant), trace_span("ffmpeg", "subprocess", **span_attrs, **grant) as span:
+        proc = subprocess.Popen(
+            cmd, stdin=subprocess.PIPE if feed else subprocess.DEVNULL,
+            stdout=subprocess.PIPE, stderr=subprocess.PIPE
+        )
+        stderr = []
+        last = {}
+        drain = threading.Thread(target=lambda: stderr.append(proc.stderr.read()), daemon=True)
+        relay = threading.Thread(
+            target=contextvars.copy_context().run, args=(relay_progress, proc.stdout, duration, last), daemon=True
+        )
+        drain.start()
+        relay.start()
+        if feed:
+            try:
+                feed(proc.stdin)
+                proc.stdin.close()
+            except BrokenPipeError:
+                pass  # ffmpeg stopped reading: -t was reached, or it failed and says so on stderr
+            except BaseException:
+                # A half-fed encoder would otherwise finish a truncated clip
+                proc.kill()
+                proc.wait()
+                raise
+        returncode = proc.wait()
+        relay.join()
+        drain.join()
+        span.update(
+            returncode=returncode, output_bytes=file_size(cmd[-1]),
+            frames=last.get("frame"), fps=last.get("fps"), speed=last.get("speed"),
+            out_seconds=last.get("out_seconds")
+        )
+    return subprocess.CompletedProcess(cmd, returncode, "", b"".join(stderr).decode(errors="replace"))
+
+
+# =============================================================================
+# MEDIA METADATA - native WAV headers, batched ffprobe, persistent cache
+# =============================================================================
+
+WAV_CODECS = {1: "pcm_s{bits}le", 3: "pcm_f{bits}le", 6: "pcm_alaw", 7: "pcm_mulaw"}
+
+
+def read_wav_info(path: str) -> Optional[Dict]:
+    """
+    Read a RIFF/WAVE header without spawning ffprobe. Returns ffprobe-shaped
+    {"format": ..., "streams": [...]}, or None for anything that isn't plain WAV.
+    Streaming writers (like the TTS output) leave placeholder RIFF/data sizes,
+    so the data size is clamped to what the file actually holds.
+    """
+    file_size = os.path.getsize(path)
+    with open(path, "rb") as f:
+        riff = f.read(12)
+        if len(riff) < 12 or riff[:4] != b"RIFF" or riff[8:12] != b"WAVE":
+            return None
+        fmt = None
+        while True:
+            header = f.read(8)
+            if len(header) < 8:
+                return None
+            chunk_id, chunk_size = header[:4], struct.unpack("<I", header[4:])[0]
+            if chunk_id == b"fmt ":
+                fmt = f.read(chunk_size)
+                if len(fmt) < 16:
+                    return None
+                f.seek(chunk_size & 1, os.SEEK_CUR)
+            elif chunk_id == b"data":
+                data_offset = f.tell()
+                break
+            else:
+                f.seek(chunk_size + (chunk_size & 1), os.SEEK_CUR)
+    
+    if fmt is None:
+        return None
+    format_tag, channels, sample_rate, byte_rate, block_align, bits = struct.unpack("<HHIIHH", fmt[:16])
+    if format_tag == 0xFFFE and len(fmt) >= 26:
+        # WAVE_FORMAT_EXTENSIBLE - the real tag leads the sub-format GUID
+        format_tag = struct.unpack("<H", fmt[24:26])[0]
+    if format_tag not in WAV_CODECS or not byte_rate:
+        return None
+    codec = "pcm_u8" if format_tag == 1 and bits == 8 else WAV_CODECS[format_tag].format(bits=bits)
+    
+    data_size = min(chunk_size, file_size - data_offset)
+    duration = f"{data_size / byte_rate:.6f}"
+    return {
+        "format": {
+            "filename": path,
+            "format_name": "wav",
+            "duration": duration,
+            "size": str(file_size),
+            "bit_rate": str(byte_rate * 8),
+        },
+        "streams": [{
+            "index": 0,
+            "codec_type": "audio",
+            "codec_name": codec,
+            "sample_rate": str(sample_rate),
+            "channels": channels,
+            "bits_per_sample": bits,
+            "block_align": block_align,
+            "duration": duration,
+        }],
+    }
+
+
+def run_ffprobe(path: str) -> Optional[Dict]:
+    """Full ffprobe of one file (format, streams and extradata hashes)."""
+    cmd = [
+        "ffprobe", "-v", "quiet",
+        "-print_format", "json",
+        "-show_format", "-show_streams",
+        "-show_data_hash", "sha256",
+        path
+    ]
+    span_attrs = subprocess_span_attrs(cmd) if TRACE.get() is not None else {}
+    with trace_span("ffprobe", "subprocess", **span_attrs) as span:
+        result = subprocess.run(cmd, capture_output=True, text=True)
+        span["returncode"] = result.returncode
+    if result.returncode != 0:
+        return None
+    return json.loads(result.stdout)
+
+
+class MediaProbeCache:
+    """
+    ffprobe-shaped metadata for media files, persisted as JSON so later
+    renders skip probing entirely. An entry is valid while the file's size
+    and mtime are unchanged. WAV files are parsed natively; everything else
+    is probed with ffprobe, in parallel when several files miss at once.
+    New entries are saved once per command (see run_command); probes of
+    scratch intermediates are only kept in memory.
+    """
+    
+    def __init__(self, path: Path, probe_workers: int = 8):
+        self.path = Path(path)
+        self.probe_workers = probe_workers
+        self._entries = None
+        self._dirty = False
+        self._lock = threading.Lock()
+    
+    def _load(self):
+        if self._entries is None:
+            try:
+                with open(self.path) as f:
+                    self._entries = json.load(f)
+            except (OSError, ValueError):
+                self._entries = {}
+    
+    def save(self):
+        """Merge this process's entries into the file, dropping files that no longer exist and scratch files."""
+        with self._lock:
+            if not self._dirty:
+                return
+            try:
+                with open(self.path) as f:
+                    entries = json.load(f)
+            except (OSError, ValueError):
+                entries = {}
+            entries.update(self._entries)
+            entries = {path: entry for path, entry in entries.items() if not is_scratch_path(path) and os.path.exists(path)}
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                fd, tmp_path = tempfile.mkstemp(suffix=".tmp", dir=self.path.parent)
+                with os.fdopen(fd, "w") as f:
+                    json.dump(entries, f)
+                os.replace(tmp_path, self.path)
+                self._entries = entries
+                self._dirty = False
+            except OSError as e:
+                print(f"Warning: Could not save probe cache: {e}", file=sys.stderr)
+    
+    @traced("probe", "probe", paths=lambda a: len(a["paths"]))
+    def probe_many(self, paths: List[str]) -> Dict[str, Dict]:
+        """Metadata for every readable path (missing or unprobeable files map to {})."""
+        results = {}
+        pending = []
+        with self._lock:
+            self._load()
+            for path in dict.fromkeys(paths):
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    results[path] = {}
+                    continue
+                key = os.path.abspath(path)
+                entry = self._entries.get(key)
+                if entry and entry["size"] == st.st_size and entry["mtime_ns"] == st.st_mtime_ns:
+                    results[path] = entry["info"]
+                else:
+                    pending.append((path, key, st))
+        
+        def probe(path: str) -> Optional[Dict]:
+            try:
+                return read_wav_info(path) or run_ffprobe(path)
+            except (OSError, ValueError, struct.error):
+                return run_ffprobe(path)
+        
+        trace_annotate(probed=len(pending))
+        if pending:
+            with ContextThreadPool(max_workers=min(self.probe_workers, len(pending))) as pool:
+                infos = list(pool.map(probe, [path for path, _, _ in pending]))
+            with self._lock:
+                for (path, key, st), info in zip(pending, infos):
+                    results[path] = info or {}
+                    if info:
+                        self._entries[key] = {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "info": info}
+                        self._dirty = self._dirty or not is_scratch_path(key)
+        return results
+    
+    def probe(self, path: str) -> Dict:
+        return self.probe_many([path])[path]
+
+
+def is_scratch_path(path: str) -> bool:
+    """Whether path is a job workspace intermediate or another TEMP_DIR scratch file, rather than a kept cache file."""
+    path = os.path.abspath(path)
+    
+    def under(root: Path) -> bool:
+        return path.startswith(os.path.join(os.path.abspath(root), ""))
+    
+    kept = (SCENE_CACHE_DIR, CHECKPOINT_DIR, SOURCE_CACHE_DIR, TYPEWRITER_CACHE_DIR)
+    return under(TEMP_DIR) and not any(under(root) for root in kept)
+
+
+MEDIA_PROBE = MediaProbeCache(PROBE_CACHE_PATH)
+
+
+def get_media_info(path: str) -> Dict:
+    """ffprobe-shaped metadata for one file, from the probe cache."""
+    return MEDIA_PROBE.probe(path)
+
+
+def prefetch_media_info(paths: List[str]):
+    """Probe a batch of files up front so later lookups are cache hits."""
+    paths = [p for p in paths if p]
+    if paths:
+        MEDIA_PROBE.probe_many(paths)
+
+
+def get_audio_duration(audio_path: str) -> float:
+    """Get audio duration (native WAV header or cached ffprobe)."""
+    try:
+        return float(get_media_info(audio_path).get("format", {}).get("duration", 5.0))
+    except (TypeError, ValueError):
+        return 5.0
+
+
+def build_zoompan_filter(effect: str, total_frames: int, w: int, h: int, fps: int) -> str:
+    """
+    Build a professional Ken Burns zoompan filter with smooth easing.
+    Uses preset-based motion for VidRush-style documentary effects.
+    """
+    preset = KEN_BURNS_PRESETS.get(effect, KEN_BURNS_PRESETS["zoom_in_center"])
+    
+    sz = preset["start_zoom"]
+    ez = preset["end_zoom"]
+    sx = preset["start_x"]
+    ex = preset["end_x"]
+    sy = preset["start_y"]
+    ey = preset["end_y"]
+    
+    # Smooth easing using sine curve: sin((on/d)*PI/2)^2 for ease-in-out
+    # t = on/{total_frames} is progress 0->1
+    # ease = (1 - cos(t * PI)) / 2 gives smooth S-curve
+    t = f"(on/{total_frames})"
+    ease = f"((1-cos({t}*PI))/2)"
+    
+    # Interpolate zoom with easing
+    zoom_expr = f"({sz}+({ez}-{sz})*{ease})"
+    
+    # Calculate pan positions (relative to image dimensions)
+    # x position: start_x -> end_x (0.0-1.0 maps to image position)
+    x_expr = f"(({sx}+({ex}-{sx})*{ease})*iw - iw/zoom/2)"
+    y_expr = f"(({sy}+({ey}-{sy})*{ease})*ih - ih/zoom/2)"
+    
+    return f"zoompan=z='{zoom_expr}':x='{x_expr}':y='{y_expr}':d={total_frames}:s={w}x{h}:fps={fps}"
+
+
+# Legacy effect names still sent by older callers
+EFFECT_ALIASES = {
+    "zoom_in": "zoom_in_center",
+    "zoom_out": "zoom_out_center",
+    "pan_left": "pan_left_zoom",
+    "pan_right": "pan_right_zoom",
+    "pan_up": "pan_up_zoom",
+    "pan_down": "pan_down_zoom",
+}
+
+
+def build_scene_video_filters(
+    effect: str,
+    duration: float,
+    fps: int,
+    w: int,
+    h: int,
+    text_overlay: Optional[Dict] = None,
+    gray_source: bool = False,
+    motion: bool = True
+) -> str:
+    """
+    Build the per-scene video chain: Ken Burns motion, documentary grade,
+    optional text overlay. Shared by scene clips and the single-pass compiler
+    so both produce the same picture. gray_source means the input is a
+    prepared grayscale image (prepare_source_image), so the chain skips the
+    desaturation and only lifts it back to YUV for the colored text.
+    motion=False leaves out zoompan for frames that arrive already moved
+    (the "warp" engine).
+    """
+    total_frames = int(duration * fps)
+    effect = EFFECT_ALIASES.get(effect, effect)
+    
+    # Build zoompan filter with smooth easing
+    zoompan = build_zoompan_filter(effect, total_frames, w, h, fps)
+    
+    # Professional documentary look filters
+    # - Black and white with enhanced contrast
+    # - Subtle film grain for cinematic feel
+    # - Slight vignette for focus
+    bw_filter = "format=yuv420p" if gray_source else "hue=s=0"
+    contrast_filter = "eq=contrast=1.1:brightness=0.02"
+    
+    video_filters = f"{zoompan},{bw_filter},{contrast_filter}" if motion else f"{bw_filter},{contrast_filter}"
+    
+    # Add text overlay if specified
+    if text_overlay and text_overlay.get("text"):
+        overlay_text = text_overlay["text"]
+        overlay_style = text_overlay.get("style", "date_overlay")
+        use_typewriter = text_overlay.get("typewriter", False)
+        text_start = text_overlay.get("start_time", 0.5)
+        
+        if use_typewriter:
+            text_filter = build_typewriter_filter(
+                overlay_text, overlay_style, start_time=text_start, w=w, h=h, fps=fps
+            )
+        else:
+            text_filter = build_simple_text_filter(
+                overlay_text, overlay_style, start_time=text_start, w=w, h=h
+            )
+        video_filters = f"{video_filters},{text_filter}"
+    
+    return f"{video_filters},format=yuv420p"
+
+
+def x264_quality_args(quality: str = "high", threads: Optional[int] = None) -> List[str]:
+    """libx264 encoder arguments for a quality mode, at the ENCODER_PRESET a deadline chose if any."""
+    if quality == "high":
+        args = ["-c:v", "libx264", "-preset", "slow", "-crf", "18", "-profile:v", "high", "-level", "4.2"]
+    elif quality == "draft":
+        args = ["-c:v", "libx264", "-preset", "ultrafast", "-crf", "28"]
+    else:
+        args = ["-c:v", "libx264", "-preset", "fast", "-crf", "23"]
+    preset = ENCODER_PRESET.get()
+    if preset and quality != "draft":
+        args[args.index("-preset") + 1] = preset
+    if threads:
+        args.extend(["-threads", str(threads)])
+    return args
+
+
+def video_codec_args(quality: str = "high", threads: Optional[int] = None, final: bool = True) -> List[str]:
+    """Video encoder arguments for a delivered video (the quality tier) or an intermediate (MEZZANINE_FORMAT)."""
+    mezzanine = MEZZANINE_CODECS.get(MEZZANINE_FORMAT)
+    if final or mezzanine is None:
+        # Encodes from mezzanine inputs would otherwise inherit their handler name
+        return x264_quality_args(quality, threads) + ["-metadata:s:v:0", "handler_name=VideoHandler"]
+    args = [*mezzanine, "-metadata:s:v:0", f"handler_name={MEZZANINE_HANDLER}"]
+    if threads:
+        args.extend(["-threads", str(threads)])
+    return args
+
+
+def is_mezzanine(path: str) -> bool:
+    """Whether a clip's video is an intermediate encode (see video_codec_args)."""
+    for stream in get_media_info(path).get("streams", []):
+        if stream.get("codec_type") == "video":
+            return stream.get("tags", {}).get("handler_name") == MEZZANINE_HANDLER
+    return False
+
+
+def video_copy_args(input_paths: List[str], quality: str = "high", final: bool = True) -> List[str]:
+    """
+    Video arguments for joining input_paths unchanged: a stream copy, unless
+    the join delivers the video and some input is a mezzanine clip.
+    """
+    if final and any(is_mezzanine(path) for path in input_paths):
+        return video_codec_args(quality)
+    return ["-c:v", "copy"]
+
+
+def audio_codec_args(final: bool = True) -> List[str]:
+    """Audio encoder arguments for a delivered video (AAC) or an intermediate (lossless)."""
+    return list(FINAL_AUDIO_CODEC if final else MEZZANINE_AUDIO_CODEC)
+
+
+def audio_copy_args(input_paths: List[str], final: bool = True) -> List[str]:
+    """
+    Audio arguments for joining input_paths unchanged: a stream copy when
+    every input already has the target codec, else one encode to it.
+    """
+    target = audio_codec_args(final)
+    codecs = set()
+    for path in input_paths:
+        streams = get_media_info(path).get("streams", [])
+        codecs.add(next((s.get("codec_name") for s in streams if s.get("codec_type") == "audio"), None))
+    return ["-c:a", "copy"] if codecs == {target[1]} else target
+
+
+def concat_demuxable(input_paths: List[str]) -> bool:
+    """
+    Whether the concat demuxer can join input_paths: it decodes every file
+    with the first one's codec parameters, so their streams must agree.
+    """
+    layouts = set()
+    for path in input_paths:
+        layouts.add(tuple(
+            (s.get("codec_type"), s.get("codec_name"), s.get("sample_rate"), s.get("channels"))
+            for s in get_media_info(path).get("streams", [])
+            if s.get("codec_type") in ("video", "audio")
+        ))
+    return len(layouts) == 1
+
+
+def rendition_paths(output_path: str, renditions) -> Dict[str, str]:
+    """
+    Profile -> path for a renditions option: a list of OUTPUT_PROFILES names,
+    written beside output_path as <stem>_<profile><suffix>, or a dict of
+    profile -> path.
+    """
+    if not renditions:
+        return {}
+    if isinstance(renditions, dict):
+        paths = dict(renditions)
+    else:
+        output = Path(output_path)
+        paths = {profile: str(output.with_name(f"{output.stem}_{profile}{output.suffix or '.mp4'}")) for profile in renditions}
+    unknown = sorted(set(paths) - set(OUTPUT_PROFILES))
+    if unknown:
+        raise ValueError(f"Unknown output profile(s) {', '.join(unknown)}; expected {', '.join(OUTPUT_PROFILES)}")
+    return paths
+
+
+def rendition_filter(profile: str) -> str:
+    """Centre cut to the profile's aspect ratio (even sides, for 4:2:0) and scale to its size."""
+    w, h = OUTPUT_PROFILES[profile]
+    return (
+        f"crop='trunc(min(iw,ih*{w}/{h})/2)*2':'trunc(min(ih,iw*{h}/{w})/2)*2',"
+        f"scale={w}:{h}:flags=lanczos,setsar=1"
+    )
+
+
+def ladder_outputs(
+    video: str,
+    audio: str,
+    output_path: Optional[str],
+    renditions: Optional[Dict[str, str]],
+    output_args: List[str]
+) -> Tuple[List[str], List[str]]:
+    """
+    Filter graph chains and output arguments that write one ffmpeg's composed
+    video and audio to output_path (None: renditions only) and to every
+    rendition (profile -> path). video and audio are graph labels ("[v]") or
+    input streams ("[1:a]"); the video is split after composition, so decode,
+    motion, grade and text run once for all outputs. output_args (encoder,
+    duration...) are repeated for each output.
+    """
+    outputs = ([(None, output_path)] if output_path else []) + list((renditions or {}).items())
+
+    def branches(label: str, split: str, name: str) -> List[str]:
+        # Input streams can be mapped any number of times; graph labels are consumed once
+        if len(outputs) == 1 or (":" in label and split == "asplit"):
+            return [label] * len(outputs)
+        labels = [f"[ladder_{name}{i}]" for i in range(len(outputs))]
+        graph.append(f"{label}{split}={len(outputs)}{''.join(labels)}")
+        return labels
+
+    def map_arg(label: str) -> str:
+        return label.strip("[]") if ":" in label else label
+
+    graph = []
+    videos = branches(video, "split", "v")
+    audios = branches(audio, "asplit", "a")
+    args = []
+    for i, ((profile, path), video_branch, audio_branch) in enumerate(zip(outputs, videos, audios)):
+        if profile:
+            graph.append(f"{video_branch}{rendition_filter(profile)}[ladder_r{i}]")
+            video_branch = f"[ladder_r{i}]"
+        args.extend(["-map", map_arg(video_branch), "-map", map_arg(audio_branch), *output_args, path])
+    return graph, args
+
+
+@traced("renditions", "encode", profiles=lambda a: sorted(a["renditions"] or {}))
+def transcode_renditions(
+    source_path: str,
+    renditions: Optional[Dict[str, str]],
+    quality: str = "high",
+    threads: Optional[int] = None
+) -> bool:
+    """
+    Write renditions (profile -> path) of a finished video with one decode and
+    one encode per profile. For outputs that were stream-copied together and
+    so had no composed frames to branch from; the audio is copied.
+    """
+    if not renditions:
+        return True
+    try:
+        graph, outputs = ladder_outputs(
+            "[0:v]", "[0:a]", None, renditions, [*video_codec_args(quality, threads), *audio_copy_args([source_path])]
+        )
+        cmd = ["ffmpeg", "-y", "-i", source_path, "-filter_complex", ";".join(graph), *outputs]
+        with progress_tags(stage="renditions"):
+            result = run_ffmpeg(cmd, get_video_duration_ffprobe(source_path))
+        if result.returncode != 0:
+            print(f"Rendition encode error: {result.stderr[-500:]}", file=sys.stderr)
+        return result.returncode == 0
+
+    except Exception as e:
+        print(f"Error encoding renditions: {e}", file=sys.stderr)
+        return False
+
+
+def render_format(quality: str) -> Tuple[int, tuple]:
+    """(fps, resolution) a quality tier renders at."""
+    if quality == "draft":
+        return DRAFT_FPS, DRAFT_RESOLUTION
+    return 24, (1920, 1080)
+
+
+def draft_plans(plans: List[Dict]) -> List[Dict]:
+    """Draft renders show typewriter text whole with a plain fade-in, skipping the reveal render."""
+    drafted = []
+    for plan in plans:
+        overlay = plan.get("text_overlay")
+        if overlay and overlay.get("typewriter"):
+            plan = {**plan, "text_overlay": {**overlay, "typewriter": False}}
+        drafted.append(plan)
+    return drafted
+
+
+def transition_keyframe_args(duration: float, fps: int, transition: float) -> List[str]:
+    """
+    Encoder arguments that make a clip ready for smart crossfade concat:
+    a whole number of frames, with IDR frames exactly `transition` seconds
+    from each end so the body can be stream-copied.
+    """
+    frames = int(duration * fps)
+    edge = int(round(transition * fps))
+    # Half a frame early: a forced keyframe lands on the first frame at or after the time
+    return [
+        "-frames:v", str(frames),
+        "-force_key_frames", f"{(edge - 0.5) / fps:.6f},{(frames - edge - 0.5) / fps:.6f}",
+        "-forced-idr", "1",
+    ]
+
+
+def ken_burns_engine_in_use(engine: Optional[str] = None) -> str:
+    """The Ken Burns engine that actually runs: "warp" needs OpenCV, else zoompan stands in."""
+    return "warp" if (engine or KEN_BURNS_ENGINE) == "warp" and cv2 is not None else "zoompan"
+
+
+@traced(
+    "encode_scene", "scene",
+    effect=lambda a: a["effect"],
+    style=lambda a: (a["text_overlay"] or {}).get("style"),
+    duration=lambda a: a["duration"],
+    quality=lambda a: a["quality"],
+    input_bytes=lambda a: total_size([a["image_path"], a["audio_path"]])
+)
+def create_scene_clip_ffmpeg(
+    image_path: str,
+    output_path: str,
+    duration: float,
+    audio_path: Optional[str] = None,
+    effect: str = "zoom_in_center",
+    fps: int = 24,
+    resolution: tuple = (1920, 1080),
+    quality: str = "high",
+    text_overlay: Optional[Dict] = None,
+    threads: Optional[int] = None,
+    transition_keyframes: Optional[float] = None,
+    ken_burns_engine: Optional[str] = None,
+    final: bool = True,
+    renditions: Optional[Dict[str, str]] = None
+) -> bool:
+    """
+    Create a single scene clip with professional Ken Burns effect.
+    Uses preset-based motion with smooth easing for VidRush-style quality.
+    
+    text_overlay options:
+        - text: str - The text to display
+        - style: str - Style preset (year_title, chapter_title, date_overlay, location_text, caption)
+        - typewriter: bool - Use typewriter animation
+        - start_time: float - When text appears (default 0.5)
+    
+    threads caps the x264 encoder threads so parallel renders don't oversubscribe the CPU.
+    transition_keyframes (seconds) places keyframes for concatenate_with_smart_crossfade.
+    ken_burns_engine picks "zoompan" or "warp" (default VIDEO_KEN_BURNS_ENGINE).
+    final=False makes an intermediate for a longer video: lossless audio and
+    MEZZANINE_FORMAT video - except with transition_keyframes, as smart
+    crossfade copies the clip's body into its output.
+    renditions (OUTPUT_PROFILES name -> path) are encoded by the same ffmpeg
+    from the same composed frames (see ladder_outputs).
+    """
+    try:
+        w, h = resolution
+        source = prepare_source_image(image_path, ken_burns_source_size(w, h), fit="shrink")
+        warp = ken_burns_engine_in_use(ken_burns_engine) == "warp"
+        video_filters = build_scene_video_filters(
+            effect, duration, fps, w, h, text_overlay, gray_source=warp or source is not None, motion=not warp
+        )
+        # Smart concat needs audio and video to end on the same frame boundary
+        clip_duration = int(duration * fps) / fps if transition_keyframes else duration
+        if warp:
+            video_input = ["-f", "rawvideo", "-pix_fmt", "gray", "-s", f"{w}x{h}", "-r", str(fps), "-i", "-"]
+        else:
+            video_input = ["-loop", "1", "-i", source or image_path]
+        
+        graph = [f"[0:v]{video_filters}[v]"]
+        if audio_path and os.path.exists(audio_path):
+            # With audio - pad audio to match video duration for dramatic pause
+            # Use apad to extend audio with silence, then trim to exact video duration
+            audio_filter = f"apad=whole_dur={clip_duration}"
+            audio_input = ["-i", audio_path]
+            graph.append(f"[1:a]{audio_filter}[a]")
+            audio = "[a]"
+        else:
+            # No audio - generate silent audio track for crossfade compatibility
+            audio_input = ["-f", "lavfi", "-i", f"anullsrc=channel_layout=stereo:sample_rate=48000:duration={duration}"]
+            audio = "[1:a]"
+        output_args = video_codec_args(quality, threads, final or bool(transition_keyframes))
+        if transition_keyframes:
+            output_args.extend(transition_keyframe_args(duration, fps, transition_keyframes))
+        output_args.extend([*audio_codec_args(final), "-t", str(clip_duration)])
+        ladder, outputs = ladder_outputs("[v]", audio, output_path, renditions, output_args)
+        cmd = ["ffmpeg", "-y", *video_input, *audio_input, "-filter_complex", ";".join(graph + ladder), *outputs]
+        
+        if warp:
+            frames = math.ceil(round(clip_duration * fps, 6))
+            result = pipe_ken_burns_frames(cmd, source or image_path, effect, frames, int(duration * fps), w, h, clip_duration)
+        else:
+            result = run_ffmpeg(cmd, clip_duration)
+        if result.returncode != 0:
+            print(f"FFmpeg error: {result.stderr}", file=sys.stderr)
+        return result.returncode == 0
+        
+    except Exception as e:
+        print(f"Error creating scene clip: {e}", file=sys.stderr)
+        return False
+
+
+@traced(
+    "concat", "concat",
+    clips=lambda a: len(a["video_paths"]),
+    transitions=lambda a: a["use_transitions"],
+    smart=lambda a: a["smart_transitions"],
+    input_bytes=lambda a: total_size(a["video_paths"])
+)
+def concatenate_videos_ffmpeg(
+    video_paths: List[str],
+    output_path: str,
+    use_transitions: bool = False,
+    smart_transitions: bool = False,
+    quality: str = "high",
+    work_dir: Optional[str] = None,
+    manifest: Optional["RenderManifest"] = None,
+    final: bool = True,
+    renditions: Optional[Dict[str, str]] = None
+) -> bool:
+    """
+    Concatenate multiple videos using FFmpeg.
+    Optionally uses xfade transitions for professional documentary look,
+    merged in bounded batches so any number of clips keeps its transitions.
+    smart_transitions re-encodes only the crossfade windows; the inputs must
+    be rendered with transition_keyframes at the given quality. A manifest
+    checkpoints those windows (see concatenate_with_smart_crossfade).
+    final makes the delivered video: mezzanine inputs are re-encoded at the
+    quality tier and the audio encoded to AAC, unless it already is.
+    Otherwise the output is another intermediate (see video_codec_args).
+    renditions (OUTPUT_PROFILES name -> path) branch from the final encode,
+    or are transcoded from the output when it was stream-copied.
+    """
+    try:
+        if not video_paths:
+            return False
+        
         if len(video_paths) == 1:
-            # Just copy if single video
-            subprocess.run(["cp", video_paths[0], output_path], check=True)
-            return True
+            video_args = video_copy_args(video_paths, quality, final)
+            audio_args = audio_copy_args(video_paths, final)
+            # A stream copy has no decoded frames to branch renditions from
+            copied = video_args == ["-c:v", "copy"]
+            if copied and audio_args == ["-c:a", "copy"]:
+                # Just copy if single video
+                subprocess.run(["cp", video_paths[0], output_path], check=True)
+            else:
+                ladder, outputs = ladder_outputs(
+                    "[0:v]", "[0:a]", output_path, None if copied else renditions, [*video_args, *audio_args]
+                )
+                graph = ["-filter_complex", ";".join(ladder)] if ladder else []
+                if run_ffmpeg(["ffmpeg", "-y", "-i", video_paths[0], *graph, *outputs]).returncode != 0:
+                    return False
+            return transcode_renditions(output_path, renditions, quality) if copied else True
         
         if use_transitions and len(video_paths) >= 2:
-            return concatenate_with_crossfade(video_paths, output_path)
+            return concatenate_with_crossfade_tree(
+                video_paths, output_path,
+                quality=quality,
+                smart=smart_transitions,
+                work_dir=work_dir,
+                manifest=manifest,
+                final=final,
+                renditions=renditions
+            )
+        
+        if not concat_demuxable(video_paths):
+            # Mixed codecs (an AAC intro before FLAC chapters): decode each input with its own decoder
+            joined = "".join(f"[{i}:v][{i}:a]" for i in range(len(video_paths)))
+            ladder, outputs = ladder_outputs(
+                "[joined_v]", "[joined_a]", output_path, renditions,
+                [*video_codec_args(quality, final=final), *audio_codec_args(final)]
+            )
+            cmd = [
+                "ffmpeg", "-y",
+                *[arg for path in video_paths for arg in ("-i", path)],
+                "-filter_complex", ";".join([f"{joined}concat=n={len(video_paths)}:v=1:a=1[joined_v][joined_a]", *ladder]),
+                *outputs
+            ]
+            return run_ffmpeg(cmd).returncode == 0
         
         # Simple concat for speed (no transitions)
-        concat_file = TEMP_DIR / "concat_list.txt"
-        with open(concat_file, "w") as f:
+        ensure_dirs()
+        fd, concat_path = tempfile.mkstemp(prefix="concat_", suffix=".txt", dir=TEMP_DIR)
+        concat_file = Path(concat_path)
+        with os.fdopen(fd, "w") as f:
             for vp in video_paths:
                 f.write(f"file '{os.path.abspath(vp)}'\n")
         
+        video_args = video_copy_args(video_paths, quality, final)
+        copied = video_args == ["-c:v", "copy"]
+        ladder, outputs = ladder_outputs(
+            "[0:v]", "[0:a]", output_path, None if copied else renditions,
+            [*video_args, *audio_copy_args(video_paths, final)]
+        )
         cmd = [
             "ffmpeg", "-y",
             "-f", "concat", "-safe", "0",
             "-i", str(concat_file),
-            "-c", "copy",
-            output_path
+            *(["-filter_complex", ";".join(ladder)] if ladder else []),
+            *outputs
         ]
         
-        result = subprocess.run(cmd, capture_output=True, text=True)
+        result = run_ffmpeg(cmd)
+        
+        # Clean up concat file
+        if concat_file.exists():
+            concat_file.unlink()
+        
+        if result.returncode != 0:
+            return False
+        return transcode_renditions(output_path, renditions, quality) if copied else True
+        
+    except Exception as e:
+        print(f"Error concatenating videos: {e}", file=sys.stderr)
+        return False
+
+
+def get_video_duration_ffprobe(video_path: str) -> float:
+    """Get video duration using (cached) ffprobe."""
+    try:
+        return float(get_media_info(video_path).get("format", {}).get("duration", 5.0))
+    except (TypeError, ValueError):
+        return 5.0
+
+
+def get_video_stream_duration(video_path: str) -> float:
+    """
+    Duration of the video stream alone. The container duration also covers
+    AAC padding, which would shift every xfade offset after the first.
+    """
+    stream = probe_video_stream(video_path)
+    if stream and stream.get("duration"):
+        return float(stream["duration"])
+    return get_video_duration_ffprobe(video_path)
+
+
+@traced(
+    "crossfade", "crossfade",
+    clips=lambda a: len(a["video_paths"]),
+    input_bytes=lambda a: total_size(a["video_paths"])
+)
+def concatenate_with_crossfade(
+    video_paths: List[str],
+    output_path: str,
+    transition_duration: float = 0.75,
+    quality: str = "high",
+    threads: Optional[int] = None,
+    final: bool = True,
+    renditions: Optional[Dict[str, str]] = None
+) -> bool:
+    """
+    Concatenate videos with professional crossfade transitions.
+    Uses FFmpeg xfade filter for smooth dissolves between scenes.
+    Opens every clip at once - use concatenate_with_crossfade_tree for long runs.
+    renditions (OUTPUT_PROFILES name -> path) branch from the crossfaded frames.
+    """
+    try:
+        if len(video_paths) < 2:
+            if video_paths:
+                return concatenate_videos_ffmpeg(video_paths, output_path, final=final, renditions=renditions)
+            return True
+        
+        # Get durations for all videos
+        durations = [get_video_stream_duration(vp) for vp in video_paths]
+        
+        # Build complex filter for xfade transitions
+        # For N videos, we need N-1 xfade filters chained together
+        inputs = " ".join([f"-i \"{vp}\"" for vp in video_paths])
+        
+        filter_parts = []
+        audio_filter_parts = []
+        
+        # Calculate offsets for each transition
+        # First video plays, then at (duration - transition_duration), we start crossfade
+        cumulative_offset = 0
+        
+        for i in range(len(video_paths) - 1):
+            offset = cumulative_offset + durations[i] - transition_duration
+            
+            if i == 0:
+                # First transition: [0:v][1:v]
+                filter_parts.append(f"[{i}:v][{i+1}:v]xfade=transition=fade:duration={transition_duration}:offset={offset}[v{i+1}]")
+                audio_filter_parts.append(f"[{i}:a][{i+1}:a]acrossfade=d={transition_duration}[a{i+1}]")
+            else:
+                # Subsequent transitions: [prev_output][next]
+                filter_parts.append(f"[v{i}][{i+1}:v]xfade=transition=fade:duration={transition_duration}:offset={offset}[v{i+1}]")
+                audio_filter_parts.append(f"[a{i}][{i+1}:a]acrossfade=d={transition_duration}[a{i+1}]")
+            
+            cumulative_offset = offset
+        
+        # Final output labels
+        video_label = f"v{len(video_paths)-1}"
+        audio_label = f"a{len(video_paths)-1}"
+        
+        # xfade negotiates 4:4:4, which the high profile can't encode
+        filter_parts.append(f"[{video_label}]format=yuv420p[vout]")
+        video_label = "vout"
+        
+        ladder, outputs = ladder_outputs(
+            f"[{video_label}]", f"[{audio_label}]", output_path, renditions,
+            [*video_codec_args(quality, threads, final), *audio_codec_args(final)]
+        )
+        
+        # Build complete filter_complex
+        full_filter = ";".join(filter_parts + audio_filter_parts + ladder)
+        
+        # Build FFmpeg command
+        cmd = ["ffmpeg", "-y"]
+        for vp in video_paths:
+            cmd.extend(["-i", vp])
+        
+        cmd.extend(["-filter_complex", full_filter, *outputs])
+        
+        result = run_ffmpeg(cmd)
+        
+        if result.returncode != 0:
+            print(f"Crossfade error, falling back to simple concat: {result.stderr[:500]}", file=sys.stderr)
+            # Fallback to simple concat
+            return concatenate_videos_ffmpeg(
+                video_paths, output_path, use_transitions=False, final=final, renditions=renditions
+            )
+        
+        return True
+        
+    except Exception as e:
+        print(f"Error with crossfade: {e}, falling back to simple concat", file=sys.stderr)
+        return concatenate_videos_ffmpeg(
+            video_paths, output_path, use_transitions=False, final=final, renditions=renditions
+        )
+
+
+# =============================================================================
+# SMART CROSSFADE - re-encode only the transition windows
+# =============================================================================
+
+def probe_video_stream(video_path: str) -> Optional[Dict]:
+    """Frame count (if the container records it) and codec setup of a clip's first video stream."""
+    for stream in get_media_info(video_path).get("streams", []):
+        if stream.get("codec_type") == "video":
+            return stream
+    return None
+
+
+@traced("split_clip", "crossfade", frames=lambda a: a["frames"], input_bytes=lambda a: file_size(a["video_path"]))
+def split_at_transition_keyframes(
+    video_path: str,
+    output_prefix: str,
+    frames: int,
+    edge: int,
+    fps: int
+) -> Optional[Tuple[str, str, str]]:
+    """
+    Stream-copy a clip into head / body / tail segments, cutting on the IDR
+    frames placed `edge` frames from each end. Returns None if the clip wasn't
+    encoded with matching transition keyframes.
+    """
+    if frames <= 2 * edge:
+        return None
+    # Cut half a frame early so rounding can't push the split past the keyframe
+    half_frame = 0.5 / fps
+    cut_times = f"{edge / fps - half_frame:.6f},{(frames - edge) / fps - half_frame:.6f}"
+    segment_list = f"{output_prefix}_segments.csv"
+    cmd = [
+        "ffmpeg", "-y", "-v", "error",
+        "-i", video_path,
+        "-map", "0:v:0", "-c", "copy",
+        "-f", "segment", "-segment_format", "nut",
+        "-segment_times", cut_times,
+        "-segment_list", segment_list, "-segment_list_type", "csv",
+        "-reset_timestamps", "1",
+        f"{output_prefix}_%d.nut"
+    ]
+    result = run_ffmpeg(cmd)
+    if result.returncode != 0:
+        print(f"Smart crossfade split error: {result.stderr[-500:]}", file=sys.stderr)
+        return None
+    
+    with open(segment_list) as f:
+        rows = [line.strip().split(",") for line in f if line.strip()]
+    if len(rows) != 3:
+        return None
+    # A cut that missed its keyframe shows up as a body of the wrong length
+    body_duration = float(rows[2][1]) - float(rows[1][1])
+    if abs(body_duration - (frames - 2 * edge) / fps) > half_frame:
+        return None
+    segment_dir = os.path.dirname(segment_list)
+    head, body, tail = (os.path.join(segment_dir, row[0]) for row in rows)
+    return head, body, tail
+
+
+@traced("encode_transition", "crossfade", input_bytes=lambda a: total_size([a["tail_path"], a["head_path"]]))
+def encode_transition_segment(
+    tail_path: str,
+    head_path: str,
+    output_path: str,
+    transition_duration: float,
+    quality: str = "high",
+    threads: Optional[int] = None
+) -> bool:
+    """
+    Encode the xfade of one clip's tail into the next clip's head, with the
+    clips' encoder settings. Encoded via MP4 and remuxed, so the segment has
+    the same bitstream packaging and timebase as the stream-copied cuts.
+    """
+    encoded_path = os.path.splitext(output_path)[0] + "_encoded.mp4"
+    cmd = [
+        "ffmpeg", "-y",
+        "-i", tail_path, "-i", head_path,
+        "-filter_complex", f"[0:v][1:v]xfade=transition=fade:duration={transition_duration}:offset=0,format=yuv420p[v]",
+        "-map", "[v]",
+        *x264_quality_args(quality, threads),
+        "-an",
+        encoded_path
+    ]
+    try:
+        result = run_ffmpeg(cmd)
+        if result.returncode == 0:
+            result = run_ffmpeg(["ffmpeg", "-y", "-i", encoded_path, "-c", "copy", output_path])
+    finally:
+        if os.path.exists(encoded_path):
+            os.unlink(encoded_path)
+    if result.returncode != 0:
+        print(f"Smart crossfade transition error: {result.stderr[-500:]}", file=sys.stderr)
+    return result.returncode == 0
+
+
+@traced(
+    "smart_crossfade", "crossfade",
+    clips=lambda a: len(a["video_paths"]),
+    input_bytes=lambda a: total_size(a["video_paths"])
+)
+def concatenate_with_smart_crossfade(
+    video_paths: List[str],
+    output_path: str,
+    transition_duration: float = DEFAULT_TRANSITION_DURATION,
+    fps: int = 24,
+    quality: str = "high",
+    work_dir: Optional[str] = None,
+    manifest: Optional["RenderManifest"] = None,
+    final: bool = True,
+    renditions: Optional[Dict[str, str]] = None
+) -> bool:
+    """
+    Crossfade concat that re-encodes only the transition windows.
+    Each clip is cut on its transition keyframes, the short overlaps are
+    blended and encoded in parallel, and everything in between is
+    stream-copied. Audio is crossfaded in full (cheap) and encoded once,
+    to AAC or, without final, losslessly. The video is always encoded for
+    delivery - the inputs are, or their extradata would not match.
+    With a manifest, transition windows are checkpointed by the content of
+    the two cuts they blend, so a re-render only encodes the transitions
+    next to a changed clip.
+    renditions (OUTPUT_PROFILES name -> path) are transcoded from the output,
+    whose frames are never decoded here.
+    Falls back to concatenate_with_crossfade when the inputs weren't rendered
+    with matching keyframes and encoder settings.
+    """
+    if len(video_paths) < 2:
+        return concatenate_with_crossfade(
+            video_paths, output_path, transition_duration, final=final, renditions=renditions
+        )
+    
+    def fall_back(reason: str) -> bool:
+        print(f"Smart crossfade unavailable ({reason}), re-encoding full crossfade", file=sys.stderr)
+        return concatenate_with_crossfade(
+            video_paths, output_path, transition_duration, quality=quality, final=final, renditions=renditions
+        )
+    
+    try:
+        edge = int(round(transition_duration * fps))
+        fade = edge / fps
+        streams = [probe_video_stream(vp) for vp in video_paths]
+        if any(stream is None or not str(stream.get("nb_frames", "")).isdigit() for stream in streams):
+            return fall_back("could not count input frames")
+        setups = {(s["extradata_hash"], s["width"], s["height"], s["pix_fmt"]) for s in streams}
+        if len(setups) != 1:
+            return fall_back("inputs use different encoder settings")
+        
+        with job_workspace("smart_xfade", work_dir) as scratch:
+            parts = []
+            for i, (vp, stream) in enumerate(zip(video_paths, streams)):
+                split = split_at_transition_keyframes(vp, str(scratch / f"clip_{i}"), int(stream["nb_frames"]), edge, fps)
+                if split is None:
+                    return fall_back(f"{os.path.basename(vp)} has no transition keyframes")
+                parts.append(split)
+            
+            workers, threads = resolve_render_budget()
+            if manifest is not None:
+                fingerprints = [
+                    fingerprint_inputs({"artifact": "transition", "fade": fade, "quality": quality}, [parts[i][2], parts[i + 1][0]])
+                    for i in range(len(parts) - 1)
+                ]
+                transitions = [manifest.artifact_path(f"transition_{fingerprint[:24]}.nut") for fingerprint in fingerprints]
+            else:
+                transitions = [str(scratch / f"transition_{i}.nut") for i in range(len(parts) - 1)]
+            
+            def make_transition(i: int) -> bool:
+                def encode(output: str) -> bool:
+                    return encode_transition_segment(parts[i][2], parts[i + 1][0], output, fade, quality, threads)
+                if manifest is None:
+                    return encode(transitions[i])
+                return manifest.checkpoint(os.path.basename(transitions[i]), fingerprints[i], encode)
+            
+            with ContextThreadPool(max_workers=workers) as pool:
+                futures = [pool.submit(make_transition, i) for i in range(len(transitions))]
+                if not all(future.result() for future in futures):
+                    return fall_back("transition encode failed")
+            if len({(probe_video_stream(t) or {}).get("extradata_hash") for t in transitions} | {streams[0]["extradata_hash"]}) != 1:
+                return fall_back("transition encoder settings differ from the clips")
+            
+            # (segment, frame count) - explicit durations keep the concat demuxer
+            # from drifting on its own per-file duration estimates
+            sequence = [(parts[0][0], edge)]
+            for i, (_, body, _) in enumerate(parts):
+                sequence.append((body, int(streams[i]["nb_frames"]) - 2 * edge))
+                if i < len(transitions):
+                    sequence.append((transitions[i], edge))
+            sequence.append((parts[-1][2], edge))
+            
+            concat_file = scratch / "concat.txt"
+            with open(concat_file, "w") as f:
+                for segment, frames in sequence:
+                    f.write(f"file '{os.path.abspath(segment)}'\nduration {frames / fps:.6f}\n")
+            
+            # Audio is cheap to re-encode: run the full acrossfade chain over the original clips
+            audio_parts = []
+            previous = "1:a"
+            for i in range(1, len(video_paths)):
+                label = f"a{i}"
+                audio_parts.append(f"[{previous}][{i + 1}:a]acrossfade=d={fade}[{label}]")
+                previous = label
+            
+            cmd = ["ffmpeg", "-y", "-f", "concat", "-safe", "0", "-i", str(concat_file)]
+            for vp in video_paths:
+                cmd.extend(["-i", vp])
+            cmd.extend([
+                "-filter_complex", ";".join(audio_parts),
+                "-map", "0:v", "-map", f"[{previous}]",
+                "-c:v", "copy",
+                # Keep the clips' timescale so the result can be crossfaded again
+                "-video_track_timescale", streams[0]["time_base"].split("/")[1],
+                *audio_codec_args(final),
+                output_path
+            ])
+            result = run_ffmpeg(cmd)
+            if result.returncode != 0:
+                print(f"Smart crossfade mux error: {result.stderr[-500:]}", file=sys.stderr)
+                return fall_back("mux failed")
+            
+            print(f"Smart crossfade: re-encoded {len(transitions)} transition(s) of {fade:.2f}s, stream-copied the rest", file=sys.stderr)
+            return transcode_renditions(output_path, renditions, quality)
+    
+    except Exception as e:
+        return fall_back(str(e))
+
+
+@traced("crossfade_tree", "crossfade", clips=lambda a: len(a["video_paths"]), smart=lambda a: a["smart"])
+def concatenate_with_crossfade_tree(
+    video_paths: List[str],
+    output_path: str,
+    transition_duration: float = DEFAULT_TRANSITION_DURATION,
+    quality: str = "high",
+    smart: bool = False,
+    batch_size: Optional[int] = None,
+    max_workers: Optional[int] = None,
+    work_dir: Optional[str] = None,
+    manifest: Optional["RenderManifest"] = None,
+    final: bool = True,
+    renditions: Optional[Dict[str, str]] = None
+) -> bool:
+    """
+    Crossfade any number of clips with a bounded number of inputs per ffmpeg.
+    Clips are crossfaded in batches of batch_size (in parallel), then the batch
+    results are crossfaded together the same way until one run is left. A
+    batch result starts and ends with its first and last clip, so the next
+    level's crossfades land exactly on the batch boundaries. Batch results
+    are intermediates; only the last merge applies final and writes renditions.
+    """
+    batch_size = max(2, batch_size or CROSSFADE_BATCH_SIZE)
+    if len(video_paths) <= batch_size:
+        return merge_crossfade_batch(
+            video_paths, output_path, transition_duration, quality, smart, None, work_dir, manifest, final,
+            renditions
+        )
+    
+    try:
+        workers, threads = resolve_render_budget(max_workers)
+        with job_workspace("xfade_tree", work_dir) as scratch:
+            level = list(video_paths)
+            depth = 0
+            while len(level) > batch_size:
+                depth += 1
+                batches = [level[i:i + batch_size] for i in range(0, len(level), batch_size)]
+                print(f"Crossfade level {depth}: {len(level)} clips in {len(batches)} batches", file=sys.stderr)
+                outputs = [
+                    batch[0] if len(batch) == 1 else str(scratch / f"level{depth}_batch{i}.mp4")
+                    for i, batch in enumerate(batches)
+                ]
+                with ContextThreadPool(max_workers=workers) as pool:
+                    futures = [
+                        pool.submit(
+                            merge_crossfade_batch, batch, output, transition_duration, quality, smart, threads,
+                            str(scratch), manifest, False
+                        )
+                        for batch, output in zip(batches, outputs)
+                        if len(batch) > 1
+                    ]
+                    if not all(future.result() for future in futures):
+                        print("Crossfade batch failed", file=sys.stderr)
+                        return False
+                level = outputs
+            return merge_crossfade_batch(
+                level, output_path, transition_duration, quality, smart, None, str(scratch), manifest, final,
+                renditions
+            )
+    
+    except Exception as e:
+        print(f"Error with batched crossfade: {e}", file=sys.stderr)
+        return False
+
+
+@traced("crossfade_batch", "crossfade", clips=lambda a: len(a["video_paths"]), smart=lambda a: a["smart"])
+def merge_crossfade_batch(
+    video_paths: List[str],
+    output_path: str,
+    transition_duration: float,
+    quality: str,
+    smart: bool,
+    threads: Optional[int],
+    work_dir: Optional[str],
+    manifest: Optional["RenderManifest"] = None,
+    final: bool = True,
+    renditions: Optional[Dict[str, str]] = None
+) -> bool:
+    """Crossfade one batch with the smart or full re-encode strategy."""
+    if smart:
+        return concatenate_with_smart_crossfade(
+            video_paths, output_path, transition_duration, quality=quality, work_dir=work_dir, manifest=manifest,
+            final=final, renditions=renditions
+        )
+    return concatenate_with_crossfade(
+        video_paths, output_path, transition_duration, quality=quality, threads=threads, final=final,
+        renditions=renditions
+    )
+
+
+# =============================================================================
+# PROGRESSIVE HLS - the timeline published as fMP4 segments while it renders
+# =============================================================================
+
+class ProgressiveStream:
+    """
+    HLS event playlist of a render in progress. Each finished timeline item
+    (intro, title card, chapter, outro) is added in order and encoded for
+    delivery into fMP4 segments on a background thread, so playback can start
+    while later chapters render. Crossfades match the final video: an item's
+    last `transition` seconds are held back until the next one arrives, then
+    published blended into its head. Every piece has its own init segment
+    behind an EXT-X-DISCONTINUITY; finish() ends the playlist.
+    """
+    
+    def __init__(self, directory: str, quality: str = "high", transition: float = DEFAULT_TRANSITION_DURATION):
+        self.directory = Path(directory)
+        self.playlist = self.directory / "index.m3u8"
+        self.quality = quality
+        self.transition = transition
+        self.published = 0.0
+        self.pieces = 0
+        self.failed = False
+        self._held = None
+        self._entries = []
+        self._pool = ContextThreadPool(max_workers=1)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        for stale in self.directory.glob("piece_*"):
+            stale.unlink()
+        self._write_playlist(ended=False)
+    
+    def add(self, video_path: str):
+        """Queue the next timeline item; returns at once."""
+        self._pool.submit(self._publish_item, video_path)
+    
+    def finish(self) -> bool:
+        """Publish the held tail, end the playlist and wait for every piece. False if any piece failed."""
+        try:
+            return self._pool.submit(self._publish_tail).result()
+        finally:
+            self._pool.shutdown()
+    
+    def _publish_item(self, video_path: str):
+        if self.failed:
+            return
+        fade = self.transition
+        try:
+            duration = get_video_stream_duration(video_path)
+            if self._held is None or not fade:
+                inputs = ["-i", video_path]
+                graph = None
+            else:
+                held_path, held_duration = self._held
+                inputs = ["-ss", f"{held_duration - fade:.6f}", "-i", held_path, "-i", video_path]
+                graph = (
+                    f"[0:v][1:v]xfade=transition=fade:duration={fade}:offset=0,format=yuv420p[v];"
+                    f"[0:a][1:a]acrossfade=d={fade}[a]"
+                )
+            self._held = (video_path, duration)
+            # The crossfade into the next item covers this one's last `fade` seconds
+            self._publish_piece(inputs, graph, duration - fade)
+        except Exception as e:
+            print(f"Error publishing {os.path.basename(video_path)} to the stream: {e}", file=sys.stderr)
+            self.failed = True
+    
+    def _publish_tail(self) -> bool:
+        if self._held is not None and not self.failed and self.transition:
+            held_path, held_duration = self._held
+            self._publish_piece(
+                ["-ss", f"{held_duration - self.transition:.6f}", "-i", held_path], None, self.transition
+            )
+        if not self.failed:
+            self._write_playlist(ended=True)
+        return not self.failed
+    
+    def _publish_piece(self, inputs: List[str], graph: Optional[str], duration: float):
+        if duration <= 0:
+            return
+        name = f"piece_{self.pieces:03d}"
+        maps = ["-filter_complex", graph, "-map", "[v]", "-map", "[a]"] if graph else ["-map", "0:v", "-map", "0:a"]
+        cmd = [
+            "ffmpeg", "-y", *inputs, *maps,
+            *video_codec_args(self.quality),
+            "-force_key_frames", f"expr:gte(t,n_forced*{HLS_SEGMENT_SECONDS})",
+            *audio_codec_args(),
+            "-t", f"{duration:.6f}",
+            "-output_ts_offset", f"{self.published:.6f}",
+            "-f", "hls",
+            "-hls_time", str(HLS_SEGMENT_SECONDS),
+            "-hls_playlist_type", "vod",
+            "-hls_segment_type", "fmp4",
+            "-hls_fmp4_init_filename", f"{name}_init.mp4",
+            "-hls_segment_filename", str(self.directory / f"{name}_%03d.m4s"),
+            str(self.directory / f"{name}.m3u8")
+        ]
+        with progress_tags(stage="stream", piece=self.pieces + 1):
+            result = run_ffmpeg(cmd, duration)
+        if result.returncode != 0:
+            print(f"Stream piece {name} failed, stopping the stream: {result.stderr[-500:]}", file=sys.stderr)
+            self.failed = True
+            return
+        
+        # Splice the piece's segments into the event playlist behind its own init segment
+        entries = [] if not self.pieces else ["#EXT-X-DISCONTINUITY"]
+        entries.append(f'#EXT-X-MAP:URI="{name}_init.mp4"')
+        piece_playlist = self.directory / f"{name}.m3u8"
+        for line in piece_playlist.read_text().splitlines():
+            if line.startswith("#EXTINF") or (line and not line.startswith("#")):
+                entries.append(line)
+        piece_playlist.unlink()
+        self._entries.extend(entries)
+        self.pieces += 1
+        self.published += duration
+        self._write_playlist(ended=False)
+    
+    def _write_playlist(self, ended: bool):
+        lines = [
+            "#EXTM3U",
+            "#EXT-X-VERSION:7",
+            f"#EXT-X-TARGETDURATION:{math.ceil(HLS_SEGMENT_SECONDS)}",
+            "#EXT-X-PLAYLIST-TYPE:EVENT",
+            "#EXT-X-MEDIA-SEQUENCE:0",
+            "#EXT-X-INDEPENDENT-SEGMENTS",
+            *self._entries,
+        ]
+        if ended:
+            lines.append("#EXT-X-ENDLIST")
+        # Players poll the playlist - they must never read a half-written one
+        fd, tmp_path = tempfile.mkstemp(prefix=".index_", suffix=".m3u8", dir=self.directory)
+        with os.fdopen(fd, "w") as f:
+            f.write("\n".join(lines) + "\n")
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, self.playlist)
+        emit_progress({
+            "event": "stream", "playlist": str(self.playlist), "pieces": self.pieces,
+            "seconds": round(self.published, 2), "ended": ended
+        })
+
+
+# =============================================================================
+# SOURCE IMAGES - decode, grade and resize each source image once
+# =============================================================================
+
+def ken_burns_source_size(w: int, h: int) -> Tuple[int, int]:
+    """
+    Most source pixels a w x h Ken Burns move can use: even the tightest
+    preset crop maps at least one source pixel to each output pixel.
+    """
+    zoom = max(max(p["start_zoom"], p["end_zoom"]) for p in KEN_BURNS_PRESETS.values())
+    return int(round(w * zoom)), int(round(h * zoom))
+
+
+def prepare_source_image(
+    image_path: str,
+    size: Tuple[int, int],
+    fit: str = "cover",
+    grayscale: bool = True
+) -> Optional[str]:
+    """
+    Decode a source image once and cache it as a small PNG ready for the
+    filter graph, so ffmpeg no longer decodes and scales the full-resolution
+    original on every render. Embedded ICC profiles are applied (ffmpeg
+    ignores them), then the picture becomes 8-bit sRGB, or BT.601 luma for
+    grayscale - the same luma hue=s=0 leaves behind.
+    
+    fit "cover" scales and centre-crops to exactly `size`, like
+    scale=...:force_original_aspect_ratio=increase,crop. fit "shrink" only
+    caps each dimension at `size`: zoompan stretches whatever it gets over
+    its output, so only the pixel counts matter.
+    
+    Returns the cached path, or None if the image can't be prepared and
+    ffmpeg should read the original.
+    """
+    if Image is None:
+        return None
+    try:
+        digest = hash_file(image_path, hashlib.sha256(b"source-v1\0"))
+        digest.update(json.dumps([list(size), fit, grayscale]).encode())
+        cached = SOURCE_CACHE_DIR / f"{digest.hexdigest()}.png"
+        if cached.exists():
+            return str(cached)
         
-        # Clean up concat file
-        if concat_file.exists():
-            concat_file.unlink()
+        with Image.open(image_path) as source:
+            icc = source.info.get("icc_profile")
+            image = source.convert("CMYK" if source.mode == "CMYK" else "RGB")
+        if icc:
+            try:
+                image = ImageCms.profileToProfile(
+                    image, ImageCms.ImageCmsProfile(io.BytesIO(icc)), ImageCms.createProfile("sRGB"),
+                    outputMode="RGB"
+                )
+            except (ImageCms.PyCMSError, OSError):
+                pass
+        image = image.convert("L" if grayscale else "RGB")
         
-        return result.returncode == 0
+        if fit == "cover":
+            image = ImageOps.fit(image, size, Image.Resampling.LANCZOS)
+        else:
+            target = (min(image.width, size[0]), min(image.height, size[1]))
+            if target != image.size:
+                image = image.resize(target, Image.Resampling.LANCZOS)
         
+        SOURCE_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(suffix=".tmp", dir=SOURCE_CACHE_DIR)
+        with os.fdopen(fd, "wb") as f:
+            # Fast deflate: these are decoded far more often than written
+            image.save(f, format="PNG", compress_level=1)
+        os.replace(tmp_path, cached)
+        return str(cached)
+    
     except Exception as e:
-        print(f"Error concatenating videos: {e}", file=sys.stderr)
-        return False
+        print(f"Warning: Could not prepare source image {image_path}: {e}", file=sys.stderr)
+        return None
 
 
-def get_video_duration_ffprobe(video_path: str) -> float:
-    """Get video duration using ffprobe."""
-    try:
-        cmd = [
-            "ffprobe", "-v", "quiet", "-show_entries", "format=duration",
-            "-of", "json", video_path
-        ]
-        result = subprocess.run(cmd, capture_output=True, text=True)
-        if result.returncode == 0:
-            data = json.loads(result.stdout)
-            return float(data.get("format", {}).get("duration", 5.0))
-    except:
-        pass
-    return 5.0
+@traced("prepare_sources", "sources", images=lambda a: len(a["paths"]), input_bytes=lambda a: total_size(a["paths"]))
+def prepare_source_images(paths: List[str], size: Tuple[int, int], fit: str = "cover") -> Dict[str, Optional[str]]:
+    """Prepare a batch of source images in parallel (Pillow releases the GIL while decoding)."""
+    paths = list(dict.fromkeys(paths))
+    with ContextThreadPool(max_workers=os.cpu_count() or 1) as pool:
+        prepared = pool.map(lambda path: prepare_source_image(path, size, fit), paths)
+    return dict(zip(paths, prepared))
+
+
+# =============================================================================
+# KEN BURNS WARP ENGINE - sub-pixel camera moves in OpenCV, raw frames piped to ffmpeg
+# =============================================================================
+
+def ken_burns_transforms(
+    effect: str,
+    frames: int,
+    total_frames: int,
+    src_w: int,
+    src_h: int,
+    w: int,
+    h: int
+) -> "np.ndarray":
+    """
+    Inverse affine matrices (frames x 2 x 3) mapping each output pixel to the
+    source, for the same eased path build_zoompan_filter describes. zoompan
+    snaps its crop to whole source pixels, which shows as jitter on slow
+    moves; these keep the fractional position. Frames past total_frames
+    hold the final position.
+    """
+    preset = KEN_BURNS_PRESETS.get(EFFECT_ALIASES.get(effect, effect), KEN_BURNS_PRESETS["zoom_in_center"])
+    on = np.minimum(np.arange(frames), total_frames - 1)
+    ease = (1 - np.cos(on / total_frames * np.pi)) / 2
+    zoom = np.clip(preset["start_zoom"] + (preset["end_zoom"] - preset["start_zoom"]) * ease, 1, 10)
+    crop_w, crop_h = src_w / zoom, src_h / zoom
+    # zoompan clamps the crop inside the image the same way
+    x = np.clip((preset["start_x"] + (preset["end_x"] - preset["start_x"]) * ease) * src_w - crop_w / 2, 0, src_w - crop_w)
+    y = np.clip((preset["start_y"] + (preset["end_y"] - preset["start_y"]) * ease) * src_h - crop_h / 2, 0, src_h - crop_h)
+    
+    scale_x, scale_y = crop_w / w, crop_h / h
+    transforms = np.zeros((frames, 2, 3))
+    transforms[:, 0, 0] = scale_x
+    transforms[:, 1, 1] = scale_y
+    # Pixel centres, not corners, line up between output and crop
+    transforms[:, 0, 2] = x + 0.5 * scale_x - 0.5
+    transforms[:, 1, 2] = y + 0.5 * scale_y - 0.5
+    return transforms
+
 
+def load_ken_burns_source(image_path: str, w: int, h: int) -> "np.ndarray":
+    """Grayscale source no larger than ken_burns_source_size (a prepared source already is)."""
+    source = cv2.imread(image_path, cv2.IMREAD_GRAYSCALE | cv2.IMREAD_IGNORE_ORIENTATION)
+    if source is None:
+        raise ValueError(f"Could not read image: {image_path}")
+    max_w, max_h = ken_burns_source_size(w, h)
+    target = (min(source.shape[1], max_w), min(source.shape[0], max_h))
+    if target != (source.shape[1], source.shape[0]):
+        source = cv2.resize(source, target, interpolation=cv2.INTER_AREA)
+    return source
 
-def concatenate_with_crossfade(video_paths: List[str], output_path: str, transition_duration: float = 0.75) -> bool:
+
+@traced(
+    "ken_burns_warp", "scene",
+    effect=lambda a: a["effect"],
+    frames=lambda a: a["frames"],
+    input_bytes=lambda a: file_size(a["image_path"])
+)
+def pipe_ken_burns_frames(
+    cmd: List[str],
+    image_path: str,
+    effect: str,
+    frames: int,
+    total_frames: int,
+    w: int,
+    h: int,
+    duration: Optional[float] = None
+) -> subprocess.CompletedProcess:
     """
-    Concatenate videos with professional crossfade transitions.
-    Uses FFmpeg xfade filter for smooth dissolves between scenes.
+    Run an ffmpeg command whose first input is raw gray frames on stdin
+    ("-f rawvideo -pix_fmt gray -s WxH -i -") and feed it the Ken Burns move,
+    one warpAffine per frame.
     """
-    try:
-        if len(video_paths) < 2:
-            if video_paths:
-                subprocess.run(["cp", video_paths[0], output_path], check=True)
+    source = load_ken_burns_source(image_path, w, h)
+    transforms = ken_burns_transforms(effect, frames, total_frames, source.shape[1], source.shape[0], w, h)
+    frame = np.empty((h, w), np.uint8)
+    
+    def feed(stdin):
+        for matrix in transforms:
+            cv2.warpAffine(
+                source, matrix, (w, h), dst=frame,
+                flags=cv2.INTER_LINEAR | cv2.WARP_INVERSE_MAP, borderMode=cv2.BORDER_REPLICATE
+            )
+            stdin.write(frame.data)
+    
+    return run_ffmpeg(cmd, duration, feed=feed)
+
+
+# =============================================================================
+# SCENE CLIP CACHE - reuse unchanged scenes across renders
+# =============================================================================
+
+def hash_file(path: str, digest=None):
+    """Feed a file's bytes into a hash in 1 MB chunks (new sha256 if none given)."""
+    digest = digest or hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest
+
+
+class SceneClipCache:
+    """
+    Size-bounded LRU cache of rendered scene clips, keyed by a hash of every
+    input that affects the encoded output. File mtime doubles as the LRU
+    clock: hits touch the entry, eviction drops the oldest entries first.
+    """
+    
+    def __init__(self, root: Path, max_bytes: int):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+    
+    def key_for(
+        self,
+        image_path: str,
+        audio_path: Optional[str],
+        effect: str,
+        duration: float,
+        text_overlay: Optional[Dict],
+        fps: int,
+        resolution: tuple,
+        quality: str,
+        transition_keyframes: Optional[float] = None,
+        ken_burns_engine: str = "zoompan",
+        audio_codec: str = "aac",
+        mezzanine: str = "delivery",
+        preset: Optional[str] = None,
+        typewriter_engine: str = "reveal"
+    ) -> str:
+        # Bump the version whenever rendered scenes change without a key field that says so
+        digest = hashlib.sha256(b"scene-v2\0")
+        hash_file(image_path, digest)
+        digest.update(b"\0audio\0")
+        if audio_path:
+            hash_file(audio_path, digest)
+        params = {
+            "effect": effect,
+            "duration": round(duration, 3),
+            "text_overlay": text_overlay,
+            "fps": fps,
+            "resolution": list(resolution),
+            "quality": quality,
+            "transition_keyframes": transition_keyframes,
+        }
+        if ken_burns_engine != "zoompan":
+            # Kept out of zoompan keys so existing cache entries stay valid
+            params["ken_burns_engine"] = ken_burns_engine
+        if audio_codec != "aac":
+            params["audio_codec"] = audio_codec
+        if mezzanine != "delivery":
+            params["mezzanine"] = mezzanine
+        if preset:
+            params["preset"] = preset
+        if typewriter_engine != "reveal" and text_overlay and text_overlay.get("typewriter"):
+            params["typewriter_engine"] = typewriter_engine
+        digest.update(json.dumps(params, sort_keys=True, default=str).encode())
+        return digest.hexdigest()
+    
+    def _entry(self, key: str) -> Path:
+        return self.root / f"{key}.mp4"
+    
+    def fetch(self, key: str, output_path: str) -> bool:
+        """Copy a cached clip to output_path. Returns False on a miss."""
+        entry = self._entry(key)
+        try:
+            shutil.copyfile(entry, output_path)
+            os.utime(entry)
+        except OSError:
+            with self._lock:
+                self.misses += 1
+            return False
+        with self._lock:
+            self.hits += 1
+        return True
+    
+    def store(self, key: str, clip_path: str):
+        """Atomically add a freshly rendered clip, then evict down to the size bound."""
+        try:
+            self.root.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(suffix=".tmp", dir=self.root)
+            os.close(fd)
+            shutil.copyfile(clip_path, tmp_path)
+            os.replace(tmp_path, self._entry(key))
+        except OSError as e:
+            print(f"Warning: Could not cache scene clip: {e}", file=sys.stderr)
+            return
+        self.evict()
+    
+    def evict(self):
+        """Delete least recently used clips until the cache fits in max_bytes."""
+        with self._lock:
+            entries = []
+            for entry in self.root.glob("*.mp4"):
+                try:
+                    st = entry.stat()
+                except OSError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, entry))
+            total = sum(size for _, size, _ in entries)
+            for _, size, entry in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                try:
+                    entry.unlink()
+                except OSError:
+                    continue
+                total -= size
+                self.evictions += 1
+    
+    def stats(self) -> Dict:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions}
+
+
+SCENE_CACHE = SceneClipCache(SCENE_CACHE_DIR, SCENE_CACHE_MAX_BYTES)
+
+
+# =============================================================================
+# RENDER CHECKPOINTS - resume an interrupted full-project render
+# =============================================================================
+
+def fingerprint_inputs(params: Dict, paths: List[Optional[str]]) -> str:
+    """Hash of render settings plus the content of every input file that exists."""
+    digest = hashlib.sha256(b"checkpoint-v1\0")
+    digest.update(json.dumps(params, sort_keys=True, default=manifest_json_default).encode())
+    for path in paths:
+        digest.update(b"\0file\0")
+        if path and os.path.exists(path):
+            hash_file(path, digest)
+    return digest.hexdigest()
+
+
+class RenderManifest:
+    """
+    Checkpoint directory of one project's render: finished scene clips,
+    chapters and the title card, listed in manifest.json with the fingerprint
+    of the inputs each was made from. The manifest is rewritten atomically
+    after every artifact, so a killed render picks up from the last one whose
+    fingerprint, size and mtime still match. A render that completes
+    discards its checkpoint, unless it is kept for incremental re-renders.
+    A render holds its checkpoint under an flock (see locked), so two
+    renders of one project never write the same artifacts at once.
+    """
+    
+    def __init__(self, root: Path):
+        self.root = Path(root)
+        self.path = self.root / "manifest.json"
+        self.reused = []
+        self.rebuilt = []
+        self._lock = threading.Lock()
+        self.root.mkdir(parents=True, exist_ok=True)
+        try:
+            self.artifacts = json.loads(self.path.read_text()).get("artifacts", {})
+        except (OSError, ValueError):
+            self.artifacts = {}
+    
+    @classmethod
+    def project_root(cls, project_data: Dict) -> Path:
+        """The project's checkpoint directory, by project_id, else by the whole project description."""
+        cls.prune()
+        project_id = project_data.get("project_id")
+        identity = {"project_id": project_id} if project_id is not None else project_data
+        key = hashlib.sha256(json.dumps(identity, sort_keys=True, default=manifest_json_default).encode()).hexdigest()[:32]
+        return CHECKPOINT_DIR / key
+    
+    @classmethod
+    @contextmanager
+    def locked(cls, root: Path):
+        """
+        The checkpoint at root, held exclusively until the block ends. Another
+        render of the same project waits its turn, then resumes from what
+        this one left (or starts afresh if it was discarded).
+        """
+        root = Path(root)
+        while True:
+            root.mkdir(parents=True, exist_ok=True)
+            lock = open(root / "lock", "a")
+            try:
+                fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                print("Waiting for another render of this project to finish...", file=sys.stderr)
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            # The holder may have discarded the checkpoint (lock file and all) while we waited
+            try:
+                if os.stat(root / "lock").st_ino == os.fstat(lock.fileno()).st_ino:
+                    break
+            except OSError:
+                pass
+            lock.close()
+        try:
+            yield cls(root)
+        finally:
+            lock.close()
+    
+    @staticmethod
+    def prune():
+        """Delete checkpoints whose manifest was last written more than CHECKPOINT_MAX_AGE_DAYS ago, unless a render holds them."""
+        cutoff = time.time() - CHECKPOINT_MAX_AGE_DAYS * 86400
+        for root in CHECKPOINT_DIR.glob("*"):
+            manifest = root / "manifest.json"
+            try:
+                stale = (manifest if manifest.exists() else root).stat().st_mtime < cutoff
+            except OSError:
+                continue
+            if not stale:
+                continue
+            try:
+                with open(root / "lock", "a") as lock:
+                    fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    shutil.rmtree(root, ignore_errors=True)
+            except OSError:
+                continue  # In use (or not a checkpoint)
+    
+    def artifact_path(self, name: str) -> str:
+        return str(self.root / name)
+    
+    def verified(self, name: str, fingerprint: str) -> bool:
+        """True if the recorded artifact was made from these inputs and is still the file we wrote."""
+        with self._lock:
+            entry = self.artifacts.get(name)
+        if not entry or entry["fingerprint"] != fingerprint:
+            return False
+        try:
+            st = os.stat(self.artifact_path(name))
+        except OSError:
+            return False
+        return st.st_size == entry["size"] and st.st_mtime_ns == entry["mtime_ns"]
+    
+    def record(self, name: str, fingerprint: str):
+        st = os.stat(self.artifact_path(name))
+        with self._lock:
+            self.artifacts[name] = {"fingerprint": fingerprint, "size": st.st_size, "mtime_ns": st.st_mtime_ns}
+            self._write()
+    
+    def _write(self):
+        fd, tmp_path = tempfile.mkstemp(suffix=".tmp", dir=self.root)
+        with os.fdopen(fd, "w") as f:
+            json.dump({"version": 1, "artifacts": self.artifacts}, f, indent=1)
+        os.replace(tmp_path, self.path)
+    
+    @traced("checkpoint", "checkpoint", artifact=lambda a: a["name"])
+    def checkpoint(self, name: str, fingerprint: str, build) -> bool:
+        """
+        Make artifact name with build(path) unless a verified one is already
+        there, and record it once built. Returns whether the artifact exists.
+        """
+        if self.verified(name, fingerprint):
+            print(f"Resumed {name} from checkpoint", file=sys.stderr)
+            trace_annotate(reused=True)
+            with self._lock:
+                self.reused.append(name)
             return True
+        if not build(self.artifact_path(name)):
+            return False
+        try:
+            self.record(name, fingerprint)
+        except OSError as e:
+            print(f"Warning: Could not checkpoint {name}: {e}", file=sys.stderr)
+        with self._lock:
+            self.rebuilt.append(name)
+        return True
+    
+    def report(self) -> Dict:
+        """Artifacts this render took from the checkpoint and the ones it had to make."""
+        with self._lock:
+            return {"reused": sorted(self.reused), "rebuilt": sorted(self.rebuilt)}
+    
+    def discard(self):
+        """Delete the checkpoint - only while holding it (see locked)."""
+        shutil.rmtree(self.root, ignore_errors=True)
+    
+    def keep_used(self):
+        """
+        Drop every artifact this render neither reused nor rebuilt, so an
+        edited project's checkpoint holds only its current version (old
+        transition windows, scenes of removed chapters, leftovers of a
+        killed render) instead of growing with each edit.
+        """
+        with self._lock:
+            used = set(self.reused) | set(self.rebuilt)
+            for entry in self.root.iterdir():
+                if entry.name not in used and entry.name not in ("manifest.json", "lock"):
+                    if entry.is_dir():
+                        shutil.rmtree(entry, ignore_errors=True)
+                    else:
+                        entry.unlink(missing_ok=True)
+            self.artifacts = {name: entry for name, entry in self.artifacts.items() if name in used}
+            self._write()
+
+
+def resolve_render_budget(
+    max_workers: Optional[int] = None,
+    encoder_threads: Optional[int] = None
+) -> Tuple[int, int]:
+    """
+    Work out how many scenes to render at once and how many x264 threads
+    each encoder may use, so workers * threads stays within the thread budget.
+    """
+    budget = RENDER_THREAD_BUDGET or os.cpu_count() or 1
+    workers = min(max_workers or RENDER_WORKERS or max(1, budget // 4), budget)
+    threads = encoder_threads or max(1, budget // workers)
+    return workers, threads
+
+
+def planned_scene_duration(scene: Dict) -> float:
+    """Scene length: its narration plus a natural pause, else its own duration - never under 5s."""
+    audio_path = scene.get("audio_path", "")
+    if audio_path and os.path.exists(audio_path):
+        # Add slight padding at end for natural pacing (0.3-0.5s)
+        duration = get_audio_duration(audio_path) + 0.4
+    else:
+        duration = scene.get("duration", 8.0)  # Default 8s for documentary pacing
+    
+    # Ensure minimum duration for Ken Burns effect to look smooth
+    return max(duration, 5.0)
+
+
+def plan_chapter_scenes(chapter_data: Dict) -> List[Dict]:
+    """
+    Resolve effect, duration and text overlay for every usable scene in a chapter.
+    Scenes with a missing image are skipped with a warning.
+    """
+    scenes = chapter_data.get("scenes", [])
+    total_scenes = len(scenes)
+    chapter_title = chapter_data.get("title", "")
+    plans = []
+    # One batched probe for the whole chapter instead of one ffprobe per scene
+    prefetch_media_info([scene.get("audio_path", "") for scene in scenes])
+    
+    for i, scene in enumerate(scenes):
+        img_path = scene.get("image_path", "")
+        audio_path = scene.get("audio_path", "")
         
-        # Get durations for all videos
-        durations = [get_video_duration_ffprobe(vp) for vp in video_paths]
+        # Use varied Ken Burns effects based on scene position
+        specified_effect = scene.get("ken_burns_effect", "")
+        if specified_effect and specified_effect in KEN_BURNS_PRESETS:
+            effect = specified_effect
+        else:
+            effect = get_effect_for_scene(i, total_scenes)
         
-        # Build complex filter for xfade transitions
-        # For N videos, we need N-1 xfade filters chained together
-        inputs = " ".join([f"-i \"{vp}\"" for vp in video_paths])
+        if not img_path or not os.path.exists(img_path):
+            print(f"Warning: Image not found: {img_path}", file=sys.stderr)
+            continue
         
-        filter_parts = []
-        audio_filter_parts = []
+        has_audio = bool(audio_path and os.path.exists(audio_path))
+        duration = planned_scene_duration(scene)
         
-        # Calculate offsets for each transition
-        # First video plays, then at (duration - transition_duration), we start crossfade
-        cumulative_offset = 0
+        # Build text overlay from scene metadata
+        text_overlay = None
         
-        for i in range(len(video_paths) - 1):
-            offset = cumulative_offset + durations[i] - transition_duration
-            
-            if i == 0:
-                # First transition: [0:v][1:v]
-                filter_parts.append(f"[{i}:v][{i+1}:v]xfade=transition=fade:duration={transition_duration}:offset={offset}[v{i+1}]")
-                audio_filter_parts.append(f"[{i}:a][{i+1}:a]acrossfade=d={transition_duration}[a{i+1}]")
-            else:
-                # Subsequent transitions: [prev_output][next]
-                filter_parts.append(f"[v{i}][{i+1}:v]xfade=transition=fade:duration={transition_duration}:offset={offset}[v{i+1}]")
-                audio_filter_parts.append(f"[a{i}][{i+1}:a]acrossfade=d={transition_duration}[a{i+1}]")
-            
-            cumulative_offset = offset
+        # Check for explicit text overlay in scene data
+        if scene.get("text_overlay"):
+            text_overlay = scene.get("text_overlay")
+        # Or use date_text/location_text fields
+        elif scene.get("date_text"):
+            text_overlay = {
+                "text": scene.get("date_text"),
+                "style": "date_overlay",
+                "typewriter": False,
+                "start_time": 0.5,
+            }
+        elif scene.get("location_text"):
+            text_overlay = {
+                "text": scene.get("location_text"),
+                "style": "location_text",
+                "typewriter": True,
+                "start_time": 0.5,
+            }
+        # First scene of chapter can show chapter title
+        elif i == 0 and chapter_title:
+            text_overlay = {
+                "text": chapter_title,
+                "style": "chapter_title",
+                "typewriter": True,
+                "start_time": 0.5,
+            }
         
-        # Final output labels
-        final_video = f"v{len(video_paths)-1}"
-        final_audio = f"a{len(video_paths)-1}"
+        plans.append({
+            "index": i,
+            "total": total_scenes,
+            "image_path": img_path,
+            "audio_path": audio_path if has_audio else None,
+            "effect": effect,
+            "duration": duration,
+            "text_overlay": text_overlay,
+        })
+    
+    return plans
+
+
+@traced(
+    "scene", "scene",
+    scene=lambda a: a["plan"]["index"] + 1,
+    effect=lambda a: a["plan"]["effect"],
+    style=lambda a: (a["plan"]["text_overlay"] or {}).get("style"),
+    duration=lambda a: a["plan"]["duration"],
+    input_bytes=lambda a: total_size([a["plan"]["image_path"], a["plan"]["audio_path"]])
+)
+def render_scene_plan(
+    plan: Dict,
+    output_path: str,
+    quality: str = "high",
+    threads: Optional[int] = None,
+    use_cache: bool = True,
+    transition_keyframes: Optional[float] = None,
+    manifest: Optional[RenderManifest] = None
+) -> bool:
+    """
+    Render one planned scene, reusing a cached clip when every input matches.
+    Its audio stays lossless - a scene clip is always joined into a longer video.
+    With a manifest, output_path is a checkpoint artifact: a verified clip
+    from an interrupted render is kept, a new one is recorded.
+    Never raises, so one bad scene can't sink its siblings.
+    """
+    i = plan["index"]
+    text_overlay = plan["text_overlay"]
+    fps, resolution = render_format(quality)
+    cached = False
+    
+    def render(path: str) -> bool:
+        nonlocal cached
+        cached = use_cache and SCENE_CACHE.fetch(cache_key, path)
+        trace_annotate(cached=cached)
+        with progress_tags(stage="scene", scene=i + 1, scenes=plan["total"]):
+            ok = cached or create_scene_clip_ffmpeg(
+                plan["image_path"], path, plan["duration"],
+                plan["audio_path"],
+                plan["effect"],
+                fps=fps,
+                resolution=resolution,
+                quality=quality,
+                text_overlay=text_overlay,
+                threads=threads,
+                transition_keyframes=transition_keyframes,
+                final=False
+            )
+        if ok and use_cache and not cached:
+            SCENE_CACHE.store(cache_key, path)
+        return ok
+    
+    try:
+        cache_key = None
+        if use_cache or manifest is not None:
+            mezzanine = "delivery" if transition_keyframes else MEZZANINE_FORMAT
+            cache_key = SCENE_CACHE.key_for(
+                plan["image_path"], plan["audio_path"], plan["effect"], plan["duration"],
+                text_overlay, fps, resolution, quality, transition_keyframes, ken_burns_engine_in_use(),
+                MEZZANINE_AUDIO_CODEC[1], mezzanine,
+                # Only a delivery encode uses the preset a deadline picked
+                ENCODER_PRESET.get() if MEZZANINE_CODECS.get(mezzanine) is None else None,
+                TYPEWRITER_ENGINE
+            )
+        if manifest is not None:
+            ok = manifest.checkpoint(os.path.basename(output_path), cache_key, render)
+        else:
+            ok = render(output_path)
+    except Exception as e:
+        print(f"Error rendering scene {i+1}: {e}", file=sys.stderr)
+        ok = False
+    
+    if ok:
+        overlay_info = f" + '{text_overlay['text'][:20]}'" if text_overlay else ""
+        cache_info = " [cached]" if cached else ""
+        print(f"Scene {i+1}/{plan['total']}: {plan['effect']} ({plan['duration']:.1f}s){overlay_info}{cache_info}", file=sys.stderr)
+    else:
+        print(f"Warning: Failed to create scene {i+1}", file=sys.stderr)
+    return ok
+
+
+@traced("scene_clips", "scene", scenes=lambda a: len(a["plans"]), quality=lambda a: a["quality"])
+def render_scene_clips(
+    plans: List[Dict],
+    work_dir: Path,
+    quality: str = "high",
+    max_workers: Optional[int] = None,
+    encoder_threads: Optional[int] = None,
+    use_cache: bool = True,
+    transition_keyframes: Optional[float] = None,
+    manifest: Optional[RenderManifest] = None,
+    checkpoint_prefix: str = ""
+) -> List[str]:
+    """
+    Render planned scenes on a bounded worker pool.
+    Returns the clips that rendered successfully, in scene order.
+    With a manifest the clips are checkpoint artifacts named
+    checkpoint_prefix + "scene_N.mp4" instead of files in work_dir.
+    """
+    workers, threads = resolve_render_budget(max_workers, encoder_threads)
+    if manifest is not None:
+        outputs = [manifest.artifact_path(f"{checkpoint_prefix}scene_{plan['index']+1}.mp4") for plan in plans]
+    else:
+        outputs = [str(Path(work_dir) / f"scene_{plan['index']+1}.mp4") for plan in plans]
+    
+    with ContextThreadPool(max_workers=workers) as pool:
+        futures = [
+            pool.submit(render_scene_plan, plan, output, quality, threads, use_cache, transition_keyframes, manifest)
+            for plan, output in zip(plans, outputs)
+        ]
+        results = [future.result() for future in futures]
+    
+    return [output for output, ok in zip(outputs, results) if ok]
+
+
+# =============================================================================
+# ENCODER CALIBRATION - this host's speed per x264 preset, and presets picked to meet a deadline
+# =============================================================================
+
+# x264 preset of the current render's delivery encodes, overriding the quality tier's (see x264_quality_args)
+ENCODER_PRESET = contextvars.ContextVar("encoder_preset", default=None)
+
+
+@contextmanager
+def encoder_preset(preset: Optional[str]):
+    """Encode the block's delivery videos with this x264 preset (None: the quality tier's own)."""
+    token = ENCODER_PRESET.set(preset)
+    try:
+        yield
+    finally:
+        ENCODER_PRESET.reset(token)
+
+
+def preset_candidates(quality: str) -> List[str]:
+    """Presets a deadline may pick for a quality tier: the fastest up to the tier's own."""
+    with encoder_preset(None):
+        args = x264_quality_args(quality)
+    return X264_PRESETS[:X264_PRESETS.index(args[args.index("-preset") + 1]) + 1]
+
+
+def calibrate_encoder(quality: str = "high", refresh: bool = False) -> Dict:
+    """
+    Measure this host's throughput, in seconds of video per wall second, on
+    a CALIBRATION_SECONDS reference: composing a Ken Burns scene with text
+    into a mezzanine clip ("scene_speed"), joining it into an intermediate
+    ("join_speed"), and encoding it for delivery at every preset the tier
+    allows ("speeds"). Results are kept in CALIBRATION_PATH per host and
+    tier; refresh measures again.
+    """
+    key = f"{platform.node()}/{os.cpu_count()}/{HOST_THREADS}/{MEZZANINE_FORMAT}/{quality}"
+    try:
+        calibrations = json.loads(CALIBRATION_PATH.read_text())
+    except (OSError, ValueError):
+        calibrations = {}
+    if key in calibrations and not refresh:
+        return {**calibrations[key], "cached": True}
+    
+    def timed(run) -> float:
+        started = time.perf_counter()
+        if not run():
+            raise RuntimeError("calibration encode failed")
+        return CALIBRATION_SECONDS / max(time.perf_counter() - started, 1e-6)
+    
+    print(f"Calibrating {quality} encoder presets...", file=sys.stderr)
+    with job_workspace("calibrate") as scratch, progress_tags(stage="calibrate"), encoder_preset(None):
+        still = str(scratch / "reference.png")
+        if run_ffmpeg(["ffmpeg", "-y", "-f", "lavfi", "-i", "testsrc2=s=1920x1080", "-frames:v", "1", still]).returncode != 0:
+            raise RuntimeError("could not render the calibration reference")
+        scene = str(scratch / "reference.mp4")
+        scene_speed = timed(lambda: create_scene_clip_ffmpeg(
+            still, scene, CALIBRATION_SECONDS, quality=quality,
+            text_overlay={"text": "Calibration reference", "style": "caption"}, final=False
+        ))
         
-        # Build complete filter_complex
-        video_filter = ";".join(filter_parts)
-        audio_filter = ";".join(audio_filter_parts)
-        full_filter = f"{video_filter};{audio_filter}"
+        def encode(final: bool, path: str) -> bool:
+            cmd = ["ffmpeg", "-y", "-i", scene, *video_codec_args(quality, final=final), *audio_codec_args(final), path]
+            return run_ffmpeg(cmd, CALIBRATION_SECONDS).returncode == 0
         
-        # Build FFmpeg command
-        cmd = ["ffmpeg", "-y"]
-        for vp in video_paths:
-            cmd.extend(["-i", vp])
+        join_speed = timed(lambda: encode(False, str(scratch / "join.mp4")))
+        speeds = {}
+        for preset in preset_candidates(quality):
+            with encoder_preset(preset):
+                speeds[preset] = round(timed(lambda: encode(True, str(scratch / f"{preset}.mp4"))), 3)
+    
+    calibration = {
+        "scene_speed": round(scene_speed, 3), "join_speed": round(join_speed, 3), "speeds": speeds,
+        "measured_at": time.time()
+    }
+    try:
+        calibrations[key] = calibration
+        CALIBRATION_PATH.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(prefix=".calibration_", suffix=".json", dir=CALIBRATION_PATH.parent)
+        with os.fdopen(fd, "w") as f:
+            json.dump(calibrations, f, indent=2)
+        os.replace(tmp_path, CALIBRATION_PATH)
+    except OSError as e:
+        print(f"Warning: Could not save encoder calibration: {e}", file=sys.stderr)
+    return {**calibration, "cached": False}
+
+
+class DeadlinePlanner:
+    """
+    Chooses the delivery preset of one render: the slowest preset (best
+    compression) whose estimated finish fits DEADLINE_HEADROOM of the time
+    left, else the fastest. Work ahead is story seconds still to compose
+    (scenes and chapter joins) plus seconds to encode for delivery. Composing
+    is estimated from the calibration until part of the story is done, then
+    from the throughput this render actually achieved. Once locked - scene
+    clips already carry the preset - choices only refresh the estimate.
+    """
+    
+    def __init__(self, deadline_seconds: float, calibration: Dict, story_seconds: float, started: float):
+        self.deadline = deadline_seconds
+        self.calibration = calibration
+        self.story = story_seconds
+        # time.monotonic() the deadline counts from - calibration and prefetching already spent some of it
+        self.started = started
+        # Throughput is measured from here, once the render proper begins
+        self.composing_from = time.monotonic()
+        self.done = 0.0
+        self.reused = 0.0
+        self.preset = None
+        self.locked = False
+        self.decisions = []
+    
+    def advance(self, seconds: float, reused: bool = False):
+        """Mark seconds of story composed - reused (resumed) ones took no time and say nothing of throughput."""
+        if reused:
+            self.reused += seconds
+        else:
+            self.done += seconds
+    
+    @property
+    def remaining(self) -> float:
+        return max(0.0, self.story - self.done - self.reused)
+    
+    def compose_speed(self) -> Tuple[float, str]:
+        composing = time.monotonic() - self.composing_from
+        if self.done > 0 and composing > 0:
+            return self.done / composing, "observed"
+        scene, join = self.calibration["scene_speed"], self.calibration["join_speed"]
+        return 1 / (1 / scene + 1 / join), "calibrated"
+    
+    def choose(self, stage: str, compose_seconds: float, delivery_seconds: float, lock: bool = False) -> str:
+        elapsed = time.monotonic() - self.started
+        time_left = self.deadline - elapsed
+        speed, basis = self.compose_speed()
+        speeds = self.calibration["speeds"]
         
-        cmd.extend([
-            "-filter_complex", full_filter,
-            "-map", f"[{final_video}]",
-            "-map", f"[{final_audio}]",
-            "-c:v", "libx264", "-preset", "slow", "-crf", "18",
-            "-profile:v", "high", "-level", "4.2",
-            "-c:a", "aac", "-b:a", "192k",
-            output_path
-        ])
+        def estimate(preset: str) -> float:
+            return compose_seconds / speed + delivery_seconds / speeds[preset]
         
-        result = subprocess.run(cmd, capture_output=True, text=True)
+        if not self.locked:
+            presets = list(speeds)
+            self.preset = next(
+                (preset for preset in reversed(presets) if estimate(preset) <= time_left * DEADLINE_HEADROOM),
+                presets[0]
+            )
+            self.locked = lock
+        decision = {
+            "stage": stage,
+            "preset": self.preset,
+            "elapsed_seconds": round(elapsed, 1),
+            "time_left_seconds": round(time_left, 1),
+            "estimated_seconds": round(estimate(self.preset), 1),
+            "compose_speed": round(speed, 3),
+            "basis": basis,
+        }
+        self.decisions.append(decision)
+        emit_progress({"event": "encoder_preset", **decision})
+        print(
+            f"Encoder preset {self.preset} ({stage}): ~{decision['estimated_seconds']}s of work, "
+            f"{decision['time_left_seconds']}s to the deadline", file=sys.stderr
+        )
+        return self.preset
+    
+    def report(self) -> Dict:
+        return {
+            "deadline_seconds": self.deadline,
+            "preset": self.preset,
+            "locked": self.locked,
+            "elapsed_seconds": round(time.monotonic() - self.started, 1),
+            "on_time": time.monotonic() - self.started <= self.deadline,
+            "calibration": self.calibration,
+            "decisions": self.decisions,
+        }
+
+
+# =============================================================================
+# SINGLE-PASS COMPILER - whole timeline in one filter graph, one encode
+# =============================================================================
+
+def build_timeline_graph(
+    segments: List[Dict],
+    transitions: List[float],
+    fps: int,
+    resolution: tuple
+) -> Tuple[List[str], str, float]:
+    """
+    Turn planned segments into ffmpeg inputs plus one filter graph.
+    Image segments get the same zoompan/grade/text chain as scene clips;
+    video segments (intro/outro) are letterboxed to the output size.
+    Boundary k uses an xfade/acrossfade of transitions[k] seconds, or a
+    hard cut when it is 0. Returns (input args, graph, timeline duration).
+    """
+    w, h = resolution
+    inputs = []
+    graph = []
+    lengths = []
+    n = 0
+    sources = prepare_source_images(
+        [seg["image_path"] for seg in segments if not seg.get("video_path")],
+        ken_burns_source_size(w, h), fit="shrink"
+    )
+    
+    for k, seg in enumerate(segments):
+        if seg.get("video_path"):
+            length = seg["duration"]
+            inputs.extend(["-i", seg["video_path"]])
+            graph.append(
+                f"[{n}:v]scale={w}:{h}:force_original_aspect_ratio=decrease,"
+                f"pad={w}:{h}:(ow-iw)/2:(oh-ih)/2,setsar=1,fps={fps},format=yuv420p,"
+                f"settb=AVTB,setpts=PTS-STARTPTS[v{k}]"
+            )
+            audio_in = f"{n}:a" if seg.get("has_audio") else None
+            n += 1
+        else:
+            # zoompan emits every frame of the move from one decoded image
+            length = int(seg["duration"] * fps) / fps
+            source = sources[seg["image_path"]]
+            video_filters = build_scene_video_filters(
+                seg["effect"], seg["duration"], fps, w, h, seg.get("text_overlay"), gray_source=source is not None
+            )
+            inputs.extend(["-i", source or seg["image_path"]])
+            graph.append(f"[{n}:v]{video_filters},setsar=1,settb=AVTB,setpts=PTS-STARTPTS[v{k}]")
+            n += 1
+            audio_in = None
+            if seg.get("audio_path"):
+                inputs.extend(["-i", seg["audio_path"]])
+                audio_in = f"{n}:a"
+                n += 1
         
-        if result.returncode != 0:
-            print(f"Crossfade error, falling back to simple concat: {result.stderr[:500]}", file=sys.stderr)
-            # Fallback to simple concat
-            return concatenate_videos_ffmpeg(video_paths, output_path, use_transitions=False)
+        if audio_in is None:
+            inputs.extend(["-f", "lavfi", "-t", f"{length:.3f}", "-i", "anullsrc=channel_layout=stereo:sample_rate=48000"])
+            audio_in = f"{n}:a"
+            n += 1
+        # Narration, silence and intro audio all meet in one sample format
+        graph.append(
+            f"[{audio_in}]aresample=48000,aformat=sample_fmts=fltp:channel_layouts=stereo,"
+            f"apad=whole_dur={length:.3f},atrim=duration={length:.3f},asetpts=PTS-STARTPTS[a{k}]"
+        )
+        lengths.append(length)
+    
+    cur_v, cur_a = "v0", "a0"
+    timeline = lengths[0]
+    for k in range(1, len(segments)):
+        fade = min(transitions[k - 1], lengths[k - 1] / 2, lengths[k] / 2)
+        if fade > 0:
+            graph.append(f"[{cur_v}][v{k}]xfade=transition=fade:duration={fade:.3f}:offset={timeline - fade:.3f}[xv{k}]")
+            graph.append(f"[{cur_a}][a{k}]acrossfade=d={fade:.3f}[xa{k}]")
+            timeline += lengths[k] - fade
+        else:
+            graph.append(f"[{cur_v}][{cur_a}][v{k}][a{k}]concat=n=2:v=1:a=1[xv{k}][xa{k}]")
+            timeline += lengths[k]
+        cur_v, cur_a = f"xv{k}", f"xa{k}"
+    
+    graph.append(f"[{cur_v}]format=yuv420p[vout]")
+    graph.append(f"[{cur_a}]anull[aout]")
+    return inputs, ";\n".join(graph), timeline
+
+
+@traced("compile", "compile", segments=lambda a: len(a["segments"]), quality=lambda a: a["quality"])
+def compile_timeline_single_pass(
+    segments: List[Dict],
+    output_path: str,
+    transitions: Optional[List[float]] = None,
+    quality: str = "high",
+    fps: int = 24,
+    resolution: tuple = (1920, 1080),
+    threads: Optional[int] = None,
+    work_dir: Optional[str] = None,
+    renditions: Optional[Dict[str, str]] = None
+) -> bool:
+    """
+    Render a whole timeline - per-segment Ken Burns, grade and text plus the
+    crossfade chain - with a single ffmpeg process and a single encode.
+    transitions holds one duration per boundary (defaults to 0.75s everywhere).
+    renditions (OUTPUT_PROFILES name -> path) branch from the composed timeline
+    and are encoded by the same process.
+    """
+    try:
+        if not segments:
+            return False
+        if transitions is None:
+            transitions = [DEFAULT_TRANSITION_DURATION] * (len(segments) - 1)
         
-        return True
+        inputs, graph, timeline = build_timeline_graph(segments, transitions, fps, resolution)
+        
+        with job_workspace("compile", work_dir) as scratch:
+            # Long typewriter chains can exceed the kernel's per-argument limit
+            ladder, outputs = ladder_outputs(
+                "[vout]", "[aout]", output_path, renditions,
+                [*video_codec_args(quality, threads), *audio_codec_args(), "-t", f"{timeline:.3f}"]
+            )
+            graph_path = scratch / "filter_graph.txt"
+            graph_path.write_text(";".join([graph, *ladder]))
+            
+            cmd = ["ffmpeg", "-y", *inputs, "-filter_complex_script", str(graph_path), *outputs]
+            
+            print(f"Single-pass compile: {len(segments)} segments ({timeline:.1f}s)", file=sys.stderr)
+            with progress_tags(stage="compile"), track_progress(timeline):
+                result = run_ffmpeg(cmd, timeline)
+            if result.returncode != 0:
+                print(f"Single-pass compile error: {result.stderr[-2000:]}", file=sys.stderr)
+            return result.returncode == 0
         
     except Exception as e:
-        print(f"Error with crossfade: {e}, falling back to simple concat", file=sys.stderr)
-        return concatenate_videos_ffmpeg(video_paths, output_path, use_transitions=False)
+        print(f"Error compiling timeline: {e}", file=sys.stderr)
+        return False
+
+
+def find_first_image(chapters: List[Dict]) -> Optional[str]:
+    """First existing scene image in the project, used as the title card background."""
+    for chapter in chapters:
+        for scene in chapter.get("scenes", []):
+            if scene.get("image_path") and os.path.exists(scene.get("image_path", "")):
+                return scene.get("image_path")
+    return None
 
 
+def plan_project_segments(project_data: Dict) -> List[Dict]:
+    """
+    Flatten a project into single-pass segments:
+    intro video, year title card, every chapter's scenes, outro video.
+    """
+    chapters = project_data.get("chapters", [])
+    segments = []
+    prefetch_project_media(project_data)
+    
+    intro = project_data.get("intro_video")
+    if intro and os.path.exists(intro):
+        segments.append(plan_video_segment(intro))
+    
+    # Same look as create_title_card: zoom_in_center with the year fading in
+    year_title = project_data.get("year_title")
+    first_image = find_first_image(chapters)
+    if year_title and first_image:
+        segments.append({
+            "image_path": first_image,
+            "audio_path": None,
+            "effect": "zoom_in_center",
+            "duration": 3.5,
+            "text_overlay": {"text": year_title, "style": "year_title", "typewriter": False, "start_time": 0.2},
+        })
+    
+    for chapter in chapters:
+        segments.extend(plan_chapter_scenes(chapter))
+    
+    outro = project_data.get("outro_video")
+    if outro and os.path.exists(outro):
+        segments.append(plan_video_segment(outro))
+    
+    return segments
+
+
+def prefetch_project_media(project_data: Dict):
+    """Probe every narration track and intro/outro of a project in one parallel batch."""
+    paths = [
+        scene.get("audio_path", "")
+        for chapter in project_data.get("chapters", [])
+        for scene in chapter.get("scenes", [])
+    ]
+    paths += [project_data.get("intro_video", ""), project_data.get("outro_video", "")]
+    prefetch_media_info(paths)
+
+
+def plan_video_segment(video_path: str) -> Dict:
+    """Describe an existing video file as a single-pass segment."""
+    info = get_video_info(video_path)
+    has_audio = any(st.get("codec_type") == "audio" for st in info.get("streams", []))
+    return {
+        "video_path": video_path,
+        "duration": get_video_duration_ffprobe(video_path),
+        "has_audio": has_audio,
+    }
+
+
+@traced(
+    "assemble_chapter", "assemble",
+    scenes=lambda a: len(a["chapter_data"].get("scenes", [])),
+    quality=lambda a: a["quality"],
+    compile_mode=lambda a: a["compile_mode"]
+)
 def assemble_chapter_video_fast(
     chapter_data: Dict,
     output_path: str,
     use_transitions: bool = True,
-    quality: str = "high"
+    quality: str = "high",
+    max_workers: Optional[int] = None,
+    encoder_threads: Optional[int] = None,
+    use_cache: bool = True,
+    work_dir: Optional[str] = None,
+    compile_mode: str = "scene_clips",
+    smart_transitions: bool = False,
+    manifest: Optional[RenderManifest] = None,
+    checkpoint_prefix: str = "",
+    final: bool = True,
+    renditions: Optional[Dict[str, str]] = None
 ) -> bool:
     """
     Professional chapter assembly using FFmpeg with VidRush-style effects.
     Features:
     - Varied Ken Burns effects with smooth easing
+    - Scene clips rendered concurrently on a bounded worker pool
+    - Unchanged scenes reused from the persistent scene clip cache
     - Optional crossfade transitions between scenes
     - Audio-driven timing with natural pacing
     - High-quality documentary output
+    - Intermediates kept in a private scratch workspace (inside work_dir if given)
+    
+    compile_mode "single_pass" skips per-scene clips and renders the chapter
+    as one filter graph with a single encode (bypasses the scene cache).
+    smart_transitions renders scene clips with keyframes at the crossfade
+    points so only the transition windows are re-encoded.
+    quality "draft" always compiles single-pass, at DRAFT_RESOLUTION and
+    DRAFT_FPS with an ultrafast encode and no typewriter animation.
+    manifest checkpoints the scene clips (see render_scene_clips) and the
+    smart transition windows.
+    Scene clips are intermediates (see create_scene_clip_ffmpeg); the chapter
+    is encoded for delivery, or with final=False as an intermediate itself,
+    for a full-video join.
+    renditions (OUTPUT_PROFILES name -> path) are encoded alongside the
+    chapter from the same frames (see ladder_outputs).
     """
     try:
         ensure_dirs()
         
-        scenes = chapter_data.get("scenes", [])
-        if not scenes:
+        if not chapter_data.get("scenes"):
             print("No scenes in chapter", file=sys.stderr)
             return False
         
-        scene_clips = []
-        total_scenes = len(scenes)
-        
-        # Check for chapter title card (first scene of chapter can have title overlay)
-        chapter_title = chapter_data.get("title", "")
-        chapter_number = chapter_data.get("chapter_number", 0)
+        if compile_mode == "single_pass" or quality == "draft":
+            plans = plan_chapter_scenes(chapter_data)
+            if not plans:
+                print("No valid scenes in chapter", file=sys.stderr)
+                return False
+            if quality == "draft":
+                plans = draft_plans(plans)
+            fps, resolution = render_format(quality)
+            transition = DEFAULT_TRANSITION_DURATION if use_transitions else 0
+            return compile_timeline_single_pass(
+                plans, output_path,
+                transitions=[transition] * (len(plans) - 1),
+                quality=quality,
+                fps=fps,
+                resolution=resolution,
+                threads=encoder_threads,
+                work_dir=work_dir,
+                renditions=renditions
+            )
         
-        for i, scene in enumerate(scenes):
-            img_path = scene.get("image_path", "")
-            audio_path = scene.get("audio_path", "")
-            
-            # Use varied Ken Burns effects based on scene position
-            specified_effect = scene.get("ken_burns_effect", "")
-            if specified_effect and specified_effect in KEN_BURNS_PRESETS:
-                effect = specified_effect
-            else:
-                effect = get_effect_for_scene(i, total_scenes)
-            
-            if not img_path or not os.path.exists(img_path):
-                print(f"Warning: Image not found: {img_path}", file=sys.stderr)
-                continue
-            
-            # Get duration from audio if available
-            if audio_path and os.path.exists(audio_path):
-                audio_duration = get_audio_duration(audio_path)
-                # Add slight padding at end for natural pacing (0.3-0.5s)
-                duration = audio_duration + 0.4
-            else:
-                duration = scene.get("duration", 8.0)  # Default 8s for documentary pacing
-            
-            # Ensure minimum duration for Ken Burns effect to look smooth
-            duration = max(duration, 5.0)
-            
-            # Build text overlay from scene metadata
-            text_overlay = None
-            
-            # Check for explicit text overlay in scene data
-            if scene.get("text_overlay"):
-                text_overlay = scene.get("text_overlay")
-            # Or use date_text/location_text fields
-            elif scene.get("date_text"):
-                text_overlay = {
-                    "text": scene.get("date_text"),
-                    "style": "date_overlay",
-                    "typewriter": False,
-                    "start_time": 0.5,
-                }
-            elif scene.get("location_text"):
-                text_overlay = {
-                    "text": scene.get("location_text"),
-                    "style": "location_text",
-                    "typewriter": True,
-                    "start_time": 0.5,
-                }
-            # First scene of chapter can show chapter title
-            elif i == 0 and chapter_title:
-                text_overlay = {
-                    "text": chapter_title,
-                    "style": "chapter_title",
-                    "typewriter": True,
-                    "start_time": 0.5,
-                }
+        plans = plan_chapter_scenes(chapter_data)
+        # Every scene is written once by its own encode and once more by the concat
+        expected = 2 * sum(plan["duration"] for plan in plans)
+        with job_workspace("chapter", work_dir) as scratch, track_progress(expected):
+            keyframes = DEFAULT_TRANSITION_DURATION if smart_transitions else None
+            scene_clips = render_scene_clips(
+                plans, scratch, quality, max_workers, encoder_threads, use_cache, keyframes,
+                manifest, checkpoint_prefix
+            )
             
-            # Create temp clip for this scene
-            scene_output = str(TEMP_DIR / f"scene_{i+1}.mp4")
+            if not scene_clips:
+                print("No valid scene clips created", file=sys.stderr)
+                return False
             
-            if create_scene_clip_ffmpeg(
-                img_path, scene_output, duration,
-                audio_path if audio_path and os.path.exists(audio_path) else None,
-                effect,
-                quality=quality,
-                text_overlay=text_overlay
-            ):
-                scene_clips.append(scene_output)
-                overlay_info = f" + '{text_overlay['text'][:20]}'" if text_overlay else ""
-                print(f"Scene {i+1}/{total_scenes}: {effect} ({duration:.1f}s){overlay_info}", file=sys.stderr)
-            else:
-                print(f"Warning: Failed to create scene {i+1}", file=sys.stderr)
-        
-        if not scene_clips:
-            print("No valid scene clips created", file=sys.stderr)
-            return False
-        
-        # Concatenate with optional crossfade transitions
-        # For many scenes, use transitions for professional look
-        should_use_transitions = use_transitions and len(scene_clips) >= 2 and len(scene_clips) <= 20
-        success = concatenate_videos_ffmpeg(scene_clips, output_path, use_transitions=should_use_transitions)
-        
-        # Clean up temp scene files
-        for clip_path in scene_clips:
-            if os.path.exists(clip_path):
-                os.remove(clip_path)
-        
-        return success
+            # Concatenate with optional crossfade transitions
+            # Long chapters are merged in batches, so they keep their transitions too
+            with progress_tags(stage="concat"):
+                return concatenate_videos_ffmpeg(
+                    scene_clips, output_path,
+                    use_transitions=use_transitions,
+                    smart_transitions=smart_transitions,
+                    quality=quality,
+                    work_dir=str(scratch),
+                    manifest=manifest,
+                    final=final,
+                    renditions=renditions
+                )
         
     except Exception as e:
         print(f"Error assembling chapter video: {e}", file=sys.stderr)
@@ -1388,11 +4456,29 @@ def assemble_chapter_video_fast(
         return False
 
 
+@traced(
+    "assemble_full", "assemble",
+    chapters=lambda a: len(a["project_data"].get("chapters", [])),
+    quality=lambda a: a["quality"],
+    compile_mode=lambda a: a["compile_mode"]
+)
 def assemble_full_video_fast(
     project_data: Dict,
     output_path: str,
     use_transitions: bool = True,
-    quality: str = "high"
+    quality: str = "high",
+    max_workers: Optional[int] = None,
+    encoder_threads: Optional[int] = None,
+    use_cache: bool = True,
+    compile_mode: str = "scene_clips",
+    smart_transitions: bool = False,
+    resume: bool = True,
+    incremental: bool = False,
+    report: Optional[Dict] = None,
+    renditions: Optional[Dict[str, str]] = None,
+    stream_dir: Optional[str] = None,
+    deadline: Optional[float] = None,
+    deadline_from: Optional[float] = None
 ) -> bool:
     """
     Professional full video assembly using FFmpeg with VidRush-style quality.
@@ -1401,7 +4487,43 @@ def assemble_full_video_fast(
     - Chapter-level crossfade transitions
     - High-quality encoding
     - Optional intro/outro integration
+    - Intermediates kept in a private scratch workspace, removed afterwards
+    - Cheap intermediates (MEZZANINE_FORMAT video, lossless audio); only the
+      final concat encodes at the quality tier and to AAC
+    - Chapters pipelined: the next chapter's scenes render while the last
+      one is stitched, PIPELINE_DEPTH chapters ahead at most
+    
+    compile_mode "single_pass" compiles the title card, every chapter and the
+    intro/outro into one filter graph: one encode instead of three generations.
+    smart_transitions re-encodes only the crossfade windows at scene and
+    chapter level (chapters keep their first/last scene keyframes).
+    quality "draft" renders a quick single-pass preview (see assemble_chapter_video_fast).
+    resume keeps scene clips, chapters and the title card in the project's
+    checkpoint (see RenderManifest) until the whole video is done, so
+    assembling the same project again after a crash redoes only what was
+    unfinished or whose inputs changed. incremental keeps the checkpoint
+    after a successful render too, so the next render of an edited project
+    rebuilds only the dirty scenes, chapters and transition windows and
+    re-stitches the rest. report, if given, is filled with the artifacts
+    that were reused and rebuilt.
+    renditions (OUTPUT_PROFILES name -> path, e.g. {"720p": ..., "vertical": ...})
+    are written by the final encode from the same composed frames as the
+    master - scenes are rendered and graded once for every rendition.
+    stream_dir, if given, gets a progressive HLS stream (index.m3u8, see
+    ProgressiveStream) that grows as each chapter finishes, in timeline
+    order, and is ended before the final MP4 is joined. A single-pass or
+    draft render has no chapters to publish early; its stream is cut from
+    the finished video.
+    deadline, in seconds from now, picks the delivery encode's x264 preset:
+    the slowest that still finishes in time by this host's calibration (see
+    calibrate_encoder and DeadlinePlanner), re-estimated from the measured
+    throughput after every chapter. Scene clips encoded for delivery (smart
+    transitions, or the "delivery" mezzanine) are encoded first, so their
+    preset is fixed at the start. The choices go into report["encoder"].
+    deadline_from is the time.monotonic() the deadline counts from (default:
+    this call), so a command's own setup counts against it too.
     """
+    deadline_from = time.monotonic() if deadline_from is None else deadline_from
     try:
         ensure_dirs()
         
@@ -1410,92 +4532,217 @@ def assemble_full_video_fast(
             print("No chapters in project", file=sys.stderr)
             return False
         
-        chapter_videos = []
-        total_chapters = len(chapters)
+        prefetch_project_media(project_data)
         
-        # Create year/title intro card if specified
-        year_title = project_data.get("year_title")  # e.g. "1945"
-        project_title = project_data.get("title", "")
-        first_image = None
+        chapter_seconds = [
+            sum(planned_scene_duration(scene) for scene in chapter.get("scenes", []) if os.path.exists(scene.get("image_path") or ""))
+            for chapter in chapters
+        ]
+        story_seconds = sum(chapter_seconds)
+        planner = None
+        if deadline and quality != "draft":
+            try:
+                planner = DeadlinePlanner(float(deadline), calibrate_encoder(quality), story_seconds, deadline_from)
+            except Exception as e:
+                print(f"Warning: Encoder calibration failed, using the {quality} preset: {e}", file=sys.stderr)
+            if planner and report is not None:
+                report["encoder"] = planner.report()
         
-        # Find first available image for title card background
-        for chapter in chapters:
-            for scene in chapter.get("scenes", []):
-                if scene.get("image_path") and os.path.exists(scene.get("image_path", "")):
-                    first_image = scene.get("image_path")
-                    break
-            if first_image:
-                break
+        if compile_mode == "single_pass" or quality == "draft":
+            segments = plan_project_segments(project_data)
+            if not segments:
+                print("No valid scenes in project", file=sys.stderr)
+                return False
+            if quality == "draft":
+                segments = draft_plans(segments)
+            fps, resolution = render_format(quality)
+            transition = DEFAULT_TRANSITION_DURATION if use_transitions else 0
+            # Composing and the delivery encode are one ffmpeg - the preset is chosen once
+            with encoder_preset(planner.choose("single_pass", story_seconds, story_seconds, lock=True) if planner else None):
+                ok = compile_timeline_single_pass(
+                    segments, output_path,
+                    transitions=[transition] * (len(segments) - 1),
+                    quality=quality,
+                    fps=fps,
+                    resolution=resolution,
+                    threads=encoder_threads,
+                    renditions=renditions
+                )
+            if planner and report is not None:
+                report["encoder"] = planner.report()
+            if ok and stream_dir:
+                stream = ProgressiveStream(stream_dir, quality, transition=0)
+                stream.add(output_path)
+                stream.finish()
+            return ok
         
-        # Generate year title card
-        if year_title and first_image:
-            year_card_path = str(TEMP_DIR / "year_title_card.mp4")
-            print(f"Creating year title card: {year_title}", file=sys.stderr)
-            if create_title_card(
-                text=year_title,
-                output_path=year_card_path,
-                style="year_title",
-                duration=3.5,
-                background_image=first_image,
-                typewriter=False
-            ):
-                chapter_videos.append(year_card_path)
-        
-        for i, chapter in enumerate(chapters):
-            chapter_output = str(TEMP_DIR / f"chapter_{i+1}.mp4")
-            print(f"Processing chapter {i+1}/{total_chapters}...", file=sys.stderr)
+        # Scene encodes, chapter concats and the project concat (and the stream) each write the whole story once
+        expected = (4 if stream_dir else 3) * story_seconds
+        # Scene clips encoded for delivery are copied into the output - their preset is the output's
+        locked_preset = None
+        if planner and (smart_transitions or MEZZANINE_CODECS.get(MEZZANINE_FORMAT) is None):
+            locked_preset = planner.choose("scenes", story_seconds, story_seconds, lock=True)
+        elif planner:
+            planner.choose("plan", story_seconds, story_seconds)
+        # Without resume the checkpoint lives and dies with the scratch workspace
+        checkpoint_root = RenderManifest.project_root(project_data) if resume or incremental else None
+        with job_workspace("project") as scratch, track_progress(expected), encoder_preset(locked_preset):
+            with RenderManifest.locked(checkpoint_root or scratch / "checkpoint") as manifest:
+                settings = {
+                    "quality": quality,
+                    "use_transitions": use_transitions,
+                    "smart_transitions": smart_transitions,
+                    "ken_burns_engine": ken_burns_engine_in_use(),
+                    "typewriter_engine": TYPEWRITER_ENGINE,
+                    "audio_codec": MEZZANINE_AUDIO_CODEC[1],
+                    "mezzanine": MEZZANINE_FORMAT,
+                }
+                if locked_preset:
+                    settings["encoder_preset"] = locked_preset
+                chapter_videos = []
+                total_chapters = len(chapters)
+                
+                intro = project_data.get("intro_video")
+                intro = intro if intro and os.path.exists(intro) else None
+                outro = project_data.get("outro_video")
+                outro = outro if outro and os.path.exists(outro) else None
+                
+                # Published in timeline order as each item is ready - the intro already is
+                stream = None
+                if stream_dir:
+                    stream = ProgressiveStream(stream_dir, quality, DEFAULT_TRANSITION_DURATION if use_transitions else 0)
+                    if intro:
+                        stream.add(intro)
+                
+                # Create year/title intro card if specified
+                year_title = project_data.get("year_title")  # e.g. "1945"
+                project_title = project_data.get("title", "")
+                
+                # Find first available image for title card background
+                first_image = find_first_image(chapters)
+                
+                # Generate year title card
+                if year_title and first_image:
+                    print(f"Creating year title card: {year_title}", file=sys.stderr)
+                    
+                    def build_title_card(path: str) -> bool:
+                        with progress_tags(stage="title_card"):
+                            return create_title_card(
+                                text=year_title,
+                                output_path=path,
+                                style="year_title",
+                                duration=3.5,
+                                background_image=first_image,
+                                typewriter=False,
+                                quality=quality,
+                                transition_keyframes=DEFAULT_TRANSITION_DURATION if smart_transitions else None,
+                                final=False
+                            )
+                    
+                    fingerprint = fingerprint_inputs({"artifact": "year_title_card", "text": year_title, **settings}, [first_image])
+                    if manifest.checkpoint("year_title_card.mp4", fingerprint, build_title_card):
+                        chapter_videos.append(manifest.artifact_path("year_title_card.mp4"))
+                        if stream:
+                            stream.add(chapter_videos[-1])
+                
+                def render_chapter_scenes(item: Tuple[int, Dict]) -> Tuple[int, str, Optional[List[str]]]:
+                    # Scene clips have fingerprints of their own, so an edited chapter still resumes its unchanged scenes
+                    i, chapter = item
+                    fingerprint = fingerprint_inputs(
+                        {"artifact": "chapter", "chapter": chapter, **settings},
+                        [path for scene in chapter.get("scenes", []) for path in (scene.get("image_path"), scene.get("audio_path"))]
+                    )
+                    print(f"Processing chapter {i+1}/{total_chapters}...", file=sys.stderr)
+                    if manifest.verified(f"chapter_{i+1}.mp4", fingerprint):
+                        return i, fingerprint, None
+                    with progress_tags(chapter=i + 1, chapters=total_chapters), trace_span("chapter_scenes", chapter=i + 1):
+                        clips = render_scene_clips(
+                            plan_chapter_scenes(chapter), scratch, quality, max_workers, encoder_threads, use_cache,
+                            DEFAULT_TRANSITION_DURATION if smart_transitions else None, manifest, f"chapter_{i+1}_"
+                        )
+                    return i, fingerprint, clips
+                
+                def stitch_chapter(rendered: Tuple[int, str, Optional[List[str]]]) -> Optional[str]:
+                    i, fingerprint, clips = rendered
+                    
+                    def build_chapter(path: str) -> bool:
+                        if not clips:
+                            print("No valid scene clips created", file=sys.stderr)
+                            return False
+                        with progress_tags(chapter=i + 1, chapters=total_chapters, stage="concat"):
+                            return concatenate_videos_ffmpeg(
+                                clips, path,
+                                use_transitions=use_transitions,
+                                smart_transitions=smart_transitions,
+                                quality=quality,
+                                work_dir=str(scratch),
+                                manifest=manifest,
+                                final=False
+                            )
+                    
+                    with trace_span("chapter_stitch", chapter=i + 1):
+                        if not manifest.checkpoint(f"chapter_{i+1}.mp4", fingerprint, build_chapter):
+                            print(f"Warning: Failed to create chapter {i+1}", file=sys.stderr)
+                            return None
+                    print(f"Chapter {i+1} complete", file=sys.stderr)
+                    if planner:
+                        planner.advance(chapter_seconds[i], reused=clips is None)
+                        planner.choose(f"chapter_{i+1}", planner.remaining, story_seconds)
+                    if stream:
+                        stream.add(manifest.artifact_path(f"chapter_{i+1}.mp4"))
+                    return manifest.artifact_path(f"chapter_{i+1}.mp4")
+                
+                # Chapter N+1's scenes render while chapter N is stitched
+                stitched = run_pipeline(enumerate(chapters), [render_chapter_scenes, stitch_chapter])
+                chapter_videos.extend(path for path in stitched if path)
+                
+                if not chapter_videos:
+                    print("No chapter videos created", file=sys.stderr)
+                    if stream:
+                        stream.finish()
+                    return False
+                
+                # Concatenate all chapters with longer transitions between chapters
+                all_videos = [*([intro] if intro else []), *chapter_videos, *([outro] if outro else [])]
+                
+                if stream:
+                    if outro:
+                        stream.add(outro)
+                    # The stream is complete before the final join starts
+                    if stream.finish():
+                        print(f"Stream complete: {stream.playlist}", file=sys.stderr)
+                
+                # Use transitions between chapters for professional flow
+                final_preset = planner.choose("final", 0, story_seconds) if planner else locked_preset
+                with progress_tags(stage="concat"), encoder_preset(final_preset):
+                    ok = concatenate_videos_ffmpeg(
+                        all_videos, output_path,
+                        use_transitions=use_transitions,
+                        smart_transitions=smart_transitions,
+                        quality=quality,
+                        work_dir=str(scratch),
+                        manifest=manifest,
+                        renditions=renditions
+                    )
+                if report is not None:
+                    report.update(manifest.report())
+                    if planner:
+                        report["encoder"] = planner.report()
+                if ok and not incremental:
+                    manifest.discard()
+                elif ok:
+                    manifest.keep_used()
+                return ok
             
-            if assemble_chapter_video_fast(chapter, chapter_output, use_transitions=use_transitions, quality=quality):
-                chapter_videos.append(chapter_output)
-                print(f"Chapter {i+1} complete", file=sys.stderr)
-            else:
-                print(f"Warning: Failed to create chapter {i+1}", file=sys.stderr)
-        
-        if not chapter_videos:
-            print("No chapter videos created", file=sys.stderr)
-            return False
-        
-        # Concatenate all chapters with longer transitions between chapters
-        all_videos = []
-        
-        intro = project_data.get("intro_video")
-        if intro and os.path.exists(intro):
-            all_videos.append(intro)
-        
-        all_videos.extend(chapter_videos)
-        
-        outro = project_data.get("outro_video")
-        if outro and os.path.exists(outro):
-            all_videos.append(outro)
-        
-        # Use transitions between chapters for professional flow
-        success = concatenate_videos_ffmpeg(all_videos, output_path, use_transitions=use_transitions)
-        
-        # Clean up temp chapter files
-        for temp_video in chapter_videos:
-            if os.path.exists(temp_video):
-                os.remove(temp_video)
-        
-        return success
-        
     except Exception as e:
         print(f"Error assembling full video: {e}", file=sys.stderr)
         return False
 
 
 def get_video_info(video_path: str) -> Dict:
-    """Get video metadata using FFprobe."""
+    """Get video metadata using (cached) FFprobe."""
     try:
-        cmd = [
-            "ffprobe", "-v", "quiet",
-            "-print_format", "json",
-            "-show_format", "-show_streams",
-            video_path
-        ]
-        result = subprocess.run(cmd, capture_output=True, text=True)
-        if result.returncode == 0:
-            return json.loads(result.stdout)
-        return {}
+        return get_media_info(video_path)
     except Exception as e:
         print(f"Error getting video info: {e}", file=sys.stderr)
         return {}
@@ -1510,7 +4757,10 @@ def detect_scenes(video_path: str, threshold: float = 27.0) -> List[Dict]:
             "-select_streams", "v",
             video_path
         ]
-        result = subprocess.run(cmd, capture_output=True, text=True, timeout=60)
+        span_attrs = subprocess_span_attrs(cmd) if TRACE.get() is not None else {}
+        with trace_span("ffprobe", "subprocess", **span_attrs) as span:
+            result = subprocess.run(cmd, capture_output=True, text=True, timeout=60)
+            span["returncode"] = result.returncode
         if result.returncode != 0:
             return []
         
@@ -1549,7 +4799,7 @@ def trim_video(input_path: str, output_path: str, start_time: float, end_time: f
             "-c", "copy",
             output_path
         ]
-        result = subprocess.run(cmd, capture_output=True, text=True)
+        result = run_ffmpeg(cmd)
         return result.returncode == 0
     except Exception as e:
         print(f"Error trimming video: {e}", file=sys.stderr)
@@ -1570,70 +4820,57 @@ def images_to_video(
     try:
         ensure_dirs()
         effect_types = ["zoom_in", "zoom_out", "pan_left", "pan_right"]
-        scene_clips = []
         
-        for i, img_path in enumerate(image_paths):
-            if not os.path.exists(img_path):
-                continue
+        with job_workspace("images") as scratch:
+            scene_clips = []
             
-            effect = effect_types[i % len(effect_types)]
-            scene_output = str(TEMP_DIR / f"img_scene_{i+1}.mp4")
+            for i, img_path in enumerate(image_paths):
+                if not os.path.exists(img_path):
+                    continue
+                
+                effect = effect_types[i % len(effect_types)]
+                scene_output = str(scratch / f"img_scene_{i+1}.mp4")
+                
+                if create_scene_clip_ffmpeg(
+                    img_path, scene_output, duration_per_image,
+                    None, effect, fps, resolution
+                ):
+                    scene_clips.append(scene_output)
             
-            if create_scene_clip_ffmpeg(
-                img_path, scene_output, duration_per_image,
-                None, effect, fps, resolution
-            ):
-                scene_clips.append(scene_output)
-        
-        if not scene_clips:
-            return False
-        
-        # Concatenate scenes
-        temp_video = str(TEMP_DIR / "temp_video.mp4")
-        if not concatenate_videos_ffmpeg(scene_clips, temp_video):
-            return False
-        
-        # Add audio if provided
-        if audio_path and os.path.exists(audio_path):
-            cmd = [
-                "ffmpeg", "-y",
-                "-i", temp_video,
-                "-i", audio_path,
-                "-c:v", "copy",
-                "-c:a", "aac", "-b:a", "192k",
-                "-shortest",
-                output_path
-            ]
-            result = subprocess.run(cmd, capture_output=True, text=True)
-            os.remove(temp_video)
-            success = result.returncode == 0
-        else:
-            os.rename(temp_video, output_path)
-            success = True
-        
-        # Clean up
-        for clip in scene_clips:
-            if os.path.exists(clip):
-                os.remove(clip)
-        
-        return success
+            if not scene_clips:
+                return False
+            
+            # Concatenate scenes
+            temp_video = str(scratch / "temp_video.mp4")
+            if not concatenate_videos_ffmpeg(scene_clips, temp_video):
+                return False
+            
+            # Add audio if provided
+            if audio_path and os.path.exists(audio_path):
+                cmd = [
+                    "ffmpeg", "-y",
+                    "-i", temp_video,
+                    "-i", audio_path,
+                    "-c:v", "copy",
+                    "-c:a", "aac", "-b:a", "192k",
+                    "-shortest",
+                    output_path
+                ]
+                result = run_ffmpeg(cmd)
+                return result.returncode == 0
+            
+            shutil.move(temp_video, output_path)
+            return True
     except Exception as e:
         print(f"Error creating video from images: {e}", file=sys.stderr)
         return False
 
 
 def analyze_audio(audio_path: str) -> Dict:
-    """Analyze audio using FFprobe."""
+    """Analyze audio (native WAV header or cached FFprobe)."""
     try:
-        cmd = [
-            "ffprobe", "-v", "quiet",
-            "-print_format", "json",
-            "-show_format", "-show_streams",
-            audio_path
-        ]
-        result = subprocess.run(cmd, capture_output=True, text=True)
-        if result.returncode == 0:
-            data = json.loads(result.stdout)
+        data = get_media_info(audio_path)
+        if data:
             duration = float(data.get("format", {}).get("duration", 0))
             return {
                 "duration": duration,
@@ -1662,219 +4899,844 @@ def merge_videos(video_paths: List[str], output_path: str, transition_duration:
     return concatenate_videos_ffmpeg(video_paths, output_path)
 
 
-if __name__ == "__main__":
-    if len(sys.argv) < 2:
-        print("Usage: python video_processor.py <command> [args...]")
-        print("Commands: detect_scenes, trim, merge, images_to_video, analyze_audio, assemble_chapter, assemble_full, info, title_card, typewriter_sound")
-        sys.exit(1)
+# =============================================================================
+# PROJECT MANIFESTS - configs from a file or stdin, NDJSON projects parsed lazily
+# =============================================================================
+
+# Scene fields kept in slots - anything else a scene carries goes to SceneRecord.extra
+SCENE_FIELDS = ("image_path", "audio_path", "duration", "ken_burns_effect", "text_overlay", "date_text", "location_text")
+
+
+class SceneRecord:
+    """
+    One scene of an NDJSON project. Slotted, so thousands of scenes cost a
+    fraction of the equivalent dicts, but reads like the scene dicts the
+    planners expect (get, [], in). Null fields count as missing.
+    """
+    __slots__ = SCENE_FIELDS + ("extra",)
     
-    command = sys.argv[1]
+    def __init__(self, data: Dict):
+        for field in SCENE_FIELDS:
+            setattr(self, field, data.pop(field, None))
+        self.extra = data or None
     
-    if command == "detect_scenes":
-        if len(sys.argv) < 3:
-            print("Usage: detect_scenes <video_path> [threshold]")
-            sys.exit(1)
-        video_path = sys.argv[2]
-        threshold = float(sys.argv[3]) if len(sys.argv) > 3 else 27.0
-        scenes = detect_scenes(video_path, threshold)
-        print(json.dumps(scenes, indent=2))
-    
-    elif command == "trim":
-        if len(sys.argv) < 6:
-            print("Usage: trim <input> <output> <start> <end>")
-            sys.exit(1)
-        success = trim_video(sys.argv[2], sys.argv[3], float(sys.argv[4]), float(sys.argv[5]))
-        print(json.dumps({"success": success}))
-    
-    elif command == "merge":
-        if len(sys.argv) < 4:
-            print("Usage: merge <output> <video1> <video2> ...")
-            sys.exit(1)
-        success = merge_videos(sys.argv[3:], sys.argv[2])
-        print(json.dumps({"success": success}))
-    
-    elif command == "images_to_video":
-        if len(sys.argv) < 3:
-            print("Usage: images_to_video <json_config>")
-            sys.exit(1)
-        config = json.loads(sys.argv[2])
-        success = images_to_video(
-            config["images"],
-            config["output"],
-            config.get("duration", 5.0),
-            config.get("fps", 24),
-            tuple(config.get("resolution", [1920, 1080])),
-            config.get("audio"),
-            config.get("captions")
-        )
-        print(json.dumps({"success": success}))
-    
-    elif command == "analyze_audio":
-        if len(sys.argv) < 3:
-            print("Usage: analyze_audio <audio_path>")
-            sys.exit(1)
-        result = analyze_audio(sys.argv[2])
-        print(json.dumps(result, indent=2))
-    
-    elif command == "assemble_chapter":
-        if len(sys.argv) < 3:
-            print("Usage: assemble_chapter <json_config>")
-            sys.exit(1)
-        config = json.loads(sys.argv[2])
-        chapter = config.get("chapter", config)
-        output = config.get("output", "output.mp4")
-        success = assemble_chapter_video_fast(chapter, output)
-        print(json.dumps({"success": success}))
-    
-    elif command == "assemble_full":
-        if len(sys.argv) < 3:
-            print("Usage: assemble_full <json_config>")
-            sys.exit(1)
-        config = json.loads(sys.argv[2])
-        project = config.get("project", config)
-        output = config.get("output", "output.mp4")
-        success = assemble_full_video_fast(project, output)
-        print(json.dumps({"success": success}))
-    
-    elif command == "info":
-        if len(sys.argv) < 3:
-            print("Usage: info <video_path>")
-            sys.exit(1)
-        info = get_video_info(sys.argv[2])
-        print(json.dumps(info, indent=2))
-    
-    elif command == "title_card":
-        if len(sys.argv) < 3:
-            print("Usage: title_card <json_config>")
-            print("Config: {text, output, style?, duration?, background_image?, background_color?, typewriter?}")
-            sys.exit(1)
-        config = json.loads(sys.argv[2])
-        success = create_title_card(
-            text=config["text"],
-            output_path=config["output"],
-            style=config.get("style", "year_title"),
-            duration=config.get("duration", 3.0),
-            background_image=config.get("background_image"),
-            background_color=config.get("background_color", "black"),
-            typewriter=config.get("typewriter", False),
-        )
-        print(json.dumps({"success": success}))
-    
-    elif command == "typewriter_sound":
-        if len(sys.argv) < 3:
-            print("Usage: typewriter_sound <json_config>")
-            print("Config: {duration, output?, chars_per_second?}")
-            sys.exit(1)
-        config = json.loads(sys.argv[2])
-        result = generate_typewriter_sound(
-            duration=config["duration"],
-            chars_per_second=config.get("chars_per_second", 12.0),
-            output_path=config.get("output")
-        )
-        print(json.dumps({"success": result is not None, "output": result}))
-    
-    elif command == "letterbox":
-        if len(sys.argv) < 3:
-            print("Usage: letterbox <json_config>")
-            print("Config: {image, output, caption, duration?, audio?, effect?}")
-            sys.exit(1)
-        config = json.loads(sys.argv[2])
-        success = create_letterbox_scene(
-            image_path=config["image"],
-            output_path=config["output"],
-            caption=config["caption"],
-            duration=config.get("duration", 6.0),
-            audio_path=config.get("audio"),
-            effect=config.get("effect", "zoom_in_center"),
-        )
-        print(json.dumps({"success": success}))
-    
-    elif command == "pip":
-        if len(sys.argv) < 3:
-            print("Usage: pip <json_config>")
-            print("Config: {main_image, inset_image, output, duration?, audio?, inset_position?, inset_size?, border_color?}")
-            sys.exit(1)
-        config = json.loads(sys.argv[2])
-        success = create_pip_scene(
-            main_image=config["main_image"],
-            inset_image=config["inset_image"],
-            output_path=config["output"],
-            duration=config.get("duration", 6.0),
-            audio_path=config.get("audio"),
-            inset_position=config.get("inset_position", "bottom_right"),
-            inset_size=config.get("inset_size", 0.25),
-            border_color=config.get("border_color", "white"),
-        )
-        print(json.dumps({"success": success}))
-    
-    elif command == "quote_box":
-        if len(sys.argv) < 3:
-            print("Usage: quote_box <json_config>")
-            print("Config: {image, output, quote, duration?, audio?, effect?, position?, typewriter?}")
-            sys.exit(1)
-        config = json.loads(sys.argv[2])
-        success = create_quote_box_scene(
-            image_path=config["image"],
-            output_path=config["output"],
-            quote_text=config["quote"],
-            duration=config.get("duration", 6.0),
-            audio_path=config.get("audio"),
-            effect=config.get("effect", "zoom_in_center"),
-            box_position=config.get("position", "top_left"),
-            typewriter=config.get("typewriter", True),
-        )
-        print(json.dumps({"success": success}))
-    
-    elif command == "date_stamp":
-        if len(sys.argv) < 3:
-            print("Usage: date_stamp <json_config>")
-            print("Config: {image, output, date, duration?, audio?, effect?}")
-            sys.exit(1)
-        config = json.loads(sys.argv[2])
-        success = create_date_stamp_scene(
-            image_path=config["image"],
-            output_path=config["output"],
-            date_text=config["date"],
-            duration=config.get("duration", 6.0),
-            audio_path=config.get("audio"),
-            effect=config.get("effect", "zoom_in_center"),
+    def get(self, key: str, default=None):
+        if key in SCENE_FIELDS:
+            value = getattr(self, key)
+        else:
+            value = self.extra.get(key) if self.extra else None
+        return default if value is None else value
+    
+    def __getitem__(self, key: str):
+        value = self.get(key)
+        if value is None:
+            raise KeyError(key)
+        return value
+    
+    def __contains__(self, key: str) -> bool:
+        return self.get(key) is not None
+    
+    def to_dict(self) -> Dict:
+        data = {field: getattr(self, field) for field in SCENE_FIELDS if getattr(self, field) is not None}
+        data.update(self.extra or {})
+        return data
+
+
+class ChapterStream:
+    """
+    The chapters of an NDJSON project, parsed from the file each time they
+    are iterated, so only the chapter being worked on is in memory. A
+    {"chapter": {...}} line starts a chapter; every other line is a scene of
+    the current one (scenes before the first marker form an untitled chapter).
+    """
+    
+    def __init__(self, path: str, offset: int = 0):
+        self.path = path
+        self.offset = offset
+        self._count = None
+    
+    def __iter__(self):
+        with open(self.path, "rb") as f:
+            f.seek(self.offset)
+            chapter = None
+            for line in f:
+                if not line.strip():
+                    continue
+                item = json.loads(line)
+                if "chapter" in item:
+                    if chapter is not None:
+                        yield chapter
+                    chapter = dict(item["chapter"])
+                    chapter["scenes"] = [SceneRecord(scene) for scene in chapter.get("scenes", [])]
+                else:
+                    if chapter is None:
+                        chapter = {"scenes": []}
+                    chapter["scenes"].append(SceneRecord(item))
+            if chapter is not None:
+                yield chapter
+    
+    def __len__(self) -> int:
+        if self._count is None:
+            self._count = sum(1 for _ in self)
+        return self._count
+
+
+def manifest_json_default(obj):
+    """json.dumps default for fingerprints: streamed records hash as their content, not their repr."""
+    if isinstance(obj, SceneRecord):
+        return obj.to_dict()
+    if isinstance(obj, ChapterStream):
+        return {"ndjson": hash_file(obj.path).hexdigest(), "offset": obj.offset}
+    return str(obj)
+
+
+def read_manifest(path: str) -> Dict:
+    """
+    Load command params from a file: one JSON document, or NDJSON - a header
+    line with the params, then scene and chapter lines (see ChapterStream).
+    An assemble_full header gets its project's chapters as a ChapterStream,
+    an assemble_chapter header (one with a "chapter") its scenes as
+    SceneRecords.
+    """
+    with open(path, "rb") as f:
+        first = f.readline()
+        offset = f.tell()
+        try:
+            header = json.loads(first)
+        except ValueError:
+            header = None  # A pretty-printed document: its first line is not JSON on its own
+        if not isinstance(header, dict):
+            f.seek(0)
+            return json.load(f)
+    
+    if isinstance(header.get("chapter"), dict):
+        if "scenes" not in header["chapter"]:
+            header["chapter"]["scenes"] = [scene for chapter in ChapterStream(path, offset) for scene in chapter["scenes"]]
+    else:
+        project = header.get("project", header)
+        if "chapters" not in project:
+            project["chapters"] = ChapterStream(path, offset)
+    return header
+
+
+def spool_stdin() -> str:
+    """Copy stdin to a file under TEMP_DIR in chunks, so a manifest can be parsed lazily (and re-read)."""
+    ensure_dirs()
+    fd, path = tempfile.mkstemp(prefix="manifest_", suffix=".ndjson", dir=TEMP_DIR)
+    with os.fdopen(fd, "wb") as f:
+        shutil.copyfileobj(sys.stdin.buffer, f, 1024 * 1024)
+    return path
+
+
+def load_params(params: Dict) -> Dict:
+    """Command params with a "manifest" file read in; params given next to it override the file's."""
+    path = params.get("manifest")
+    if not path:
+        return params
+    loaded = read_manifest(path)
+    loaded.update(params)
+    return loaded
+
+
+# =============================================================================
+# COMMANDS - shared by the CLI and the render daemon's RPC methods
+# =============================================================================
+
+def command_detect_scenes(params: Dict) -> List[Dict]:
+    return detect_scenes(params["video_path"], float(params.get("threshold", 27.0)))
+
+
+def command_trim(params: Dict) -> Dict:
+    success = trim_video(params["input"], params["output"], float(params["start"]), float(params["end"]))
+    return {"success": success}
+
+
+def command_merge(params: Dict) -> Dict:
+    return {"success": merge_videos(params["videos"], params["output"])}
+
+
+def command_images_to_video(params: Dict) -> Dict:
+    success = images_to_video(
+        params["images"],
+        params["output"],
+        params.get("duration", 5.0),
+        params.get("fps", 24),
+        tuple(params.get("resolution", [1920, 1080])),
+        params.get("audio"),
+        params.get("captions")
+    )
+    return {"success": success}
+
+
+def command_analyze_audio(params: Dict) -> Dict:
+    return analyze_audio(params["audio_path"])
+
+
+def swap_in_render(render, output_path: str, quality: str, renditions: Optional[Dict[str, str]] = None) -> bool:
+    """
+    Run render(path, quality, renditions) into temp files beside output_path
+    and each rendition, then atomically replace them, so a player never opens
+    a half-written file and a failed upgrade leaves the draft in place.
+    """
+    def temp_beside(path: str) -> str:
+        target = Path(path)
+        fd, tmp_path = tempfile.mkstemp(prefix=f".{target.stem}_{quality}_", suffix=target.suffix or ".mp4", dir=target.parent)
+        os.close(fd)
+        os.chmod(tmp_path, 0o644)
+        return tmp_path
+    
+    swaps = {output_path: temp_beside(output_path)}
+    tmp_renditions = {}
+    try:
+        for profile, path in (renditions or {}).items():
+            tmp_renditions[profile] = swaps[path] = temp_beside(path)
+        ok = render(swaps[output_path], quality, tmp_renditions)
+        if ok:
+            # The master last: once it is in place, so are its renditions
+            for path in [*(renditions or {}).values(), output_path]:
+                os.replace(swaps[path], path)
+        return ok
+    finally:
+        for tmp_path in swaps.values():
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+
+
+def run_assembly(command: str, params: Dict, render) -> Dict:
+    """
+    Shared body of assemble_chapter/assemble_full. params "quality" picks the
+    tier ("high", "fast" or "draft"); "upgrade": true with a draft puts the
+    draft in place first, then replaces it with a "high" render. Inside the
+    daemon the job reports a "draft_ready" state and upgrades in place; from
+    the CLI the upgrade runs in a detached process and the call returns as
+    soon as the draft is ready. "renditions" - OUTPUT_PROFILES names, written
+    beside the output as <stem>_<profile>.mp4, or a profile -> path dict - are
+    rendered along with the output (each tier writes them all).
+    """
+    output = params.get("output", "output.mp4")
+    quality = params.get("quality", "high")
+    renditions = rendition_paths(output, params.get("renditions"))
+    extra = {"renditions": renditions} if renditions else {}
+    if not (quality == "draft" and params.get("upgrade")):
+        return {"success": swap_in_render(render, output, quality, renditions), **extra, "cache": SCENE_CACHE.stats()}
+    
+    if not swap_in_render(render, output, "draft", renditions):
+        return {"success": False, "cache": SCENE_CACHE.stats()}
+    print(f"Draft ready: {output}", file=sys.stderr)
+    
+    job = CURRENT_JOB.get()
+    if job is not None:
+        job.state("draft_ready", output=output, **extra)
+        upgraded = swap_in_render(render, output, "high", renditions)
+        return {"success": True, "draft": True, "upgraded": upgraded, **extra, "cache": SCENE_CACHE.stats()}
+    
+    # Detached, with its own log: the caller is waiting for our pipes to close, not its
+    ensure_dirs()
+    # Every setting carries over; a manifest's project/chapter is re-read from the file - the
+    # loaded one may be lazy and is too big for argv anyway
+    expanded = ("project", "chapter", "chapters", "scenes") if "manifest" in params else ()
+    upgrade_params = {key: value for key, value in params.items() if key not in expanded}
+    upgrade_params.update(quality="high", upgrade=False)
+    if params.get("trace"):
+        # The upgrade is a run of its own - it must not overwrite the draft's trace
+        upgrade_params["trace"] = str(Path(params["trace"]).with_suffix(".upgrade.json"))
+    fd, log_path = tempfile.mkstemp(prefix="upgrade_", suffix=".log", dir=TEMP_DIR)
+    with os.fdopen(fd, "w") as log:
+        upgrade = subprocess.Popen(
+            [sys.executable, os.path.abspath(__file__), command, json.dumps(upgrade_params)],
+            stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=log,
+            start_new_session=True
         )
-        print(json.dumps({"success": success}))
-    
-    elif command == "split_screen":
-        if len(sys.argv) < 3:
-            print("Usage: split_screen <json_config>")
-            print("Config: {left_image, right_image, output, duration?, audio?, gap_width?}")
-            sys.exit(1)
-        config = json.loads(sys.argv[2])
-        success = create_split_screen_scene(
-            left_image=config["left_image"],
-            right_image=config["right_image"],
-            output_path=config["output"],
-            duration=config.get("duration", 6.0),
-            audio_path=config.get("audio"),
-            gap_width=config.get("gap_width", 4),
+    return {
+        "success": True, "draft": True, "upgrade_pid": upgrade.pid, "upgrade_log": log_path, **extra,
+        "cache": SCENE_CACHE.stats()
+    }
+
+
+def command_assemble_chapter(params: Dict) -> Dict:
+    def render(output: str, quality: str, renditions: Dict[str, str]) -> bool:
+        return assemble_chapter_video_fast(
+            params.get("chapter", params),
+            output,
+            quality=quality,
+            max_workers=params.get("max_workers"),
+            encoder_threads=params.get("encoder_threads"),
+            use_cache=params.get("cache", True),
+            compile_mode=params.get("compile_mode", "scene_clips"),
+            smart_transitions=params.get("smart_transitions", False),
+            renditions=renditions
         )
-        print(json.dumps({"success": success}))
-    
-    elif command == "portrait_title":
-        if len(sys.argv) < 3:
-            print("Usage: portrait_title <json_config>")
-            print("Config: {background, portrait, output, title, subtitle?, duration?, audio?, border_color?}")
-            sys.exit(1)
-        config = json.loads(sys.argv[2])
-        success = create_portrait_title_card(
-            background_image=config["background"],
-            portrait_image=config["portrait"],
-            output_path=config["output"],
-            title=config["title"],
-            subtitle=config.get("subtitle", ""),
-            duration=config.get("duration", 5.0),
-            audio_path=config.get("audio"),
-            border_color=config.get("border_color", "#C9A67A"),
+    return run_assembly("assemble_chapter", params, render)
+
+
+def command_assemble_full(params: Dict) -> Dict:
+    started = time.monotonic()
+    
+    def render(output: str, quality: str, renditions: Dict[str, str]) -> bool:
+        return assemble_full_video_fast(
+            params.get("project", params),
+            output,
+            quality=quality,
+            max_workers=params.get("max_workers"),
+            encoder_threads=params.get("encoder_threads"),
+            use_cache=params.get("cache", True),
+            compile_mode=params.get("compile_mode", "scene_clips"),
+            smart_transitions=params.get("smart_transitions", False),
+            resume=params.get("resume", True),
+            incremental=params.get("incremental", False),
+            report=report,
+            renditions=renditions,
+            # An upgraded draft is only a stopgap - the stream follows the "high" render
+            stream_dir=None if quality == "draft" and params.get("upgrade") else params.get("stream"),
+            deadline=params.get("deadline"),
+            deadline_from=started
         )
-        print(json.dumps({"success": success}))
+    report = {}
+    result = run_assembly("assemble_full", params, render)
+    if "encoder" in report:
+        result["encoder"] = report.pop("encoder")
+    if params.get("incremental"):
+        result["incremental"] = report
+    if params.get("stream"):
+        result["stream"] = str(Path(params["stream"]) / "index.m3u8")
+    return result
+
+
+def command_info(params: Dict) -> Dict:
+    return get_video_info(params["video_path"])
+
+
+def command_scheduler(params: Dict) -> Dict:
+    if RENDER_SCHEDULER is None:
+        return {"enabled": False}
+    return {"enabled": True, **RENDER_SCHEDULER.status()}
+
+
+def command_calibrate(params: Dict) -> Dict:
+    return calibrate_encoder(params.get("quality", "high"), refresh=params.get("refresh", False))
+
+
+def command_title_card(params: Dict) -> Dict:
+    success = create_title_card(
+        text=params["text"],
+        output_path=params["output"],
+        style=params.get("style", "year_title"),
+        duration=params.get("duration", 3.0),
+        background_image=params.get("background_image"),
+        background_color=params.get("background_color", "black"),
+        typewriter=params.get("typewriter", False),
+        quality=params.get("quality", "high"),
+        final=params.get("final", True),
+    )
+    return {"success": success}
+
+
+def command_typewriter_sound(params: Dict) -> Dict:
+    result = generate_typewriter_sound(
+        duration=params["duration"],
+        chars_per_second=params.get("chars_per_second", 12.0),
+        output_path=params.get("output")
+    )
+    return {"success": result is not None, "output": result}
+
+
+def command_letterbox(params: Dict) -> Dict:
+    success = create_letterbox_scene(
+        image_path=params["image"],
+        output_path=params["output"],
+        caption=params["caption"],
+        duration=params.get("duration", 6.0),
+        audio_path=params.get("audio"),
+        effect=params.get("effect", "zoom_in_center"),
+        quality=params.get("quality", "high"),
+        final=params.get("final", True),
+    )
+    return {"success": success}
+
+
+def command_pip(params: Dict) -> Dict:
+    success = create_pip_scene(
+        main_image=params["main_image"],
+        inset_image=params["inset_image"],
+        output_path=params["output"],
+        duration=params.get("duration", 6.0),
+        audio_path=params.get("audio"),
+        inset_position=params.get("inset_position", "bottom_right"),
+        inset_size=params.get("inset_size", 0.25),
+        border_color=params.get("border_color", "white"),
+        quality=params.get("quality", "high"),
+        final=params.get("final", True),
+    )
+    return {"success": success}
+
+
+def command_quote_box(params: Dict) -> Dict:
+    success = create_quote_box_scene(
+        image_path=params["image"],
+        output_path=params["output"],
+        quote_text=params["quote"],
+        duration=params.get("duration", 6.0),
+        audio_path=params.get("audio"),
+        effect=params.get("effect", "zoom_in_center"),
+        box_position=params.get("position", "top_left"),
+        typewriter=params.get("typewriter", True),
+        quality=params.get("quality", "high"),
+        final=params.get("final", True),
+    )
+    return {"success": success}
+
+
+def command_date_stamp(params: Dict) -> Dict:
+    success = create_date_stamp_scene(
+        image_path=params["image"],
+        output_path=params["output"],
+        date_text=params["date"],
+        duration=params.get("duration", 6.0),
+        audio_path=params.get("audio"),
+        effect=params.get("effect", "zoom_in_center"),
+        quality=params.get("quality", "high"),
+        final=params.get("final", True),
+    )
+    return {"success": success}
+
+
+def command_split_screen(params: Dict) -> Dict:
+    success = create_split_screen_scene(
+        left_image=params["left_image"],
+        right_image=params["right_image"],
+        output_path=params["output"],
+        duration=params.get("duration", 6.0),
+        audio_path=params.get("audio"),
+        gap_width=params.get("gap_width", 4),
+        quality=params.get("quality", "high"),
+        final=params.get("final", True),
+    )
+    return {"success": success}
+
+
+def command_portrait_title(params: Dict) -> Dict:
+    success = create_portrait_title_card(
+        background_image=params["background"],
+        portrait_image=params["portrait"],
+        output_path=params["output"],
+        title=params["title"],
+        subtitle=params.get("subtitle", ""),
+        duration=params.get("duration", 5.0),
+        audio_path=params.get("audio"),
+        border_color=params.get("border_color", "#C9A67A"),
+        quality=params.get("quality", "high"),
+        final=params.get("final", True),
+    )
+    return {"success": success}
+
+
+COMMANDS = {
+    "detect_scenes": command_detect_scenes,
+    "trim": command_trim,
+    "merge": command_merge,
+    "images_to_video": command_images_to_video,
+    "analyze_audio": command_analyze_audio,
+    "assemble_chapter": command_assemble_chapter,
+    "assemble_full": command_assemble_full,
+    "info": command_info,
+    "title_card": command_title_card,
+    "typewriter_sound": command_typewriter_sound,
+    "letterbox": command_letterbox,
+    "pip": command_pip,
+    "quote_box": command_quote_box,
+    "date_stamp": command_date_stamp,
+    "split_screen": command_split_screen,
+    "portrait_title": command_portrait_title,
+    "scheduler": command_scheduler,
+    "calibrate": command_calibrate,
+}
+
+# Params each command cannot run without (after a manifest is read in)
+COMMAND_PARAMS = {
+    "detect_scenes": ("video_path",),
+    "trim": ("input", "output", "start", "end"),
+    "merge": ("videos", "output"),
+    "images_to_video": ("images", "output"),
+    "analyze_audio": ("audio_path",),
+    "info": ("video_path",),
+    "title_card": ("text", "output"),
+    "typewriter_sound": ("duration",),
+    "letterbox": ("image", "output", "caption"),
+    "pip": ("main_image", "inset_image", "output"),
+    "quote_box": ("image", "output", "quote"),
+    "date_stamp": ("image", "output", "date"),
+    "split_screen": ("left_image", "right_image", "output"),
+    "portrait_title": ("background", "portrait", "output", "title"),
+}
+
+
+class InvalidParams(ValueError):
+    """A command was called without params it requires."""
+
+# CLI usage per command: (minimum argument count, usage lines)
+CLI_USAGE = {
+    "detect_scenes": (1, ["Usage: detect_scenes <video_path> [threshold]"]),
+    "trim": (4, ["Usage: trim <input> <output> <start> <end>"]),
+    "merge": (2, ["Usage: merge <output> <video1> <video2> ..."]),
+    "images_to_video": (1, ["Usage: images_to_video <json_config>"]),
+    "analyze_audio": (1, ["Usage: analyze_audio <audio_path>"]),
+    "assemble_chapter": (1, ["Usage: assemble_chapter <json_config>", "Config: {chapter, output, quality? (high|fast|draft), upgrade?, compile_mode?, smart_transitions?, renditions?}"]),
+    "assemble_full": (1, ["Usage: assemble_full <json_config>", "Config: {project, output, quality? (high|fast|draft), upgrade?, compile_mode?, smart_transitions?, resume?, incremental?, renditions?, stream? (HLS directory), deadline? (seconds)}"]),
+    "info": (1, ["Usage: info <video_path>"]),
+    "title_card": (1, ["Usage: title_card <json_config>", "Config: {text, output, style?, duration?, background_image?, background_color?, typewriter?, quality?, final? (false: intermediate)}"]),
+    "typewriter_sound": (1, ["Usage: typewriter_sound <json_config>", "Config: {duration, output?, chars_per_second?}"]),
+    "letterbox": (1, ["Usage: letterbox <json_config>", "Config: {image, output, caption, duration?, audio?, effect?, quality?, final? (false: intermediate)}"]),
+    "pip": (1, ["Usage: pip <json_config>", "Config: {main_image, inset_image, output, duration?, audio?, inset_position?, inset_size?, border_color?, quality?, final? (false: intermediate)}"]),
+    "quote_box": (1, ["Usage: quote_box <json_config>", "Config: {image, output, quote, duration?, audio?, effect?, position?, typewriter?, quality?, final? (false: intermediate)}"]),
+    "date_stamp": (1, ["Usage: date_stamp <json_config>", "Config: {image, output, date, duration?, audio?, effect?, quality?, final? (false: intermediate)}"]),
+    "split_screen": (1, ["Usage: split_screen <json_config>", "Config: {left_image, right_image, output, duration?, audio?, gap_width?, quality?, final? (false: intermediate)}"]),
+    "portrait_title": (1, ["Usage: portrait_title <json_config>", "Config: {background, portrait, output, title, subtitle?, duration?, audio?, border_color?, quality?, final? (false: intermediate)}"]),
+    "scheduler": (0, ["Usage: scheduler", "Prints the host render scheduler's thread budget and queue depth"]),
+    "calibrate": (0, ["Usage: calibrate [json_config]", "Config: {quality? (high|fast), refresh?}", "Measures this host's encode speed per x264 preset (used by assemble_full's deadline)"]),
+    "daemon": (0, ["Usage: daemon [socket_path]"]),
+}
+
+CONFIG_SOURCES = (
+    "<json_config> may also be @path or - (stdin): one JSON document, or NDJSON - a params line\n"
+    "(project/chapter without scenes), then {\"chapter\": {...}} marker lines and one scene per line.\n"
+    "Any config may set \"trace\": <path> to save a Chrome trace of the run (ui.perfetto.dev loads it)\n"
+    "and \"priority\": interactive|normal|background for its place in the host render queue"
+)
+
+
+def cli_params(command: str, args: List[str]) -> Dict:
+    """Map CLI arguments onto the params dict the command (and RPC method) takes."""
+    if command == "detect_scenes":
+        params = {"video_path": args[0]}
+        if len(args) > 1:
+            params["threshold"] = float(args[1])
+        return params
+    if command == "trim":
+        return {"input": args[0], "output": args[1], "start": float(args[2]), "end": float(args[3])}
+    if command == "merge":
+        return {"output": args[0], "videos": args[1:]}
+    if command == "analyze_audio":
+        return {"audio_path": args[0]}
+    if command == "info":
+        return {"video_path": args[0]}
+    if command == "scheduler" or not args:
+        return {}
+    if args[0] == "-":
+        return {"manifest": spool_stdin(), "manifest_spooled": True}
+    if args[0].startswith("@"):
+        return {"manifest": args[0][1:]}
+    return json.loads(args[0])
+
+
+def run_command(command: str, params: Dict):
+    """
+    Run a command on params as given by the CLI or an RPC request: load a
+    manifest, check COMMAND_PARAMS, and trace the run when params "trace" or
+    VIDEO_TRACE_DIR asks for it (the trace path is added to a dict result).
+    New media probes are saved once the command is done. Its ffmpeg runs
+    queue for host threads at params "priority" (interactive|normal|background);
+    drafts default to interactive.
+    """
+    params = load_params(params)
+    missing = [key for key in COMMAND_PARAMS.get(command, ()) if key not in params]
+    if missing:
+        raise InvalidParams(f"Missing parameter: {', '.join(missing)}")
+    trace_path = trace_path_for(command, params)
+    priority = params.get("priority") or ("interactive" if params.get("quality") == "draft" else "normal")
+    try:
+        with render_priority(priority), tracing(trace_path), trace_span(command, "command", priority=priority):
+            result = COMMANDS[command](params)
+    finally:
+        MEDIA_PROBE.save()
+    if trace_path and isinstance(result, dict):
+        result["trace"] = trace_path
+    return result
+
+
+# =============================================================================
+# RENDER DAEMON - long-lived process serving newline-delimited JSON-RPC 2.0
+# =============================================================================
+
+# JSON-RPC error codes
+RPC_PARSE_ERROR = -32700
+RPC_INVALID_REQUEST = -32600
+RPC_METHOD_NOT_FOUND = -32601
+RPC_INVALID_PARAMS = -32602
+RPC_JOB_FAILED = -32000
+
+# Job whose output the current thread (or pool task) is producing
+CURRENT_JOB = contextvars.ContextVar("current_job", default=None)
+
+
+class RpcConnection:
+    """One client's response stream. Writes are line-atomic across job threads."""
+    
+    def __init__(self, stream):
+        self.stream = stream
+        self._lock = threading.Lock()
+        self._outstanding = 0
+        self._idle = threading.Condition()
+    
+    def job_queued(self):
+        with self._idle:
+            self._outstanding += 1
+    
+    def job_finished(self):
+        with self._idle:
+            self._outstanding -= 1
+            self._idle.notify_all()
+    
+    def wait_idle(self):
+        """Block until every job this client queued has been answered."""
+        with self._idle:
+            self._idle.wait_for(lambda: self._outstanding == 0)
+    
+    def send(self, message: Dict):
+        line = json.dumps(message) + "\n"
+        with self._lock:
+            try:
+                self.stream.write(line)
+                self.stream.flush()
+            except (OSError, ValueError):
+                # Client went away - the job still finishes and fills the caches
+                pass
+    
+    def respond(self, request_id, result=None, error: Optional[Dict] = None):
+        message = {"jsonrpc": "2.0", "id": request_id}
+        if error is not None:
+            message["error"] = error
+        else:
+            message["result"] = result
+        self.send(message)
+    
+    def notify(self, method: str, params: Dict):
+        self.send({"jsonrpc": "2.0", "method": method, "params": params})
+
+
+class RenderJob:
+    """A queued RPC call. Log lines it writes are streamed back as job.log notifications."""
+    
+    def __init__(self, request_id, method: str, params: Dict, connection: RpcConnection):
+        self.id = request_id
+        self.method = method
+        self.params = params
+        self.connection = connection
+        self._partial = ""
+        self._lock = threading.Lock()
+    
+    def log(self, text: str):
+        with self._lock:
+            *lines, self._partial = (self._partial + text).split("\n")
+        for line in lines:
+            if line.strip():
+                self.connection.notify("job.log", {"id": self.id, "line": line})
+    
+    def flush(self):
+        self.log("\n")
+    
+    def state(self, state: str, **extra):
+        self.connection.notify("job.state", {"id": self.id, "state": state, **extra})
+
+
+class JobOutputRouter:
+    """
+    Daemon stand-in for sys.stderr/sys.stdout: text written on behalf of a job
+    goes to that job's client, anything else to the daemon's own stderr.
+    """
+    
+    def __init__(self, fallback):
+        self.fallback = fallback
+    
+    def write(self, text: str) -> int:
+        job = CURRENT_JOB.get()
+        if job is None:
+            return self.fallback.write(text)
+        job.log(text)
+        return len(text)
+    
+    def flush(self):
+        self.fallback.flush()
+    
+    def __getattr__(self, name):
+        return getattr(self.fallback, name)
+
+
+class RenderDaemon:
+    """
+    Serves COMMANDS as JSON-RPC methods. Requests from every connection share
+    one FIFO job queue drained by a fixed set of workers; the probe and scene
+    caches stay warm for the daemon's lifetime. "ping" and "shutdown" are
+    answered immediately instead of being queued.
+    """
+    
+    def __init__(self, workers: int = DAEMON_WORKERS):
+        self.jobs = queue.Queue()
+        self.stopping = threading.Event()
+        self._workers = [threading.Thread(target=self._work, daemon=True) for _ in range(max(1, workers))]
+    
+    def start(self):
+        for worker in self._workers:
+            worker.start()
+    
+    def stop(self):
+        """Finish every queued job, then stop the workers."""
+        self.stopping.set()
+        for _ in self._workers:
+            self.jobs.put(None)
+        for worker in self._workers:
+            worker.join()
+        MEDIA_PROBE.save()
+    
+    def handle_line(self, line: str, connection: RpcConnection):
+        """Parse one request line and queue it (or answer it directly)."""
+        if not line.strip():
+            return
+        try:
+            request = json.loads(line)
+        except ValueError as e:
+            connection.respond(None, error={"code": RPC_PARSE_ERROR, "message": f"Parse error: {e}"})
+            return
+        if not isinstance(request, dict) or not isinstance(request.get("method"), str):
+            connection.respond(None, error={"code": RPC_INVALID_REQUEST, "message": "Invalid request"})
+            return
+        
+        request_id = request.get("id")
+        method = request["method"]
+        params = request.get("params", {})
+        if method == "ping":
+            connection.respond(request_id, {"pong": True, "queued": self.jobs.qsize()})
+            return
+        if method == "shutdown":
+            connection.respond(request_id, {"stopping": True, "queued": self.jobs.qsize()})
+            self.stopping.set()
+            return
+        if method not in COMMANDS:
+            connection.respond(request_id, error={"code": RPC_METHOD_NOT_FOUND, "message": f"Unknown method: {method}"})
+            return
+        if not isinstance(params, dict):
+            connection.respond(request_id, error={"code": RPC_INVALID_PARAMS, "message": "params must be an object"})
+            return
+        if self.stopping.is_set():
+            connection.respond(request_id, error={"code": RPC_JOB_FAILED, "message": "Daemon is shutting down"})
+            return
+        
+        job = RenderJob(request_id, method, params, connection)
+        connection.job_queued()
+        job.state("queued", position=self.jobs.qsize())
+        self.jobs.put(job)
+    
+    def _work(self):
+        while True:
+            job = self.jobs.get()
+            if job is None:
+                return
+            self._run(job)
+    
+    def _run(self, job: RenderJob):
+        token = CURRENT_JOB.set(job)
+        job.state("running")
+        result, error = None, None
+        try:
+            result = run_command(job.method, job.params)
+        except InvalidParams as e:
+            error = {"code": RPC_INVALID_PARAMS, "message": str(e)}
+        except Exception as e:
+            import traceback
+            traceback.print_exc()
+            error = {"code": RPC_JOB_FAILED, "message": str(e)}
+        finally:
+            job.flush()
+            CURRENT_JOB.reset(token)
+        job.state("failed" if error else "done")
+        job.connection.respond(job.id, result, error)
+        job.connection.job_finished()
+
+
+def serve_stdio(daemon: RenderDaemon):
+    """Read requests from stdin, answer on stdout. EOF or "shutdown" drains the queue and exits."""
+    connection = RpcConnection(sys.stdout)
+    # stdout now belongs to the protocol - stray prints go to stderr
+    sys.stdout = JobOutputRouter(sys.stderr)
+    daemon.start()
+    for line in sys.stdin:
+        daemon.handle_line(line, connection)
+        if daemon.stopping.is_set():
+            break
+    daemon.stop()
+
+
+def serve_unix_socket(daemon: RenderDaemon, socket_path: str):
+    """Accept any number of clients on a Unix socket, all feeding the same job queue."""
+    
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self):
+            connection = RpcConnection(io.TextIOWrapper(self.wfile, encoding="utf-8", write_through=True))
+            for raw in self.rfile:
+                daemon.handle_line(raw.decode("utf-8", "replace"), connection)
+                if daemon.stopping.is_set():
+                    break
+            # A client may half-close after its last request - answer it before closing
+            connection.wait_idle()
+    
+    if os.path.exists(socket_path):
+        os.unlink(socket_path)
+    server = socketserver.ThreadingUnixStreamServer(socket_path, Handler)
+    server.daemon_threads = True
     
+    def stop_when_asked():
+        daemon.stopping.wait()
+        server.shutdown()
+    
+    daemon.start()
+    threading.Thread(target=stop_when_asked, daemon=True).start()
+    print(f"Render daemon listening on {socket_path}", file=sys.stderr)
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        daemon.stop()
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+
+
+def run_daemon(socket_path: Optional[str] = None, workers: int = DAEMON_WORKERS):
+    """Run the render daemon on a Unix socket, or on stdin/stdout when no socket is given."""
+    sys.stderr = JobOutputRouter(sys.stderr)
+    daemon = RenderDaemon(workers)
+    if socket_path:
+        serve_unix_socket(daemon, socket_path)
     else:
+        serve_stdio(daemon)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Usage: python video_processor.py <command> [args...]")
+        print(f"Commands: {', '.join(CLI_USAGE)}")
+        sys.exit(1)
+    
+    command = sys.argv[1]
+    if command not in CLI_USAGE:
         print(f"Unknown command: {command}")
         sys.exit(1)
+    
+    min_args, usage = CLI_USAGE[command]
+    args = sys.argv[2:]
+    if len(args) < min_args:
+        print("\n".join(usage))
+        if "<json_config>" in usage[0]:
+            print(CONFIG_SOURCES)
+        sys.exit(1)
+    
+    if command == "daemon":
+        run_daemon(args[0] if args else None)
+    else:
+        params = cli_params(command, args)
+        result = {}
+        try:
+            result = run_command(command, params)
+        finally:
+            # A detached draft upgrade still needs the spooled manifest and removes it itself
+            if params.get("manifest_spooled") and "upgrade_pid" not in result:
+                os.unlink(params["manifest"])
+        print(json.dumps(result, indent=2 if command in ("detect_scenes", "analyze_audio", "info") else None))
@@ -102,6 +102,8 @@ export async function createTitleCard(config: {
   background_image?: string;
   background_color?: string;
   typewriter?: boolean;
+  quality?: "high" | "fast" | "draft";
+  final?: boolean;
 }): Promise<VideoProcessorResult> {
   return runPythonCommand("title_card", [JSON.stringify(config)]);
 }
@@ -121,6 +123,8 @@ export async function createLetterboxScene(config: {
   duration?: number;
   audio?: string;
   effect?: string;
+  quality?: "high" | "fast" | "draft";
+  final?: boolean;
 }): Promise<VideoProcessorResult> {
   return runPythonCommand("letterbox", [JSON.stringify(config)]);
 }
@@ -134,6 +138,8 @@ export async function createPipScene(config: {
   inset_position?: "top_left" | "top_right" | "bottom_left" | "bottom_right";
   inset_size?: number;
   border_color?: string;
+  quality?: "high" | "fast" | "draft";
+  final?: boolean;
 }): Promise<VideoProcessorResult> {
   return runPythonCommand("pip", [JSON.stringify(config)]);
 }
@@ -147,6 +153,8 @@ export async function createQuoteBoxScene(config: {
   effect?: string;
   position?: "top_left" | "top_right" | "bottom_left" | "center";
   typewriter?: boolean;
+  quality?: "high" | "fast" | "draft";
+  final?: boolean;
 }): Promise<VideoProcessorResult> {
   return runPythonCommand("quote_box", [JSON.stringify(config)]);
 }
@@ -158,6 +166,8 @@ export async function createDateStampScene(config: {
   duration?: number;
   audio?: string;
   effect?: string;
+  quality?: "high" | "fast" | "draft";
+  final?: boolean;
 }): Promise<VideoProcessorResult> {
   return runPythonCommand("date_stamp", [JSON.stringify(config)]);
 }
@@ -169,6 +179,8 @@ export async function createSplitScreenScene(config: {
   duration?: number;
   audio?: string;
   gap_width?: number;
+  quality?: "high" | "fast" | "draft";
+  final?: boolean;
 }): Promise<VideoProcessorResult> {
   return runPythonCommand("split_screen", [JSON.stringify(config)]);
 }
@@ -182,6 +194,8 @@ export async function createPortraitTitleCard(config: {
   duration?: number;
   audio?: string;
   border_color?: string;
+  quality?: "high" | "fast" | "draft";
+  final?: boolean;
 }): Promise<VideoProcessorResult> {
   return runPythonCommand("portrait_title", [JSON.stringify(config)]);
 }